@@ -0,0 +1,218 @@
+"""
+扫描 / 转换 / 构建 基准测试
+
+在合成语料 (见 synth_corpus.py) 上分别计时：
+    parse_structure     冷扫描 (每轮使用全新的缓存目录，不命中结构缓存与标题缓存)
+    read_file_content   单页转换 (主进程串行，抽样 --sample 个页面)，给出页/秒与分位数
+    build_nodes         端到端构建 (每个 --jobs 取值各一次全量构建，再跑一次无变化的增量构建)
+
+结果写为 JSON，可用 --compare 与另一版本的结果对比：
+    python benchmarks/run_benchmarks.py --pages 5000 --out after.json --compare before.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import random
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(HERE), "src"))
+sys.path.insert(0, HERE)
+
+from cae_doc_builder import __version__
+from cae_doc_builder.core.engine import DocBuilderEngine
+from cae_doc_builder.adapters.ansys_adapter import AnsysAdapter
+from cae_doc_builder.adapters.ansa_adapter import AnsaAdapter
+from cae_doc_builder.adapters.abaqus_adapter import AbaqusAdapter
+from synth_corpus import FORMATS, generate
+
+ADAPTERS = {"ansa": AnsaAdapter, "ansys": AnsysAdapter, "abaqus": AbaqusAdapter}
+
+
+def _quiet(msg):
+    pass
+
+def _new_cache_dir(scratch):
+    # 缓存目录通过环境变量定位，换一个空目录即可保证冷启动
+    path = tempfile.mkdtemp(prefix="cache-", dir=scratch)
+    os.environ["CAE_DOC_BUILDER_CACHE"] = path
+    return path
+
+def _iter_nodes(nodes):
+    for n in nodes:
+        yield n
+        yield from _iter_nodes(n.children)
+
+def _percentiles(samples):
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return {"p50": round(pick(0.50) * 1000, 3), "p90": round(pick(0.90) * 1000, 3),
+            "p99": round(pick(0.99) * 1000, 3), "max": round(ordered[-1] * 1000, 3)}
+
+def _tree_size(path):
+    files = size = 0
+    for dirpath, _, names in os.walk(path):
+        for name in names:
+            files += 1
+            size += os.path.getsize(os.path.join(dirpath, name))
+    return files, size
+
+
+def bench_parse(fmt, src, scratch, repeat):
+    times, nodes = [], []
+    for _ in range(repeat):
+        _new_cache_dir(scratch)
+        engine = DocBuilderEngine(ADAPTERS[fmt](src, ".", _quiet))
+        t0 = time.perf_counter()
+        nodes = engine.analyze_structure(src, use_cache=False)
+        times.append(time.perf_counter() - t0)
+    count = sum(1 for _ in _iter_nodes(nodes))
+    return nodes, {"benchmark": "parse_structure", "nodes": count,
+                   "seconds": round(min(times), 4), "median_seconds": round(statistics.median(times), 4),
+                   "nodes_per_sec": round(count / min(times), 1) if min(times) > 0 else 0.0}
+
+def bench_parse_cached(fmt, src, scratch):
+    _new_cache_dir(scratch)
+    DocBuilderEngine(ADAPTERS[fmt](src, ".", _quiet)).analyze_structure(src)
+    engine = DocBuilderEngine(ADAPTERS[fmt](src, ".", _quiet))
+    t0 = time.perf_counter()
+    engine.analyze_structure(src)
+    return {"benchmark": "parse_structure_cached", "seconds": round(time.perf_counter() - t0, 4)}
+
+def bench_read(fmt, src, nodes, scratch, sample, seed):
+    adapter = ADAPTERS[fmt](src, ".", _quiet)
+    pages = [n for n in _iter_nodes(nodes)
+             if n.source_path and n.source_path.lower().endswith(('.htm', '.html'))]
+    if len(pages) > sample:
+        pages = random.Random(seed).sample(pages, sample)
+    assets_dir = tempfile.mkdtemp(prefix="assets-", dir=scratch)
+    adapter.asset_store.reset()
+    times, chars = [], 0
+    for node in pages:
+        t0 = time.perf_counter()
+        content = adapter.read_file_content(node, image_out_dir=assets_dir)
+        times.append(time.perf_counter() - t0)
+        chars += len(content or "")
+    total = sum(times)
+    result = {"benchmark": "read_file_content", "pages": len(pages), "seconds": round(total, 4),
+              "pages_per_sec": round(len(pages) / total, 1) if total > 0 else 0.0, "output_chars": chars}
+    if times:
+        result["page_ms"] = _percentiles(times)
+    return result
+
+def bench_build(fmt, src, nodes, scratch, jobs):
+    results = []
+    out = os.path.join(scratch, f"out-{fmt}-j{jobs}")
+    shutil.rmtree(out, ignore_errors=True)
+    for label, incremental in (("build_nodes", False), ("build_nodes_incremental", True)):
+        engine = DocBuilderEngine(ADAPTERS[fmt](src, ".", _quiet), jobs=jobs)
+        t0 = time.perf_counter()
+        engine.build_nodes(nodes, out, jobs=jobs, incremental=incremental)
+        elapsed = time.perf_counter() - t0
+        files, size = _tree_size(out)
+        results.append({"benchmark": label, "jobs": jobs, "seconds": round(elapsed, 4),
+                        "pages": engine.total_nodes,
+                        "pages_per_sec": round(engine.total_nodes / elapsed, 1) if elapsed > 0 else 0.0,
+                        "output_files": files, "output_bytes": size,
+                        "write": engine.write_stats})
+    shutil.rmtree(out, ignore_errors=True)
+    return results
+
+
+def _git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=HERE,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(args):
+    corpus_root = args.corpus_dir or os.path.join(tempfile.gettempdir(), "cae_doc_builder_synth")
+    scratch = tempfile.mkdtemp(prefix="cdb-bench-")
+    report = {
+        "meta": {"version": __version__, "git": _git_revision(), "python": platform.python_version(),
+                 "platform": platform.platform(), "cpu_count": os.cpu_count(),
+                 "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                 "pages": args.pages, "seed": args.seed, "jobs": args.jobs},
+        "results": [],
+    }
+    saved_cache = os.environ.get("CAE_DOC_BUILDER_CACHE")
+    try:
+        for fmt in args.formats:
+            src = os.path.join(corpus_root, f"{fmt}-{args.pages}-{args.seed}")
+            t0 = time.perf_counter()
+            corpus = generate(fmt, src, args.pages, seed=args.seed, paragraphs=args.paragraphs)
+            print(f"[{fmt}] 语料: {corpus['pages']} 页, {corpus['images']} 张图片 ({time.perf_counter() - t0:.1f}s)")
+
+            rows = []
+            nodes, row = bench_parse(fmt, src, scratch, args.repeat)
+            rows.append(row)
+            rows.append(bench_parse_cached(fmt, src, scratch))
+            rows.append(bench_read(fmt, src, nodes, scratch, args.sample, args.seed))
+            if not args.skip_build:
+                for jobs in args.jobs:
+                    rows.extend(bench_build(fmt, src, nodes, scratch, jobs))
+            for row in rows:
+                row["format"] = fmt
+                print(f"[{fmt}] " + json.dumps(row, ensure_ascii=False))
+            report["results"].extend(rows)
+    finally:
+        if saved_cache is None: os.environ.pop("CAE_DOC_BUILDER_CACHE", None)
+        else: os.environ["CAE_DOC_BUILDER_CACHE"] = saved_cache
+        shutil.rmtree(scratch, ignore_errors=True)
+    return report
+
+
+def _key(row):
+    return (row.get("format"), row.get("benchmark"), row.get("jobs"))
+
+def compare(report, baseline):
+    """按 (格式, 基准项, jobs) 对齐两份结果，打印单页耗时比值 (<1 表示变快)"""
+    old = {_key(r): r for r in baseline.get("results", [])}
+    print(f"\n对比基线 {baseline['meta'].get('git')} ({baseline['meta'].get('timestamp')}):")
+    for row in report["results"]:
+        base = old.get(_key(row))
+        if not base or not base.get("seconds"): continue
+        # 抽样数或语料规模不同时按单页耗时比较
+        per_page = row.get("pages") and base.get("pages")
+        ratio = (row["seconds"] / row["pages"]) / (base["seconds"] / base["pages"]) if per_page \
+            else row["seconds"] / base["seconds"]
+        jobs = f" jobs={row['jobs']}" if row.get("jobs") else ""
+        print(f"  {row['format']:<7} {row['benchmark']:<24}{jobs:<8} "
+              f"{base['seconds']:>9.3f}s -> {row['seconds']:>9.3f}s  x{ratio:.2f}")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="CAE 文档构建基准测试")
+    ap.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS))
+    ap.add_argument("--pages", type=int, default=2000, help="每种格式的合成页面数")
+    ap.add_argument("--paragraphs", type=int, default=12, help="每页段落数")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--jobs", type=int, nargs="+", default=[1, os.cpu_count() or 1],
+                    help="build_nodes 的转换进程数 (可给多个)")
+    ap.add_argument("--repeat", type=int, default=3, help="parse_structure 重复次数 (取最小值)")
+    ap.add_argument("--sample", type=int, default=500, help="read_file_content 抽样页面数")
+    ap.add_argument("--skip-build", action="store_true", help="跳过端到端构建")
+    ap.add_argument("--corpus-dir", help="语料目录 (默认系统临时目录，参数相同时复用)")
+    ap.add_argument("--out", help="结果 JSON 路径")
+    ap.add_argument("--compare", help="与之前的结果 JSON 对比")
+    args = ap.parse_args(argv)
+    args.jobs = sorted(set(args.jobs))
+
+    report = run(args)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"结果已写入 {args.out}")
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compare(report, json.load(f))
+
+if __name__ == "__main__":
+    main()
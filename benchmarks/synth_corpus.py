@@ -0,0 +1,283 @@
+"""
+合成 CAE 帮助文档语料生成器
+
+厂商文档受许可限制无法提交到仓库，这里按三种真实布局生成结构与页面特征相近的
+合成语料，用于基准测试与回归对比：
+
+    ANSA    Sphinx 目录树：章节目录 + index.html + 页面，_static/_images 共享资源，侧边栏/页脚噪音
+    ANSYS   toc_config.xml (Set/Book) + help/<book>/toc.toc 嵌套 dl，多个条目指向同一页面的不同 #锚点
+    ABAQUS  DSSIMULIA_Established_TOC.xml + 各书 structure.xml (childtoc)，混合 PDF 书籍
+
+用法：
+    python benchmarks/synth_corpus.py ansys D:/synth/ansys --pages 100000
+"""
+import os
+import json
+import random
+import argparse
+
+WORDS = ("element mesh solver node boundary condition load step material contact pressure "
+         "stress strain tensor shell beam solid analysis nonlinear static dynamic modal "
+         "frequency damping thermal convection surface volume integration keyword option "
+         "parameter default value output request history field variable increment time").split()
+
+FORMATS = ("ansa", "ansys", "abaqus")
+MARKER_FILE = ".synth_corpus.json"
+
+
+class _Writer:
+    def __init__(self, root, rng):
+        self.root = root
+        self.rng = rng
+        self.pages = 0
+        self.images = 0
+
+    def path(self, *parts):
+        return os.path.join(self.root, *parts)
+
+    def write(self, rel, text):
+        full = self.path(*rel.split('/'))
+        os.makedirs(os.path.dirname(full), exist_ok=True)
+        with open(full, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    def image(self, rel, size=None):
+        full = self.path(*rel.split('/'))
+        if os.path.exists(full): return
+        os.makedirs(os.path.dirname(full), exist_ok=True)
+        with open(full, 'wb') as f:
+            f.write(b'\x89PNG\r\n\x1a\n' + self.rng.randbytes(size or self.rng.randint(200, 4000)))
+        self.images += 1
+
+    def sentence(self, n=None):
+        words = [self.rng.choice(WORDS) for _ in range(n or self.rng.randint(6, 18))]
+        return ' '.join(words).capitalize() + '.'
+
+    def title(self):
+        return ' '.join(self.rng.choice(WORDS).capitalize() for _ in range(self.rng.randint(2, 5)))
+
+    def body(self, paragraphs, images=(), anchors=()):
+        """正文片段：段落、列表、表格、普通图片与公式图片 (alt 含 '=')"""
+        rng = self.rng
+        parts = []
+        for i in range(paragraphs):
+            if anchors and i % max(1, paragraphs // len(anchors)) == 0 and i // max(1, paragraphs // len(anchors)) < len(anchors):
+                anchor = anchors[i // max(1, paragraphs // len(anchors))]
+                parts.append(f'<h2 id="{anchor}">{self.title()}</h2>')
+            parts.append(f'<p>{self.sentence()} <a href="#x{i}">{rng.choice(WORDS)}</a> {self.sentence()}</p>')
+            roll = rng.random()
+            if roll < 0.15:
+                parts.append('<ul>' + ''.join(f'<li>{self.sentence(5)}</li>' for _ in range(rng.randint(2, 5))) + '</ul>')
+            elif roll < 0.25:
+                rows = ''.join('<tr>' + ''.join(f'<td>{rng.choice(WORDS)}</td>' for _ in range(3)) + '</tr>'
+                               for _ in range(rng.randint(2, 6)))
+                parts.append(f'<table><tr><th>Name</th><th>Type</th><th>Default</th></tr>{rows}</table>')
+            elif roll < 0.32:
+                parts.append(f'<img src="eq{i}.svg" alt="\\sigma = E \\epsilon + {i}"/>')
+            elif roll < 0.45 and images:
+                parts.append(f'<img src="{rng.choice(images)}" alt="figure {i}"/>')
+        return '\n'.join(parts)
+
+    def split(self, total, parts):
+        """把 total 个页面随机分成 parts 份 (每份至少 1)"""
+        parts = max(1, min(parts, total))
+        cuts = sorted(self.rng.sample(range(1, total), parts - 1)) if parts > 1 else []
+        bounds = [0] + cuts + [total]
+        return [bounds[i + 1] - bounds[i] for i in range(parts)]
+
+
+# --- ANSA：Sphinx 目录树 ---
+
+def generate_ansa(root, pages, seed=0, paragraphs=12):
+    w = _Writer(root, random.Random(seed))
+    shared = ['_static/logo.png', '_static/note.png', '_static/warning.png']
+    for rel in shared: w.image(rel)
+
+    def page(rel, depth, title):
+        up = '../' * depth
+        images = [up + s for s in shared] + [f'{up}_images/fig{w.rng.randint(0, max(1, pages // 4))}.png']
+        for img in images[3:]: w.image(img[len(up):])
+        w.write(rel, f"""<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"><title>{title} — ANSA documentation</title>
+<link rel="stylesheet" href="{up}_static/furo.css"><script src="{up}_static/searchtools.js"></script></head>
+<body><div class="related"><a href="{up}index.html">ANSA documentation</a> &raquo;</div>
+<aside class="sidebar-drawer"><div class="sidebar-tree"><ul><li><a href="#">{w.title()}</a></li></ul></div></aside>
+<div class="sphinxsidebar"><h3>Navigation</h3><input type="text" name="q"/></div>
+<article role="main" itemprop="articleBody"><h1>{title}<a class="headerlink" href="#">¶</a></h1>
+{w.body(paragraphs, images)}
+</article><div class="toc-drawer"><ul><li>{w.title()}</li></ul></div>
+<div class="related-pages"><a href="#">Next</a></div><footer><div class="footer">© BETA CAE Systems</div></footer>
+</body></html>""")
+        w.pages += 1
+
+    def chapter(rel_dir, depth, count):
+        page(f'{rel_dir}/index.html', depth, w.title())
+        remaining = count - 1
+        if remaining <= 0: return
+        n_sub = w.rng.randint(0, 3) if remaining > 20 and depth < 4 else 0
+        sizes = w.split(remaining, n_sub + 1)
+        for i in range(sizes[0]):
+            page(f'{rel_dir}/page_{i:04d}.html', depth, w.title())
+        for j, size in enumerate(sizes[1:]):
+            chapter(f'{rel_dir}/section_{j:02d}', depth + 1, size)
+
+    for i, size in enumerate(w.split(pages, max(1, pages // 200))):
+        chapter(f'chapter_{i:03d}', 1, size)
+    w.write('genindex.html', '<html><head><title>Index</title></head><body></body></html>')
+    return w
+
+
+# --- ANSYS：toc_config.xml + toc.toc ---
+
+def generate_ansys(root, pages, seed=0, paragraphs=12):
+    w = _Writer(root, random.Random(seed))
+    w.image('help/common/graphics/note.gif')
+    books = w.split(pages, max(1, pages // 400))
+    book_names = []
+
+    for b, size in enumerate(books):
+        book = f'book_{b:03d}'
+        files = []      # (文件名, 锚点列表)
+        # 页面数按文件计，每个文件 1~4 个锚点，对应多个 TOC 条目
+        for i in range(size):
+            files.append((f'{book}_p{i:05d}.html', [f'sec{i}_{k}' for k in range(w.rng.randint(1, 4))]))
+        for fname, anchors in files:
+            images = ['../common/graphics/note.gif', f'graphics/{fname[:-5]}_fig.png']
+            w.image(f'help/{book}/{images[1]}')
+            w.write(f'help/{book}/{fname}', f"""<html><head><title>{w.title()}</title>
+<script src="../common/ansys.js"></script></head><body>
+<div class="navheader"><table><tr><td><a href="#">Prev</a></td><td><a href="#">Next</a></td></tr></table></div>
+<div class="section"><div class="titlepage"><h2 class="title" id="{anchors[0]}">{w.title()}</h2></div>
+{w.body(paragraphs, images, anchors[1:])}
+</div><div class="navfooter"><a href="#">Home</a></div></body></html>""")
+            w.pages += 1
+
+        entries = iter(files)
+        def dl(depth, budget):
+            out = ['<dl>']
+            while budget > 0:
+                try: fname, anchors = next(entries)
+                except StopIteration: break
+                budget -= 1
+                out.append(f'<dt><span class="chapter"><a href="{fname}#{anchors[0]}">{w.title()}</a></span></dt>')
+                if depth < 4 and budget > 3 and w.rng.random() < 0.3:
+                    take = w.rng.randint(1, min(budget, 40))
+                    budget -= take
+                    out.append('<dd>' + dl(depth + 1, take) + '</dd>')
+                # 同一页面的其余锚点作为平级条目 (各自成为节点，构建时按锚点切分页面，见 converters/sections.py)
+                for anchor in anchors[1:]:
+                    out.append(f'<dt><a href="{fname}#{anchor}">{w.title()}</a></dt>')
+            out.append('</dl>')
+            return ''.join(out)
+
+        toc = (f'<?xml version="1.0" encoding="UTF-8"?>\n<toc><title title2="{w.title()} Guide" '
+               f'href="{files[0][0]}">{book}</title>{dl(0, len(files))}</toc>')
+        w.write(f'help/{book}/toc.toc', toc)
+        book_names.append(book)
+
+    sets, pos = [], 0
+    for i, size in enumerate(w.split(len(book_names), max(1, len(book_names) // 5))):
+        group = book_names[pos:pos + size]
+        pos += size
+        books_xml = ''.join(f'<book path="{b}"/>' for b in group)
+        if i == 0 and pos < len(book_names):
+            sets.append(books_xml)      # 第一组直接挂在顶层
+        else:
+            sets.append(f'<set title="{w.title()} Set" target="{group[0]}/{group[0]}_p00000.html">{books_xml}</set>')
+    w.write('toc_config.xml', '<?xml version="1.0"?>\n<toc_config>' + ''.join(sets) + '</toc_config>')
+    return w
+
+
+# --- ABAQUS：DSSIMULIA_Established_TOC.xml + childtoc ---
+
+def generate_abaqus(root, pages, seed=0, paragraphs=12, pdf_books=3):
+    w = _Writer(root, random.Random(seed))
+    modules = w.split(pages, max(1, pages // 1500))
+    master = ['<?xml version="1.0" encoding="UTF-8"?>\n<Root>']
+
+    for m, m_size in enumerate(modules):
+        module = f'module_{m:02d}'
+        master.append(f'<ITEM name="{w.title()}" href="{module}/default.htm">')
+        w.write(f'{module}/default.htm', f'<html><body><h1>{module}</h1><div class="body"><p>{w.sentence()}</p></div></body></html>')
+        for bk, size in enumerate(w.split(m_size, max(1, m_size // 300))):
+            book = f'{module}/book_{bk:02d}'
+            items = []
+            for i in range(size):
+                fname = f'{book}/page_{i:05d}.htm'
+                images = [f'images/fig_{i % 50:02d}.png', '../../common/icons/caution.png']
+                w.image(f'{book}/{images[0]}')
+                w.image('common/icons/caution.png')
+                w.write(fname, f"""<html><head><title>{w.title()}</title><script src="../../common/sim.js"></script></head>
+<body><table class="DocHeader"><tr><td><h1 class="title topictitle1">{w.title()}</h1></td></tr></table>
+<div class="navheader">Prev | Next</div><div class="conbody">
+{''.join(f'<div class="section">{w.body(max(1, paragraphs // 3), images)}</div>' for _ in range(3))}
+</div><div class="navfooter">Home</div></body></html>""")
+                items.append(f'page_{i:05d}.htm')
+                w.pages += 1
+
+            it = iter(items)
+            def walk(depth, budget):
+                out = []
+                while budget > 0:
+                    try: href = next(it)
+                    except StopIteration: break
+                    budget -= 1
+                    if depth < 3 and budget > 2 and w.rng.random() < 0.25:
+                        take = w.rng.randint(1, min(budget, 30))
+                        budget -= take
+                        out.append(f'<ITEM title="{w.title()}" href="{href}#topic">{walk(depth + 1, take)}</ITEM>')
+                    else:
+                        out.append(f'<ITEM title="{w.title()}" href="{href}"/>')
+                return ''.join(out)
+
+            w.write(f'{book}/structure.xml', f'<?xml version="1.0" encoding="UTF-8"?>\n<TOC>{walk(0, len(items))}</TOC>')
+            master.append(f'<DITEM name="{w.title()} Guide" href="{book}/{items[0]}" childtoc="{book}/structure.xml"/>')
+
+        for p in range(pdf_books if m == 0 else 0):
+            pdf = f'pdf_books/{module}_manual_{p}.pdf'
+            w.write(pdf, '%PDF-1.4\n% synthetic\n' + w.sentence(40) * 20)
+            master.append(f'<DITEM name="{w.title()} Manual?" href="{pdf}"/>')
+        master.append('</ITEM>')
+
+    master.append('</Root>')
+    w.write('DSSIMULIA_Established_TOC.xml', ''.join(master))
+    return w
+
+
+GENERATORS = {"ansa": generate_ansa, "ansys": generate_ansys, "abaqus": generate_abaqus}
+
+def generate(fmt, root, pages, seed=0, paragraphs=12):
+    """
+    生成语料；目录中已有参数相同的语料时直接复用
+    :return: 语料参数与统计 (页面数、图片数)
+    """
+    params = {"format": fmt, "pages": pages, "seed": seed, "paragraphs": paragraphs}
+    marker = os.path.join(root, MARKER_FILE)
+    try:
+        with open(marker, 'r', encoding='utf-8') as f:
+            info = json.load(f)
+        if info.get("params") == params:
+            return info
+    except (OSError, ValueError):
+        pass
+
+    w = GENERATORS[fmt](root, pages, seed=seed, paragraphs=paragraphs)
+    info = {"params": params, "pages": w.pages, "images": w.images}
+    with open(marker, 'w', encoding='utf-8') as f:
+        json.dump(info, f)
+    return info
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="生成合成 CAE 帮助文档语料")
+    ap.add_argument("format", choices=FORMATS)
+    ap.add_argument("root", help="输出目录")
+    ap.add_argument("--pages", type=int, default=1000)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--paragraphs", type=int, default=12, help="每页段落数 (控制页面大小)")
+    args = ap.parse_args(argv)
+    info = generate(args.format, args.root, args.pages, args.seed, args.paragraphs)
+    print(json.dumps(info, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
@@ -11,14 +11,14 @@ python --version >nul 2>&1
 if %errorlevel% neq 0 (
     color 0C
     echo [ERROR] Python not found! 
-    echo Please install Python 3.x and add it to PATH.
+    echo Please install Python 3.10+ and add it to PATH.
     pause
     exit /b
 )
 
 REM 2. 自动安装/更新当前包 (静默模式，除非出错)
 echo Installing package in editable mode...
-pip install -e . 
+pip install -e .[ansa]
 if %errorlevel% neq 0 (
     color 0C
     echo [ERROR] Failed to install dependencies.
@@ -9,11 +9,16 @@ import threading
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
 from cae_doc_builder.core.engine import DocBuilderEngine
+from cae_doc_builder.core.structures import TitleIndex
+from cae_doc_builder.utils.progress import ProgressChannel, format_eta
+from cae_doc_builder.utils.logger import LogService
 from cae_doc_builder.adapters.ansys_adapter import AnsysAdapter
 from cae_doc_builder.adapters.ansa_adapter import AnsaAdapter
 from cae_doc_builder.adapters.abaqus_adapter import AbaqusAdapter
 
 CONFIG_FILE = "config.json"
+LOG_FILE = "cae_doc_builder.log"     # 按大小轮转的运行日志
+FRAME_MS = 100      # 日志与进度的界面刷新间隔
 
 class MainApplication:
     def __init__(self, root):
@@ -28,12 +33,21 @@ class MainApplication:
         self.progress_val = tk.DoubleVar(value=0)
         
         self.engine = None
-        self.tree_item_map = {}
+        self.tree_item_map = {}         # 已插入的条目 iid -> DocNode
+        self.node_item_map = {}         # id(DocNode) -> 条目 iid
+        self.unloaded_items = set()     # 子节点尚未插入 (只有占位条目) 的 iid
+        self.title_index = None
+        self.search_var = tk.StringVar()
+        self.search_matches = None      # 当前查询的匹配节点序号 (查询变化时重算)
+        self.search_pos = -1
+        self.events = ProgressChannel()     # 工作线程的日志与进度，由 _pump 按帧取回
+        self.logs = LogService(callback=self.events.log, log_file=LOG_FILE)   # 异步、限流，同时写入日志文件
         
         # 加载记忆的配置
         self._load_config()
         
         self._setup_ui()
+        self._pump()
 
     def _setup_ui(self):
         # === 1. 顶部配置栏 ===
@@ -64,16 +78,28 @@ class MainApplication:
         frame_tree = ttk.LabelFrame(paned, text="文档架构树 (多选)", padding=5)
         paned.add(frame_tree, weight=1)
         
+        # 标题搜索：回车跳到下一个匹配并展开其所在路径
+        frame_search = ttk.Frame(frame_tree)
+        frame_search.grid(row=0, column=0, columnspan=2, sticky="ew", pady=(0, 5))
+        entry_search = ttk.Entry(frame_search, textvariable=self.search_var)
+        entry_search.pack(side="left", fill="x", expand=True)
+        entry_search.bind("<Return>", lambda e: self._search_next())
+        ttk.Button(frame_search, text="🔍 查找", command=self._search_next).pack(side="left", padx=5)
+        self.lbl_search = ttk.Label(frame_search, text="", width=10)
+        self.lbl_search.pack(side="left")
+        self.search_var.trace_add("write", lambda *a: self._reset_search())
+        
         self.tree = ttk.Treeview(frame_tree, columns=("type"), selectmode="extended")
         self.tree.heading("#0", text="结构列表")
         self.tree.heading("type", text="类别")
         self.tree.column("type", width=70, anchor="center")
+        self.tree.bind("<<TreeviewOpen>>", lambda e: self._load_children(self.tree.focus()))
         
         ysb = ttk.Scrollbar(frame_tree, orient="vertical", command=self.tree.yview)
         self.tree.configure(yscrollcommand=ysb.set)
-        self.tree.grid(row=0, column=0, sticky="nsew")
-        ysb.grid(row=0, column=1, sticky="ns")
-        frame_tree.grid_rowconfigure(0, weight=1)
+        self.tree.grid(row=1, column=0, sticky="nsew")
+        ysb.grid(row=1, column=1, sticky="ns")
+        frame_tree.grid_rowconfigure(1, weight=1)
         frame_tree.grid_columnconfigure(0, weight=1)
 
         frame_log = ttk.LabelFrame(paned, text="执行日志", padding=5)
@@ -85,7 +111,7 @@ class MainApplication:
         frame_bottom = ttk.Frame(self.root, padding=10)
         frame_bottom.pack(fill="x")
         
-        self.lbl_status = ttk.Label(frame_bottom, text="就绪", width=30)
+        self.lbl_status = ttk.Label(frame_bottom, text="就绪", width=56)
         self.lbl_status.pack(side="left")
         
         # 进度条 
@@ -128,21 +154,35 @@ class MainApplication:
             self._save_config()
 
     # --- 日志与进度更新 ---
+    # 任意线程只写入事件通道，界面每 FRAME_MS 取回一次：日志批量插入，进度只显示最新状态
     def log(self, msg):
-        self.root.after(0, lambda: self._log_threadsafe(msg))
-
-    def _log_threadsafe(self, msg):
-        self.log_area.config(state='normal')
-        self.log_area.insert(tk.END, msg + "\n")
-        self.log_area.see(tk.END)
-        self.log_area.config(state='disabled')
+        self.logs(msg)
 
     def set_progress(self, val, status=None):
-        self.root.after(0, lambda: self._update_progress_ui(val, status))
+        self.events.status(val, status)
+
+    def _pump(self):
+        logs, state = self.events.poll()
+        if logs:
+            self.log_area.config(state='normal')
+            self.log_area.insert(tk.END, "\n".join(logs) + "\n")
+            self.log_area.see(tk.END)
+            self.log_area.config(state='disabled')
+        if state:
+            self._update_progress_ui(state)
+        self.root.after(FRAME_MS, self._pump)
 
-    def _update_progress_ui(self, val, status):
-        self.progress_val.set(val)
-        if status: self.lbl_status.config(text=status)
+    def _update_progress_ui(self, state):
+        self.progress_val.set(state['value'])
+        text = state['text']
+        if 'done' in state:
+            text = f"{state['done']}/{state['total']} ({state['value']:.0f}%)"
+            if state['pages_per_sec'] is not None:
+                text += f"  {state['pages_per_sec']:.1f} 页/秒"
+            if state['mb_per_sec'] is not None:
+                text += f"  {state['mb_per_sec']:.2f} MB/秒"
+            text += f"  剩余 {format_eta(state['eta'])}"
+        if text: self.lbl_status.config(text=text)
 
     # --- 业务逻辑 ---
     def _start_scan_thread(self):
@@ -165,7 +205,8 @@ class MainApplication:
             
             self.engine = DocBuilderEngine(adapter)
             root_nodes = self.engine.analyze_structure(src)
-            self.root.after(0, lambda: self._populate_tree(root_nodes))
+            index = TitleIndex(root_nodes)     # 在扫描线程中建好，界面线程只插入顶层条目
+            self.root.after(0, lambda: self._populate_tree(root_nodes, index))
         except Exception as e:
             self.log(f"❌ 扫描失败: {e}")
         finally:
@@ -177,22 +218,65 @@ class MainApplication:
         self.btn_load.config(state="normal")
         self.set_progress(100, "架构加载完成")
 
-    def _populate_tree(self, nodes):
+    def _populate_tree(self, nodes, index):
         self.tree.delete(*self.tree.get_children())
         self.tree_item_map.clear()
+        self.node_item_map.clear()
+        self.unloaded_items.clear()
+        self.title_index = index
+        self._reset_search()
         for node in nodes:
             icon = "📚" if node.is_container else "📄"
-            iid = self.tree.insert("", "end", text=f"{icon} {node.title}", values=("书籍" if node.level==1 else "章节"))
-            self.tree_item_map[iid] = node
-            self._insert_children(iid, node)
+            self._insert_node("", node, f"{icon} {node.title}", "书籍" if node.level==1 else "章节")
         self.btn_build.config(state="normal")
 
-    def _insert_children(self, parent_id, node):
-        for child in node.children:
+    def _insert_node(self, parent_id, node, text, kind):
+        iid = self.tree.insert(parent_id, "end", text=text, values=(kind,))
+        self.tree_item_map[iid] = node
+        self.node_item_map[id(node)] = iid
+        if node.children:
+            # 占位子条目：使条目显示展开箭头，首次展开时替换为真实子节点
+            self.tree.insert(iid, "end", text="…")
+            self.unloaded_items.add(iid)
+        return iid
+
+    def _load_children(self, parent_id):
+        """按需插入子节点 (展开事件或搜索定位时调用)，整棵树不会一次性插入"""
+        if parent_id not in self.unloaded_items: return
+        self.unloaded_items.discard(parent_id)
+        self.tree.delete(*self.tree.get_children(parent_id))
+        for child in self.tree_item_map[parent_id].children:
             icon = "📂" if child.is_container else "📄"
-            iid = self.tree.insert(parent_id, "end", text=f"{icon} {child.title}", values=("容器" if child.is_container else "文件"))
-            self.tree_item_map[iid] = child
-            self._insert_children(iid, child)
+            self._insert_node(parent_id, child, f"{icon} {child.title}", "容器" if child.is_container else "文件")
+
+    # --- 标题搜索 ---
+    def _reset_search(self):
+        self.search_matches = None
+        self.search_pos = -1
+        self.lbl_search.config(text="")
+
+    def _search_next(self):
+        if not self.title_index: return
+        if self.search_matches is None:
+            self.search_matches = list(self.title_index.search(self.search_var.get()))
+        if not self.search_matches:
+            self.lbl_search.config(text="无匹配")
+            return
+        self.search_pos = (self.search_pos + 1) % len(self.search_matches)
+        self.lbl_search.config(text=f"{self.search_pos + 1}/{len(self.search_matches)}")
+        self._reveal(self.search_matches[self.search_pos])
+
+    def _reveal(self, i):
+        """只展开从根到目标节点的路径，定位并选中目标"""
+        iid = None
+        for j in self.title_index.path(i):
+            if iid is not None:
+                self._load_children(iid)
+                self.tree.item(iid, open=True)
+            iid = self.node_item_map[id(self.title_index.nodes[j])]
+        self.tree.selection_set(iid)
+        self.tree.focus(iid)
+        self.tree.see(iid)
 
     def _start_build_thread(self):
         selected_ids = self.tree.selection()
@@ -219,14 +303,9 @@ class MainApplication:
 
     def _run_build(self, nodes, out):
         try:
-            # 统计总任务数用于进度条 
-            total_tasks = self._count_all_nodes(nodes)
-            self.current_count = 0
-            self.total_count = total_tasks
-            
-            # 这里我们通过 monkey patch 或者在 engine 逻辑中增加进度回调
-            # 简化方案：由于逻辑在 engine 内部，我们分批次更新
-            self.engine.build_nodes(nodes, out)
+            # 进度回调只更新事件通道中的计数，由界面按帧合并显示 (速率与剩余时间按源文件大小加权)
+            self.events.start(nodes)
+            self.engine.build_nodes(nodes, out, progress_callback=self.events.progress)
             self.set_progress(100, "✅ 构建成功！")
             messagebox.showinfo("完成", "知识库构建已结束！")
         except Exception as e:
@@ -235,13 +314,8 @@ class MainApplication:
         finally:
             self.root.after(0, lambda: self.btn_build.config(state="normal"))
 
-    def _count_all_nodes(self, nodes):
-        count = len(nodes)
-        for n in nodes:
-            count += self._count_all_nodes(n.children)
-        return count
-
 if __name__ == "__main__":
     root = tk.Tk()
     app = MainApplication(root)
     root.mainloop()
+    app.logs.close()
@@ -5,11 +5,22 @@ setup(
     version="1.0.0",
     packages=find_packages("src"),
     package_dir={"": "src"},
+    python_requires=">=3.10",   # dataclass(slots=True)
     install_requires=[
         "beautifulsoup4",
-        "markdownify",
+        "markdownify>=1.1,<2",      # converters.tree_md 使用 1.x 的内部函数
         "lxml"
     ],
+    extras_require={
+        "html5lib": ["html5lib"],
+        # ANSA 转换：converters.tree_md 向 HTML2Text 回放解析事件，固定为已验证的版本
+        "ansa": ["html2text==2025.4.15"],
+    },
+    entry_points={
+        "console_scripts": [
+            "cae-doc-builder=cae_doc_builder.cli:main",
+        ],
+    },
     author="Your Name",
     description="Tool to convert CAE documentation (Ansys, etc.) to Markdown KB",
 )
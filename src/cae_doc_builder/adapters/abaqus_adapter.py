@@ -1,29 +1,42 @@
 import os
-import shutil
 import lxml.etree as ET
-from bs4 import BeautifulSoup
-from markdownify import markdownify as md
 from .base import BaseAdapter
 from ..core.structures import DocNode
-from ..converters.html_md import ContentConverter
+from ..converters.html_md import ContentConverter, MD_OPTIONS
+from ..converters.parser_backend import make_soup
+from ..converters.sections import SectionText
+from ..converters.tree_md import tree_to_markdown
+from ..converters.large_page import LargePage, LARGE_PAGE_PARSER, is_large
 from ..utils.path_utils import PathUtils  # <--- [新增] 导入路径清洗工具
+from ..utils.file_index import FileIndex
 
 class AbaqusAdapter(BaseAdapter):
-    def __init__(self, source_root, out_root, logger_func):
+    # 文件索引可能包含数十万条路径，不传给 worker (worker 内回退到 os.path.exists)
+    TRANSIENT_ATTRS = BaseAdapter.TRANSIENT_ATTRS + ('file_index',)
+    CLEANUP_RULES = ContentConverter.CLEANUP     # 与 Ansys 相同的清洗规则
+    CONTENT_CANDIDATES = [('div', 'conbody'), ('div', 'body'), ('body', None)]
+
+    def __init__(self, source_root, out_root, logger_func=None):
         super().__init__(source_root, out_root, logger_func)
         self.master_toc = "DSSIMULIA_Established_TOC.xml"
         self.converter = ContentConverter()
         self.pdf_items = []
+        self.file_index = None      # 扫描时建立的文档根目录文件索引
+        self._href_dirs = set()     # 扫描时 href 所在的目录 (已登记为结构缓存的依赖)
 
     def parse_structure(self) -> list[DocNode]:
         """解析结构并审计 PDF (保持逻辑不变)"""
         master_path = os.path.join(self.src_root, self.master_toc)
+        self.track_dependency(master_path)
         if not os.path.exists(master_path):
             self.log(f"❌ 找不到 Abaqus 主表文件: {master_path}")
             return []
 
         root_nodes = []
         self.pdf_items = []
+        self._href_dirs = set()
+        # 一次遍历建立文件索引，之后所有 href 的存在性判断都在内存中完成
+        self.file_index = FileIndex(self.src_root)
         try:
             parser = ET.XMLParser(recover=True, encoding='utf-8')
             tree = ET.parse(master_path, parser=parser)
@@ -31,8 +44,9 @@ class AbaqusAdapter(BaseAdapter):
             # 扫描并锁定顶层编号
             for i, item in enumerate(tree.xpath("/Root/ITEM"), start=1):
                 module_name = item.get("name")
-                module_node = DocNode(title=module_name, level=1, index=i, 
-                                      source_path=self._get_abs_path("", item.get("href")), is_container=True)
+                module_path = self._get_abs_path("", item.get("href"))
+                module_node = DocNode(title=module_name, level=1, index=i, source_path=module_path, is_container=True,
+                                      anchor=self._anchor(module_path, item.get("href")))
 
                 # 扫描并锁定书籍编号 (针对 fe-safe)
                 for j, sub_item in enumerate(item.xpath("./DITEM | ./ITEM"), start=1):
@@ -43,9 +57,10 @@ class AbaqusAdapter(BaseAdapter):
                     if sub_href and sub_href.lower().endswith(".pdf"):
                         self.pdf_items.append(sub_name)
 
-                    sub_node = DocNode(title=sub_name, level=2, index=j, 
-                                        source_path=self._get_abs_path("", sub_href), 
-                                        is_container=True if child_toc_rel or sub_item.xpath("./ITEM") else False)
+                    sub_path = self._get_abs_path("", sub_href)
+                    sub_node = DocNode(title=sub_name, level=2, index=j, source_path=sub_path,
+                                        is_container=True if child_toc_rel or sub_item.xpath("./ITEM") else False,
+                                        anchor=self._anchor(sub_path, sub_href))
                     
                     if child_toc_rel:
                         self._parse_child_xml(os.path.join(self.src_root, child_toc_rel), sub_node, os.path.dirname(child_toc_rel), 3)
@@ -63,15 +78,15 @@ class AbaqusAdapter(BaseAdapter):
             self.log(f"❌ 解析出错: {str(e)}")
         return root_nodes
 
-    def read_file_content(self, node: DocNode, image_out_dir: str = None) -> str:
-        if not node.source_path or not os.path.exists(node.source_path): return ""
+    def read_file_content(self, node: DocNode, image_out_dir: str = None, source_text: str = None) -> str:
+        if not node.source_path: return ""
+        if source_text is None and not self._exists(node.source_path): return ""
         
         # === PDF 复制逻辑 (已修复特殊字符报错) ===
         if node.source_path.lower().endswith(".pdf"):
             try:
                 # 确定目标文件夹 (output/Set/assets/..) 的上一级
                 dest_dir = os.path.dirname(image_out_dir)
-                if not os.path.exists(dest_dir): os.makedirs(dest_dir)
                 
                 # [核心修复] 使用 PathUtils 清洗文件名 (例如 "What's New?" -> "What_s New_")
                 safe_title = PathUtils.sanitize_filename(node.title)
@@ -79,8 +94,8 @@ class AbaqusAdapter(BaseAdapter):
                 
                 dest_path = os.path.join(dest_dir, new_filename)
                 
-                if not os.path.exists(dest_path):
-                    shutil.copy2(node.source_path, dest_path)
+                # 由图片仓库落地 (目录或单文件输出；多进程时交给主进程)
+                self.asset_store.attach(node.source_path, dest_path)
                     
                 return None # 返回 None 表示不由 Engine 生成 .md 文件
             except Exception as e:
@@ -89,44 +104,58 @@ class AbaqusAdapter(BaseAdapter):
 
         # === Abaqus HTML 转换逻辑 ===
         try:
-            with open(node.source_path, 'r', encoding='utf-8', errors='ignore') as f:
-                soup = BeautifulSoup(f.read(), 'html.parser')
-            h1_tag = soup.find('h1')
-            header_md = md(str(h1_tag), heading_style="ATX") + "\n\n" if h1_tag else ""
-            content_area = soup.find('div', class_='conbody') or soup.find('div', class_='body') or soup.body
+            timer = self.timer
+            if source_text is None:
+                with timer.stage("read"):
+                    source_text = self.load_source(node)
+                if source_text is None: return ""
+            # 按锚点切出的小节：片段本身即正文，小节标题已包含在内
+            section = isinstance(source_text, SectionText)
+            candidates = ContentConverter.SECTION_CANDIDATES if section else self.CONTENT_CANDIDATES
+            place = self._image_placer(os.path.dirname(node.source_path), image_out_dir) if image_out_dir else None
+            if is_large(source_text, self.html_parser, self.large_page_chars):
+                return self._convert_large(source_text, candidates, not section, place)
+
+            with timer.stage("parse"):
+                soup = make_soup(source_text, self.html_parser)
+                h1_tag = None if section else soup.find('h1')
+                content_area = ContentConverter.find_content(soup, candidates)
             if not content_area: return ""
+            # 标题在清洗与图片处理之前生成 (h1 可能位于正文容器内)
+            with timer.stage("markdown"):
+                header_md = tree_to_markdown(h1_tag, heading_style="ATX") + "\n\n" if h1_tag else ""
             
-            # 清理噪音
-            for junk in content_area.select('script, style, .navheader, .navfooter'): junk.decompose()
-            
-            # 图片处理
-            self._process_abaqus_images(content_area, os.path.dirname(node.source_path), image_out_dir)
+            # 清理噪音 & 图片处理 (单次遍历)
+            self.CLEANUP_RULES.apply(content_area, place, timer)
 
-            main_md = md(str(content_area), heading_style="ATX", strip=['a'], newline_style="BACKSLASH")
+            with timer.stage("markdown"):
+                main_md = tree_to_markdown(content_area, **MD_OPTIONS)
             return header_md + main_md
         except Exception as e:
             return f"Conversion Error: {e}"
 
-    def _process_abaqus_images(self, soup_element, src_dir, graphics_dir):
-        """复用图片搬运与公式修复逻辑"""
-        for img in soup_element.find_all(['img', 'svg']):
-            alt = img.get('alt', '') or (img.title.string if img.title else '')
-            if alt and any(c in alt for c in ['=', '\\', '+']):
-                img.replace_with(f" ${alt}$ ")
-                continue
-            src = img.get('src')
-            if src and not src.startswith(('http', 'data:')) and graphics_dir:
-                abs_src = os.path.normpath(os.path.join(src_dir, src))
-                if os.path.exists(abs_src):
-                    if not os.path.exists(graphics_dir): os.makedirs(graphics_dir)
-                    fname = os.path.basename(abs_src)
-                    dst_path = os.path.join(graphics_dir, fname)
-                    if not os.path.exists(dst_path):
-                        try: shutil.copy2(abs_src, dst_path)
-                        except: pass
-                    img['src'] = f"assets/{fname}"
+    def _convert_large(self, source_text, candidates, with_header, place):
+        """大页面：标题与正文分段解析 (见 converters.large_page)，结果与整页转换相同"""
+        timer = self.timer
+        with timer.stage("parse"):
+            page = LargePage(source_text, candidates, self.CLEANUP_RULES, first=('h1',) if with_header else ())
+            h1_html = page.element_html('h1')
+            h1_tag = make_soup(h1_html, LARGE_PAGE_PARSER).h1 if h1_html else None
+        if page.container is None: return ""
+        with timer.stage("markdown"):
+            header_md = tree_to_markdown(h1_tag, heading_style="ATX") + "\n\n" if h1_tag else ""
+        return header_md + page.to_markdown(self.CLEANUP_RULES, place, timer, **MD_OPTIONS)
+
+    def _image_placer(self, src_dir, graphics_dir):
+        """图片放置回调：源文件不在索引中的图片保持原链接"""
+        def place(src):
+            abs_src = os.path.normpath(os.path.join(src_dir, src))
+            if not self._exists(abs_src): return None
+            return self.asset_store.place(abs_src, graphics_dir)
+        return place
 
     def _parse_child_xml(self, xml_path, parent_node, context_dir, level):
+        self.track_dependency(xml_path)
         try:
             parser = ET.XMLParser(recover=True, encoding='utf-8')
             tree = ET.parse(xml_path, parser=parser)
@@ -135,7 +164,8 @@ class AbaqusAdapter(BaseAdapter):
                     title = item.get("title")
                     abs_html_path = self._get_abs_path(context_dir, item.get("href"))
                     child_node = DocNode(title=title, level=current_level, index=i, source_path=abs_html_path, 
-                                         is_container=len(item.xpath("./ITEM")) > 0)
+                                         is_container=len(item.xpath("./ITEM")) > 0,
+                                         anchor=self._anchor(abs_html_path, item.get("href")))
                     current_p_node.add_child(child_node)
                     if child_node.is_container: _walk_item(item, child_node, current_level + 1)
             _walk_item(tree.getroot(), parent_node, level)
@@ -144,8 +174,10 @@ class AbaqusAdapter(BaseAdapter):
     def _walk_internal_items(self, element, current_p_node, level):
         for i, item in enumerate(element.xpath("./ITEM"), start=1):
             title = item.get("name") or item.get("title")
-            child_node = DocNode(title=title, level=level, index=i, source_path=self._get_abs_path("", item.get("href")), 
-                                 is_container=True if item.xpath("./ITEM") else False)
+            abs_path = self._get_abs_path("", item.get("href"))
+            child_node = DocNode(title=title, level=level, index=i, source_path=abs_path, 
+                                 is_container=True if item.xpath("./ITEM") else False,
+                                 anchor=self._anchor(abs_path, item.get("href")))
             current_p_node.add_child(child_node)
             if child_node.is_container: self._walk_internal_items(item, child_node, level + 1)
 
@@ -153,6 +185,22 @@ class AbaqusAdapter(BaseAdapter):
         if not href: return None
         clean_href = href.split('#')[0]
         abs_path = os.path.normpath(os.path.join(self.src_root, context_dir, clean_href))
-        return abs_path if os.path.exists(abs_path) else None
+        # 目录中增删文件会改变其 mtime：缺失的页面补齐后 (或已有页面被删除后) 结构缓存随之失效
+        folder = os.path.dirname(abs_path)
+        if folder not in self._href_dirs:
+            self._href_dirs.add(folder)
+            self.track_dependency(folder)
+        return abs_path if self._exists(abs_path) else None
+
+    @staticmethod
+    def _anchor(abs_path, href):
+        """href 中的 #锚点 (文件存在时才保留，用于按小节切分页面)"""
+        if not abs_path or not href: return None
+        return href.partition('#')[2] or None
+
+    def _exists(self, path):
+        if self.file_index is not None:
+            return self.file_index.exists(path)
+        return os.path.exists(path)
 
     def process_task(self, task): pass
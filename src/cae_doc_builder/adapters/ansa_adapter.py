@@ -1,9 +1,12 @@
 import os
-import shutil
 import re
-from bs4 import BeautifulSoup
+import html
 from .base import BaseAdapter
 from ..core.structures import DocNode
+from ..converters.parser_backend import make_soup
+from ..converters.tree_md import tree_to_html2text
+from ..converters.cleanup import CleanupRules
+from ..utils.disk_cache import FileStampCache
 
 # 尝试导入 html2text
 try:
@@ -12,6 +15,9 @@ try:
 except ImportError:
     HAS_HTML2TEXT = False
 
+# 快速标题提取：只在文件头部匹配 <title>
+TITLE_RE = re.compile(r'<title[^>]*>(.*?)</title\s*>', re.IGNORECASE | re.DOTALL)
+
 class AnsaAdapter(BaseAdapter):
     """
     ANSA 适配器 (深度修复版)
@@ -19,9 +25,25 @@ class AnsaAdapter(BaseAdapter):
     修复点：
     1. 增强标题解析逻辑，彻底移除 "- ANSA documentation" 后缀。
     2. 恢复 ver1 中完整的噪音选择器，移除侧边栏、右侧目录、页脚等冗余内容。
+    3. 扫描阶段只读取文件头部提取标题，并按 (路径, mtime) 持久化缓存。
     """
+    TITLE_HEAD_CHARS = 16384    # 快速路径读取的字符数 (Sphinx 页面的 <title> 通常在前 2KB 内)
+    CONVERTER_VERSION = "2"     # 2: 每页使用独立的 HTML2Text 实例
+
+    # 恢复 ver1 中所有已验证的 ANSA 噪音选择器 (编译为单次遍历的清洗规则)
+    CLEANUP_RULES = CleanupRules(drop=[
+        "div.sphinxsidebar",    # 侧边栏
+        "div.related",          # 面包屑导航
+        "div.footer", "footer", # 页脚
+        "div.related-pages",    # 下一页/上一页按钮
+        "a.headerlink",         # 段落符号 ¶
+        "script", "style",      # 代码与样式
+        "div.toc-drawer",       # 右侧小目录
+        "aside",                # 侧边栏辅助容器
+        "a.sd-stretched-link"   # 某些卡片主题的覆盖链接
+    ])
     
-    def __init__(self, source_root, out_root, logger_func):
+    def __init__(self, source_root, out_root, logger_func=None):
         super().__init__(source_root, out_root, logger_func)
         
         # 定义忽略列表 (系统文件、垃圾文件夹)
@@ -30,19 +52,24 @@ class AnsaAdapter(BaseAdapter):
             'search', 'genindex', '.idea', '__pycache__', 'doctrees'
         }
         self.IGNORE_FILES = {'genindex.html', 'search.html', 'licattr.html', '404.html'}
-        
-        # 初始化转换器
-        if HAS_HTML2TEXT:
-            self.converter = html2text.HTML2Text()
-            self.converter.ignore_links = False
-            self.converter.ignore_images = False
-            self.converter.body_width = 0
-            self.converter.protect_links = True
+        self._title_cache = None
+
+    @staticmethod
+    def _make_converter():
+        """HTML2Text 实例在 handle() 之间保留换行等内部状态，每个页面使用新实例，输出与处理顺序无关"""
+        converter = html2text.HTML2Text()
+        converter.ignore_links = False
+        converter.ignore_images = False
+        converter.body_width = 0
+        converter.protect_links = True
+        return converter
 
     def parse_structure(self) -> list[DocNode]:
         """扫描结构并锁定物理编号"""
         self.log(f"🚀 [ANSA] 开始深度扫描结构: {self.src_root}")
         root_nodes = []
+        self._title_cache = FileStampCache("ansa-titles", self.src_root)
+        self.track_dependency(self.src_root)
         try:
             # 保证扫描顺序
             items = sorted([d for d in os.listdir(self.src_root) if d not in self.IGNORE_DIRS])
@@ -52,6 +79,10 @@ class AnsaAdapter(BaseAdapter):
                 if node: root_nodes.append(node)
         except Exception as e:
             self.log(f"❌ ANSA 扫描异常: {e}")
+        finally:
+            # 缓存只在扫描期间使用，释放后适配器传给 worker 进程时不会携带
+            self._title_cache.save()
+            self._title_cache = None
         return root_nodes
 
     def _build_node_recursive(self, current_path, level, index):
@@ -61,9 +92,12 @@ class AnsaAdapter(BaseAdapter):
             index_path = os.path.join(current_path, 'index.html')
             
             node = DocNode(title=folder_name, level=level, index=index, is_container=True)
+            # 目录 mtime 反映文件增删，页面 mtime 反映标题变化
+            self.track_dependency(current_path)
             
             if os.path.exists(index_path):
                 node.source_path = index_path
+                self.track_dependency(index_path)
                 # 提取标题并过滤掉后缀
                 real_title = self._extract_title_from_html(index_path)
                 if real_title: node.title = real_title
@@ -85,6 +119,7 @@ class AnsaAdapter(BaseAdapter):
         
         elif current_path.endswith('.html'):
             if os.path.basename(current_path).lower() == 'index.html': return None
+            self.track_dependency(current_path)
             title = self._extract_title_from_html(current_path) or os.path.basename(current_path).replace('.html', '')
             return DocNode(title=title, level=level, index=index, source_path=current_path)
         
@@ -92,19 +127,48 @@ class AnsaAdapter(BaseAdapter):
 
     def _extract_title_from_html(self, path):
         """
-        [修复点 1] 增强的标题提取与后缀过滤逻辑
+        [修复点 3] 带持久化缓存的标题提取：缓存 -> 文件头部快速匹配 -> 完整解析
         """
+        cache = self._title_cache
+        stamp = FileStampCache.stamp(path) if cache is not None else None
+        if stamp is not None:
+            hit, title = cache.get(path, stamp)
+            if hit: return title
+
+        title = self._extract_title_fast(path) or self._extract_title_full(path)
+        if stamp is not None:
+            cache.put(path, stamp, title)
+        return title
+
+    def _extract_title_fast(self, path):
+        """只读取文件头部并用正则匹配 <title>，未命中时返回 None 交由完整解析兜底"""
         try:
             with open(path, 'r', encoding='utf-8', errors='ignore') as f:
-                soup = BeautifulSoup(f, 'html.parser')
+                head = f.read(self.TITLE_HEAD_CHARS)
+        except OSError:
+            return None
+        m = TITLE_RE.search(head)
+        if not m: return None
+        return self._clean_title(html.unescape(m.group(1))) or None
+
+    @staticmethod
+    def _clean_title(raw_title):
+        # 匹配多种分隔符：短横线、长横线、竖线
+        # 过滤掉 "ANSA documentation" 或 "ANSA xxx documentation"
+        clean_title = re.split(r'[-—|]', raw_title)[0].strip()
+        # 针对 ANSA 特有的后缀进行二次清理
+        return re.sub(r'\s+ANSA\s+documentation$', '', clean_title, flags=re.IGNORECASE)
+
+    def _extract_title_full(self, path):
+        """
+        [修复点 1] 增强的标题提取与后缀过滤逻辑 (完整解析，作为快速路径的兜底)
+        """
+        try:
+            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+                soup = make_soup(f, self.html_parser)
                 # 1. 优先从网页 <title> 提取
                 if soup.title:
-                    raw_title = soup.title.get_text()
-                    # 匹配多种分隔符：短横线、长横线、竖线
-                    # 过滤掉 "ANSA documentation" 或 "ANSA xxx documentation"
-                    clean_title = re.split(r'[-—|]', raw_title)[0].strip()
-                    # 针对 ANSA 特有的后缀进行二次清理
-                    clean_title = re.sub(r'\s+ANSA\s+documentation$', '', clean_title, flags=re.IGNORECASE)
+                    clean_title = self._clean_title(soup.title.get_text())
                     if clean_title: return clean_title
 
                 # 2. 次选 H1
@@ -113,67 +177,54 @@ class AnsaAdapter(BaseAdapter):
         except: pass
         return None
 
-    def read_file_content(self, node: DocNode, image_out_dir: str = None) -> str:
+    def read_file_content(self, node: DocNode, image_out_dir: str = None, source_text: str = None) -> str:
         """
         [修复点 2] 恢复 ver1 中完整的噪音清洗逻辑
         """
-        if not node.source_path or not os.path.exists(node.source_path): return ""
+        if not node.source_path: return ""
+        if source_text is None and not os.path.exists(node.source_path): return ""
 
         try:
-            with open(node.source_path, 'r', encoding='utf-8', errors='ignore') as f:
-                soup = BeautifulSoup(f.read(), 'html.parser')
-
-            # 恢复 ver1 中所有已验证的 ANSA 噪音选择器
-            noise_selectors = [
-                "div.sphinxsidebar",    # 侧边栏
-                "div.related",          # 面包屑导航
-                "div.footer", "footer", # 页脚
-                "div.related-pages",    # 下一页/上一页按钮
-                "a.headerlink",         # 段落符号 ¶
-                "script", "style",      # 代码与样式
-                "div.toc-drawer",       # 右侧小目录
-                "aside",                # 侧边栏辅助容器
-                "a.sd-stretched-link"   # 某些卡片主题的覆盖链接
-            ]
-            for selector in noise_selectors:
-                for tag in soup.select(selector):
-                    tag.decompose()
-
-            # 定位核心正文 (按照 ANSA 常用主题优先级)
-            content = soup.find('div', role='main') or \
-                      soup.find('div', itemprop='articleBody') or \
-                      soup.find('article') or \
-                      soup.body
-            
-            if not content: content = soup
-
-            # 搬运图片
-            if image_out_dir:
-                self._handle_images(content, node.source_path, image_out_dir)
+            timer = self.timer
+            if source_text is None:
+                with timer.stage("read"):
+                    with open(node.source_path, 'r', encoding='utf-8', errors='ignore') as f:
+                        source_text = f.read()
+            with timer.stage("parse"):
+                soup = make_soup(source_text, self.html_parser)
+                content = self._find_content(soup)
+
+            # 噪音只需在正文内清除；正文容器本身落在噪音元素内时 (极少见) 先整页清洗再重新定位
+            rules = self.CLEANUP_RULES
+            if content is not soup and rules.dropped(content):
+                rules.apply(soup, None, timer)
+                content = self._find_content(soup)
+
+            # 清洗 & 搬运图片 (单次遍历)
+            place = self._image_placer(node.source_path, image_out_dir) if image_out_dir else None
+            rules.apply(content, place, timer)
 
             # 转换 Markdown
-            if HAS_HTML2TEXT:
-                return self.converter.handle(str(content))
-            else:
-                return content.get_text(separator='\n\n', strip=True)
+            with timer.stage("markdown"):
+                if HAS_HTML2TEXT:
+                    return tree_to_html2text(content, self._make_converter())
+                else:
+                    return content.get_text(separator='\n\n', strip=True)
 
         except Exception as e:
             self.log(f"⚠️ ANSA 内容提取失败 {node.source_path}: {e}")
             return ""
 
-    def _handle_images(self, soup_element, html_path, out_dir):
+    @staticmethod
+    def _find_content(soup):
+        """定位核心正文 (按照 ANSA 常用主题优先级)"""
+        return soup.find('div', role='main') or \
+               soup.find('div', itemprop='articleBody') or \
+               soup.find('article') or \
+               soup.body or soup
+
+    def _image_placer(self, html_path, out_dir):
         src_dir = os.path.dirname(html_path)
-        if not os.path.exists(out_dir): os.makedirs(out_dir)
-        for img in soup_element.find_all(['img', 'svg']):
-            src = img.get('src')
-            if src and not src.startswith(('http', 'data:')):
-                abs_src = os.path.normpath(os.path.join(src_dir, src))
-                if os.path.exists(abs_src):
-                    fname = os.path.basename(abs_src)
-                    dst_path = os.path.join(out_dir, fname)
-                    if not os.path.exists(dst_path):
-                        try: shutil.copy2(abs_src, dst_path)
-                        except: pass
-                    img['src'] = f"assets/{fname}"
+        return lambda src: self.asset_store.place(os.path.normpath(os.path.join(src_dir, src)), out_dir)
 
     def process_task(self, task): pass
@@ -0,0 +1,163 @@
+"""
+Ansys toc.toc 解析器
+
+toc.toc 的结构为 <title> + 嵌套的 <dl>/<dt>/<dd>：dt 内的 <a> 是章节，紧随其后的 dd
+内的第一个 <dl> 是它的子目录。这里用 lxml.iterparse 流式解析：每个 <dl> 结束时即
+生成其直接子节点并清空已处理的元素，内存只与目录深度相关；书籍之间互不依赖，
+parse_book_toc 为模块级函数，可直接交给进程池并行执行。
+
+href 中的 #锚点 保留在 DocNode.anchor 上：同一 <dl> 内指向同一文件不同锚点的条目各自
+成为节点 (构建时按锚点切分页面)，只有 href 完全相同的条目才去重。
+
+解析失败时回退到 BeautifulSoup 实现，两者产出的 DocNode 树完全一致。
+"""
+import os
+from lxml import etree
+from bs4 import BeautifulSoup
+from ..core.structures import DocNode, flatten_tree
+
+def parse_book_toc(toc_path, book_dir, level, index):
+    """
+    解析单本书的 toc.toc
+    :return: 书籍 DocNode；toc.toc 不存在时返回 None
+    """
+    if not os.path.exists(toc_path): return None
+    try:
+        return _parse_streaming(toc_path, book_dir, level, index)
+    except etree.LxmlError:
+        return _parse_with_soup(toc_path, book_dir, level, index)
+
+def split_href(href):
+    """'file.html#sec' -> ('file.html', 'sec')，无锚点时锚点为 None"""
+    path, _, anchor = (href or '').partition('#')
+    return path, anchor or None
+
+def parse_book_toc_packed(args):
+    """进程池入口：返回 flatten_tree 格式，跨进程传输比 DocNode 对象更省"""
+    book = parse_book_toc(*args)
+    return flatten_tree([book]) if book else None
+
+
+# --- lxml 流式实现 ---
+
+def _parse_streaming(toc_path, book_dir, level, index):
+    title_el = None
+    root_dl = None
+    built = {}      # 已结束的 <dl> -> 其直接子节点列表
+
+    for event, el in etree.iterparse(toc_path, events=('start', 'end'), tag=('title', 'dl'), recover=True):
+        if event == 'start':
+            if el.tag == 'dl' and root_dl is None:
+                root_dl = el
+            continue
+        if el.tag == 'title':
+            if title_el is None: title_el = el
+        else:
+            built[el] = _build_dl(el, built, book_dir)
+            if el is root_dl and title_el is not None:
+                break
+
+    title = title_el.get('title2') or ''.join(title_el.itertext()).strip()
+    node = DocNode(title=title, level=level, index=index, is_container=root_dl is not None)
+    _set_source(node, title_el.get('href'), book_dir)
+    if root_dl is not None:
+        node.children = built.get(root_dl, [])
+        _assign_levels(node.children, level + 1)
+    return node
+
+def _build_dl(dl, built, book_dir):
+    """生成 <dl> 的直接子节点 (层级稍后统一赋值)，子 <dl> 已在之前的 end 事件中构建完毕"""
+    items = [c for c in dl if c.tag in ('dt', 'dd')]
+    nodes, processed_hrefs = [], set()
+    node_idx = 1
+    for pos, item in enumerate(items):
+        if item.tag != 'dt': continue
+        a = item.find('.//a')
+        if a is None: continue
+        title = ''.join(a.itertext()).strip()
+        href = a.get('href') or ''
+
+        if split_href(href)[0] and href in processed_hrefs: continue
+        processed_hrefs.add(href)
+
+        # 检查紧随其后的元素是否为 dd 且包含子列表
+        dd = items[pos + 1] if pos + 1 < len(items) and items[pos + 1].tag == 'dd' else None
+        child_dl = dd.find('.//dl') if dd is not None else None
+
+        child_node = DocNode(title=title, level=0, index=node_idx, is_container=child_dl is not None)
+        _set_source(child_node, href, book_dir)
+        if child_dl is not None:
+            child_node.children = built.pop(child_dl, [])
+        nodes.append(child_node)
+        node_idx += 1
+
+    # 子树已转为 DocNode，释放元素内容 (保留 <dl> 本身供上层 dd.find 定位)
+    for item in items:
+        item.clear()
+    return nodes
+
+def _set_source(node, href, book_dir):
+    path, anchor = split_href(href)
+    if path:
+        node.source_path = os.path.normpath(os.path.join(book_dir, path))
+        node.anchor = anchor
+
+def _assign_levels(nodes, level):
+    stack = [(nodes, level)]
+    while stack:
+        siblings, lv = stack.pop()
+        for node in siblings:
+            node.level = lv
+            if node.children:
+                stack.append((node.children, lv + 1))
+
+
+# --- BeautifulSoup 兜底实现 (原解析逻辑) ---
+
+def _parse_with_soup(toc_path, book_dir, level, index):
+    with open(toc_path, 'r', encoding='utf-8', errors='ignore') as f:
+        soup = BeautifulSoup(f.read(), 'xml')
+
+    title_tag = soup.find('title')
+    title = title_tag.get('title2') or title_tag.get_text().strip()
+
+    root_dl = soup.find('dl')
+    is_container = root_dl is not None
+
+    node = DocNode(title=title, level=level, index=index, is_container=is_container)
+    _set_source(node, title_tag.get('href'), book_dir)
+
+    if is_container:
+        _recursive_parse_dl(root_dl, node, book_dir, level + 1)
+    return node
+
+def _recursive_parse_dl(dl, parent_node, book_dir, level):
+    processed_hrefs = set()
+    elements = dl.find_all(['dt', 'dd'], recursive=False)
+    idx, node_idx = 0, 1
+    while idx < len(elements):
+        item = elements[idx]
+        if item.name == 'dt':
+            a = item.find('a')
+            if a:
+                title = a.get_text().strip()
+                href = a.get('href', '')
+
+                if split_href(href)[0] and href in processed_hrefs:
+                    idx += 1
+                    continue
+                processed_hrefs.add(href)
+
+                # 检查紧随其后的元素是否为 dd 且包含子列表
+                dd = elements[idx+1] if idx+1 < len(elements) and elements[idx+1].name == 'dd' else None
+                child_dl = dd.find('dl') if dd else None
+                has_child = child_dl is not None
+
+                child_node = DocNode(title=title, level=level, index=node_idx, is_container=has_child)
+                _set_source(child_node, href, book_dir)
+
+                parent_node.add_child(child_node)
+                if has_child:
+                    _recursive_parse_dl(child_dl, child_node, book_dir, level + 1)
+                node_idx += 1
+        idx += 1
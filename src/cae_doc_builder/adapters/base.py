@@ -1,12 +1,106 @@
+import os
+import threading
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from ..utils.asset_store import AssetStore
+from ..converters.parser_backend import DEFAULT_PARSER
+from ..converters.sections import split_sections
+from ..converters.large_page import LARGE_PAGE_CHARS
+from ..utils.profiler import NULL_TIMER
+from ..utils.logger import log_message
 
 class BaseAdapter(ABC):
-    def __init__(self, src_root, out_root, logger_func):
+    # 转换逻辑版本：输出格式发生变化时递增，使增量构建清单失效
+    CONVERTER_VERSION = "2"     # 2: 按 #锚点 切分页面
+    SECTION_CACHE_FILES = 8     # 保留切分结果的文件数 (同一文件的节点在构建计划中通常相邻)
+
+    def __init__(self, src_root, out_root, logger_func=None):
+        """:param logger_func: 日志函数 log(msg)，通常为 utils.logger.LogService (异步、限流)；None 时写入包日志器 (未配置 logging 时 print)"""
         self.src_root = src_root
         self.out_root = out_root
-        self.log = logger_func
+        self.log = logger_func if logger_func is not None else log_message
+        self.asset_store = AssetStore()     # 构建级图片仓库，由 Engine 在每次构建前重置
+        self.scan_dependencies = []         # 扫描时读取的 TOC 文件/目录，用于校验结构缓存
+        self.html_parser = DEFAULT_PARSER   # HTML 解析后端，见 converters.parser_backend
+        self.timer = NULL_TIMER             # 当前页面的阶段计时器，由 Engine 在开启性能分析时设置
+        self.large_page_chars = LARGE_PAGE_CHARS    # 超过该字符数的页面分段解析 (0 为关闭)，见 converters.large_page
+        self.section_anchors = {}           # 被目录以 #锚点 引用的文件 -> 锚点集合，见 index_sections
+        self._init_section_cache()
+
+    def _init_section_cache(self):
+        self._section_cache = OrderedDict()     # 源文件 -> (全文, 各锚点片段)
+        self._section_lock = threading.Lock()
+
+    def index_sections(self, nodes):
+        """
+        登记节点树中带锚点的 href (替换之前登记的)，这些文件在读取时按锚点切分，每个节点只转换自己的小节；
+        同一文件中不带锚点的节点 (如书籍介绍页) 只得到第一个被引用锚点之前的部分，可能为空
+        """
+        anchors = {}
+        stack = list(nodes)
+        while stack:
+            node = stack.pop()
+            if node.anchor and node.source_path:
+                anchors.setdefault(os.path.normcase(node.source_path), set()).add(node.anchor)
+            stack.extend(node.children)
+        self.section_anchors = anchors
+        with self._section_lock:
+            self._section_cache.clear()
+
+    def load_source(self, node):
+        """
+        读取阶段：返回 HTML 源页面文本；非 HTML 或读取失败时返回 None (转换时再自行处理)
+        页面被多个锚点引用时只读取、切分一次，返回本节点对应的 SectionText 片段 (锚点不存在时返回整页)
+        """
+        path = node.source_path
+        if not path or not path.lower().endswith(('.htm', '.html')): return None
+        anchors = self.section_anchors.get(os.path.normcase(path))
+        if not anchors:
+            return self._read_text(path)
+
+        with self._section_lock:
+            entry = self._section_cache.get(path)
+            if entry is None:
+                text = self._read_text(path)
+                if text is None: return None
+                entry = self._section_cache[path] = (text, split_sections(text, anchors))
+                while len(self._section_cache) > self.SECTION_CACHE_FILES:
+                    self._section_cache.popitem(last=False)
+            else:
+                self._section_cache.move_to_end(path)
+        text, sections = entry
+        return sections.get(node.anchor, text)
+
+    @staticmethod
+    def _read_text(path):
+        try:
+            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def track_dependency(self, path):
+        """登记扫描结果所依赖的文件或目录 (其 mtime 变化将使结构缓存失效)"""
+        self.scan_dependencies.append(path)
 
     @abstractmethod
     def process_task(self, task):
         """处理单个构建任务"""
         pass
+
+    # --- 多进程支持：以下属性不随适配器传给 worker 进程 ---
+    # 日志回调 (如 GUI 方法) 无法 pickle；子类可追加体积较大的扫描期索引
+    TRANSIENT_ATTRS = ('log', '_section_cache', '_section_lock')
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for name in self.TRANSIENT_ATTRS:
+            state.pop(name, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        for name in self.TRANSIENT_ATTRS:
+            setattr(self, name, None)
+        self.log = log_message
+        self._init_section_cache()
@@ -0,0 +1,166 @@
+"""
+命令行入口 (无界面批量构建)
+
+    cae-doc-builder ANSYS D:/ANSYS/help/en-us D:/KB --select "Mechanical*" -j 8 --incremental
+    cae-doc-builder ABAQUS /opt/docs/English out --list --depth 2
+    cae-doc-builder ANSA D:/ANSA/docs D:/KB.zip -j 8        # 输出为单个 zip (亦支持 .tar.gz / .sqlite)
+
+--select 按标题路径选择子树：以 / 分隔各级标题，每级支持 * ? [] 通配 (不区分大小写)，
+** 匹配任意多级。未指定 --select 时构建全部顶层节点。
+不依赖 tkinter，可在无显示环境 (定时任务、Linux 构建服务器) 中运行。
+"""
+import os
+import sys
+import time
+import argparse
+from fnmatch import fnmatchcase
+from .core.engine import DocBuilderEngine
+from .utils.logger import LogService, LEVELS
+from .converters.parser_backend import PARSER_BACKENDS, resolve_parser
+from .adapters.ansa_adapter import AnsaAdapter
+from .adapters.ansys_adapter import AnsysAdapter
+from .adapters.abaqus_adapter import AbaqusAdapter
+
+ADAPTERS = {"ANSA": AnsaAdapter, "ANSYS": AnsysAdapter, "ABAQUS": AbaqusAdapter}
+
+
+def _split_pattern(pattern):
+    return [seg.strip().lower() for seg in pattern.strip('/').split('/') if seg.strip()]
+
+def _match_path(segments, titles):
+    """segments 为小写的通配段，titles 为从顶层到当前节点的小写标题"""
+    if not segments: return not titles
+    head, rest = segments[0], segments[1:]
+    if head == '**':
+        return any(_match_path(rest, titles[i:]) for i in range(len(titles) + 1))
+    return bool(titles) and fnmatchcase(titles[0], head) and _match_path(rest, titles[1:])
+
+def select_nodes(nodes, patterns):
+    """
+    按标题路径通配选择子树 (先序)
+    命中的节点不再向下匹配，与 GUI 的祖先去重规则一致：父节点已选中时子节点由其递归构建。
+    :return: (选中的节点列表, 未命中任何节点的模式列表)
+    """
+    compiled = [(p, _split_pattern(p)) for p in patterns]
+    selected, hits = [], set()
+
+    def walk(siblings, titles):
+        for node in siblings:
+            path = titles + [(node.title or '').strip().lower()]
+            matched = [p for p, segs in compiled if _match_path(segs, path)]
+            if matched:
+                selected.append(node)
+                hits.update(matched)
+            elif node.children:
+                walk(node.children, path)
+
+    walk(nodes, [])
+    return selected, [p for p in patterns if p not in hits]
+
+def print_tree(nodes, depth=None, out=None, _level=0):
+    out = out or sys.stdout     # 调用时取当前的 sys.stdout (可能已被重定向)
+    for node in nodes:
+        mark = '+' if node.is_container else '-'
+        out.write(f"{'  ' * _level}{mark} {node.title}\n")
+        if node.children and (depth is None or _level + 1 < depth):
+            print_tree(node.children, depth, out, _level + 1)
+
+
+class _Progress:
+    """终端下单行刷新；重定向到文件时每 10% 输出一行"""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stderr
+        self.tty = stream.isatty()
+        self.started = time.perf_counter()
+        self._last = -1
+
+    def __call__(self, done, total):
+        pct = done * 100 // total if total else 100
+        elapsed = time.perf_counter() - self.started
+        rate = done / elapsed if elapsed > 0 else 0.0
+        line = f"[{done}/{total}] {pct}%  {rate:.1f} 页/秒"
+        if self.tty:
+            self.stream.write('\r' + line + ('\n' if done >= total else ''))
+            self.stream.flush()
+        elif pct // 10 != self._last or done >= total:
+            self._last = pct // 10
+            self.stream.write(line + '\n')
+
+
+def build_parser():
+    ap = argparse.ArgumentParser(prog="cae-doc-builder", description="CAE 帮助文档 → Markdown 知识库 (命令行构建)")
+    ap.add_argument("adapter", type=str.upper, choices=sorted(ADAPTERS), help="文档类型")
+    ap.add_argument("source", help="文档源目录")
+    ap.add_argument("output", nargs="?",
+                    help="输出目录，或 .zip/.tar/.tar.gz/.tgz/.sqlite/.db 单文件 (--list 时可省略)")
+    ap.add_argument("-s", "--select", action="append", default=[], metavar="PATTERN",
+                    help="按标题路径选择子树，可重复，如 \"Mechanical*/Contact*\" 或 \"**/Release Notes\"")
+    ap.add_argument("--list", action="store_true", help="只打印目录结构，不构建")
+    ap.add_argument("--depth", type=int, help="--list 显示的层数")
+    ap.add_argument("-j", "--jobs", type=int, default=1, help="转换进程数 (默认 1，0 为 CPU 核数)")
+    ap.add_argument("--read-jobs", type=int, default=4, help="读取线程数")
+    ap.add_argument("--write-jobs", type=int, default=2, help="写入线程数")
+    ap.add_argument("--incremental", action="store_true", help="增量构建：跳过未变化的页面并清理孤立输出")
+    ap.add_argument("--hash", action="store_true", help="增量模式下 mtime 变化时再比对内容哈希")
+    ap.add_argument("--no-cache", action="store_true", help="忽略结构缓存，重新扫描")
+    ap.add_argument("--parser", choices=PARSER_BACKENDS, help="HTML 解析后端")
+    ap.add_argument("--profile", action="store_true", help="记录分阶段耗时，写出 .build_profile.json")
+    ap.add_argument("--profile-top", type=int, default=20, help="报告中列出的最慢页面数")
+    ap.add_argument("--profile-memory", action="store_true", help="同时记录每个页面的内存峰值 (tracemalloc，构建变慢)")
+    ap.add_argument("--large-page-mb", type=float, help="超过该大小 (MB) 的页面分段解析以限制内存，0 为关闭 (默认 2)")
+    ap.add_argument("--search-index", action="store_true",
+                    help="同时维护输出目录下的 SQLite 全文索引 .kb_index.sqlite (增量更新)")
+    ap.add_argument("--rag-chunks", action="store_true",
+                    help="同时按标题切分页面，写出 RAG 分块 JSONL (输出目录下 rag_chunks/)")
+    ap.add_argument("--chunk-chars", type=int, default=2000, help="每个 RAG 分块的最大字符数")
+    ap.add_argument("-q", "--quiet", action="store_true", help="不输出适配器日志与进度")
+    ap.add_argument("--log-level", type=str.upper, choices=LEVELS, default="INFO", help="日志级别")
+    ap.add_argument("--log-file", help="同时写入日志文件 (按 5 MB 轮转，--quiet 时仍写入)")
+    return ap
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if not args.list and not args.output:
+        sys.exit("错误: 需要指定输出目录 (或使用 --list)")
+    if not os.path.isdir(args.source):
+        sys.exit(f"错误: 源目录不存在: {args.source}")
+
+    with LogService(callback=None if args.quiet else print, level=args.log_level, log_file=args.log_file) as log:
+        return _run(args, log)
+
+def _run(args, log):
+    adapter = ADAPTERS[args.adapter](args.source, ".", log)
+    if args.parser:
+        resolve_parser(args.parser)     # 未安装的后端在扫描前报错
+        adapter.html_parser = args.parser
+    if args.large_page_mb is not None:
+        adapter.large_page_chars = int(args.large_page_mb * 1024 * 1024)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    engine = DocBuilderEngine(adapter, jobs=jobs, read_jobs=args.read_jobs, write_jobs=args.write_jobs)
+
+    nodes = engine.analyze_structure(args.source, use_cache=not args.no_cache)
+    if not nodes:
+        sys.exit("错误: 未扫描到任何目录节点")
+
+    if args.select:
+        nodes, missed = select_nodes(nodes, args.select)
+        for pattern in missed:
+            print(f"⚠️ 未匹配任何节点: {pattern}", file=sys.stderr)
+        if not nodes:
+            sys.exit("错误: --select 未选中任何节点")
+
+    if args.list:
+        print_tree(nodes, args.depth)
+        return 0
+
+    started = time.perf_counter()
+    engine.build_nodes(nodes, args.output, progress_callback=None if args.quiet else _Progress(),
+                       incremental=args.incremental, use_hash=args.hash,
+                       profile=args.profile, profile_top=args.profile_top, profile_memory=args.profile_memory,
+                       search_index=args.search_index, export_chunks=args.rag_chunks, chunk_chars=args.chunk_chars)
+    log(f"✅ 构建完成：{engine.total_nodes} 个节点，用时 {time.perf_counter() - started:.1f} 秒。")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1 +1,3 @@
 from .html_md import ContentConverter
+from .cleanup import CleanupRules
+from .parser_backend import PARSER_BACKENDS, DEFAULT_PARSER, resolve_parser, make_soup
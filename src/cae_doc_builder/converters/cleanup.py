@@ -0,0 +1,161 @@
+"""
+编译式清洗规则 (单次遍历)
+
+各厂商主题的清洗规则以声明方式给出：
+    drop      删除整个元素 (导航栏、侧边栏、脚本等)
+    unwrap    去掉标签本身、保留其内容
+    formula   alt (或 svg 的 <title>) 形如公式的 <img>/<svg> 替换为 $...$
+    images    本地图片交给 place 回调放入 assets/，并改写 src
+
+规则在创建时编译为按标签名分桶的匹配表，apply() 一次先序遍历完成全部处理，
+取代逐个选择器的 soup.select 与单独的图片遍历。被删除的子树不再向下遍历，其中的图片也不会被复制。
+
+选择器支持 CSS 的简单复合形式：tag、.class、#id、[attr]、[attr=value] 及其组合
+(如 div.related-pages、a.sd-stretched-link)，多个选择器以逗号分隔；不支持组合符与伪类。
+"""
+import re
+import time
+from bs4 import Tag
+from ..utils.profiler import NULL_TIMER
+
+SELECTOR_RE = re.compile(r'(\*|[a-zA-Z][\w-]*)?((?:[.#][\w-]+|\[[\w:-]+(?:=(?:"[^"]*"|\'[^\']*\'|[^\]\'"]*))?\])*)\Z')
+PART_RE = re.compile(r'([.#])([\w-]+)|\[([\w:-]+)(?:=("[^"]*"|\'[^\']*\'|[^\]\'"]*))?\]')
+IMAGE_TAGS = ('img', 'svg')
+FORMULA_CHARS = ('=', '\\', '+')
+DROP, UNWRAP = 'drop', 'unwrap'
+
+
+def compile_selector(selector):
+    """
+    'div.footer' -> ('div', frozenset({'footer'}), ())
+    :return: (标签名，任意标签为 '*'; 必须包含的类名; ((属性, 值或 None), ...))
+    """
+    m = SELECTOR_RE.match(selector.strip())
+    if not m or not selector.strip():
+        raise ValueError(f"不支持的清洗选择器: {selector!r}")
+    classes, attrs = set(), []
+    for prefix, ident, attr, value in PART_RE.findall(m.group(2)):
+        if prefix == '.':
+            classes.add(ident)
+        elif prefix == '#':
+            attrs.append(('id', ident))
+        else:
+            attrs.append((attr.lower(), value.strip('"\'') if value else None))
+    return (m.group(1) or '*').lower(), frozenset(classes), tuple(attrs)
+
+def _split(selectors):
+    if isinstance(selectors, str):
+        selectors = selectors.split(',')
+    return [s for s in (s.strip() for s in selectors) if s]
+
+def _matches(tag_attrs, classes, attrs):
+    if classes:
+        have = tag_attrs.get('class')
+        if not have or not classes.issubset(have): return False
+    for name, value in attrs:
+        have = tag_attrs.get(name)
+        if have is None: return False
+        if value is not None:
+            if isinstance(have, list): have = ' '.join(have)
+            if have != value: return False
+    return True
+
+
+class CleanupRules:
+    """一个厂商主题的清洗规则 (创建时编译，可在多个页面/进程间共享)"""
+
+    def __init__(self, drop=(), unwrap=(), formula=False, images=True):
+        """
+        :param drop: 删除的元素选择器 (列表或逗号分隔的字符串)
+        :param unwrap: 去掉标签、保留内容的元素选择器
+        :param formula: 是否把公式图片替换为 $alt$
+        :param images: 是否改写本地图片 (apply 时还需提供 place 回调)
+        """
+        self.drop = _split(drop)
+        self.unwrap = _split(unwrap)
+        self.formula = formula
+        self.images = images
+        self._buckets = {}          # 标签名 -> [(动作, 类名, 属性)]
+        for action, selectors in ((DROP, self.drop), (UNWRAP, self.unwrap)):
+            for selector in selectors:
+                name, classes, attrs = compile_selector(selector)
+                self._buckets.setdefault(name, []).append((action, classes, attrs))
+        self._any = self._buckets.pop('*', [])
+        self._by_tag = {}           # 按页面中实际出现的标签名缓存合并后的规则表
+
+    def __getstate__(self):
+        return {'drop': self.drop, 'unwrap': self.unwrap, 'formula': self.formula, 'images': self.images}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def _rules_for(self, name):
+        rules = self._by_tag.get(name)
+        if rules is None:
+            # drop 优先于 unwrap，同类规则保持声明顺序
+            rules = sorted(self._buckets.get(name, []) + self._any, key=lambda r: r[0] != DROP)
+            self._by_tag[name] = rules
+        return rules
+
+    def action(self, tag):
+        """返回 tag 命中的动作 (DROP / UNWRAP)，未命中时返回 None"""
+        return self.action_for(tag.name, tag.attrs)
+
+    def action_for(self, name, attrs):
+        """按标签名与属性字典 (class 为列表，与 BeautifulSoup 一致) 判断，无需构建 Tag"""
+        for action, classes, required in self._rules_for(name):
+            if _matches(attrs, classes, required):
+                return action
+        return None
+
+    def dropped(self, tag):
+        """tag 本身或其任一祖先会被 drop 规则删除"""
+        while tag is not None and tag.name != '[document]':
+            if self.action(tag) == DROP: return True
+            tag = tag.parent
+        return False
+
+    def apply(self, root, place=None, timer=NULL_TIMER):
+        """
+        对 root 的后代执行全部规则 (与 root.select 相同，不含 root 本身)
+        :param place: 图片放置回调 place(src) -> assets 内的文件名或 None；为 None 时不改写图片
+        :param timer: 页面阶段计时器，遍历计入 strip，图片放置计入 images
+        """
+        started = time.perf_counter() if timer.enabled else 0.0
+        image_seconds = 0.0
+        place = place if self.images else None
+        unwrapped = []
+        stack = [child for child in reversed(root.contents) if isinstance(child, Tag)]
+
+        while stack:
+            tag = stack.pop()
+            action = self.action(tag)
+            if action == DROP:
+                tag.decompose()
+                continue
+            if action == UNWRAP:
+                unwrapped.append(tag)
+
+            if tag.name in IMAGE_TAGS:
+                if self.formula:
+                    alt = tag.get('alt', '') or (tag.title.string if tag.title else '')
+                    if alt and any(c in alt for c in FORMULA_CHARS):
+                        tag.replace_with(f" ${alt}$ ")
+                        continue
+                src = tag.get('src')
+                if place is not None and src and not src.startswith(('http', 'data:')):
+                    t0 = time.perf_counter() if timer.enabled else 0.0
+                    fname = place(src)
+                    if fname:
+                        tag['src'] = f"assets/{fname}"
+                    if timer.enabled: image_seconds += time.perf_counter() - t0
+
+            stack.extend(child for child in reversed(tag.contents) if isinstance(child, Tag))
+
+        for tag in unwrapped:
+            tag.unwrap()
+
+        if timer.enabled:
+            timer.add("images", image_seconds)
+            timer.add("strip", time.perf_counter() - started - image_seconds)
+        return root
@@ -0,0 +1,82 @@
+"""
+HTML 解析后端对比：在真实文档页面上比较各后端的速度与 Markdown 输出一致性
+
+    python -m cae_doc_builder.converters.compare_parsers ANSYS D:/Ansys/help/en-us --sample 300
+"""
+import time
+import difflib
+from bs4 import FeatureNotFound
+from .parser_backend import PARSER_BACKENDS, DEFAULT_PARSER, resolve_parser
+
+def compare_backends(adapter, nodes, backends=PARSER_BACKENDS, baseline=DEFAULT_PARSER):
+    """
+    用同一批页面对比各后端的速度与输出一致性 (不搬运图片)
+    :param adapter: 已设置 src_root 的适配器实例
+    :param nodes: 待转换的 DocNode 列表 (只取 .htm/.html 页面)
+    :return: 每个后端一条结果字典，含 pages_per_sec / identical / mean_similarity / mismatches
+    """
+    pages = [n for n in nodes if n.source_path and n.source_path.lower().endswith(('.htm', '.html'))]
+    original = adapter.html_parser
+    outputs, results = {}, []
+    try:
+        for backend in [baseline] + [b for b in backends if b != baseline]:
+            try:
+                adapter.html_parser = resolve_parser(backend)
+            except (ValueError, FeatureNotFound) as e:
+                results.append({"backend": backend, "error": str(e)})
+                continue
+            start = time.perf_counter()
+            outputs[backend] = [adapter.read_file_content(n, image_out_dir=None) or "" for n in pages]
+            elapsed = time.perf_counter() - start
+            results.append({
+                "backend": backend,
+                "pages": len(pages),
+                "seconds": round(elapsed, 3),
+                "pages_per_sec": round(len(pages) / elapsed, 1) if elapsed else None,
+            })
+    finally:
+        adapter.html_parser = original
+
+    reference = outputs.get(baseline, [])
+    for result in results:
+        produced = outputs.get(result["backend"])
+        if produced is None: continue
+        mismatches = [(n.source_path, difflib.SequenceMatcher(None, a, b).ratio())
+                      for n, a, b in zip(pages, reference, produced) if a != b]
+        result["identical"] = len(pages) - len(mismatches)
+        result["mean_similarity"] = round(
+            1 - sum(1 - r for _, r in mismatches) / len(pages), 4) if pages else 1.0
+        result["mismatches"] = [p for p, _ in sorted(mismatches, key=lambda m: m[1])][:20]
+    return results
+
+
+def _iter_nodes(nodes):
+    for node in nodes:
+        yield node
+        yield from _iter_nodes(node.children)
+
+def main(argv=None):
+    import json
+    import random
+    import argparse
+    from ..adapters.ansa_adapter import AnsaAdapter
+    from ..adapters.ansys_adapter import AnsysAdapter
+    from ..adapters.abaqus_adapter import AbaqusAdapter
+
+    adapters = {"ANSA": AnsaAdapter, "ANSYS": AnsysAdapter, "ABAQUS": AbaqusAdapter}
+    ap = argparse.ArgumentParser(description="对比 HTML 解析后端的速度与 Markdown 输出一致性")
+    ap.add_argument("adapter", choices=sorted(adapters))
+    ap.add_argument("source")
+    ap.add_argument("--sample", type=int, default=200, help="随机抽取的页面数 (0 表示全部)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--backends", nargs="+", default=list(PARSER_BACKENDS))
+    args = ap.parse_args(argv)
+
+    adapter = adapters[args.adapter](args.source, ".", lambda msg: None)
+    nodes = list(_iter_nodes(adapter.parse_structure()))
+    if args.sample and len(nodes) > args.sample:
+        nodes = random.Random(args.seed).sample(nodes, args.sample)
+    print(json.dumps(compare_backends(adapter, nodes, args.backends), ensure_ascii=False, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -1,66 +1,81 @@
 import os
-import shutil
-from bs4 import BeautifulSoup
-from markdownify import markdownify as md
+from .parser_backend import make_soup, DEFAULT_PARSER
+from .sections import SectionText
+from .cleanup import CleanupRules
+from .tree_md import tree_to_markdown
+from .large_page import LargePage, is_large
+from ..utils.asset_store import AssetStore
+from ..utils.profiler import NULL_TIMER
+
+MD_OPTIONS = dict(heading_style="ATX", strip=['a'], newline_style="BACKSLASH")
 
 class ContentConverter:
+    # Ansys / Abaqus 共用的清洗规则：导航栏与脚本删除，公式图片转 $...$
+    CLEANUP = CleanupRules(drop="script, style, .navheader, .navfooter", formula=True)
+    # 正文容器候选 (按优先级)：(标签名, class)；None 表示整个文档
+    CONTENT_CANDIDATES = [('div', 'section'), ('div', 'chapter'), ('div', 'sect1'), ('body', None)]
+    SECTION_CANDIDATES = [('body', None), None]     # 按锚点切出的片段整段即正文
+
     @staticmethod
-    def convert_to_string(html_src_path, graphics_dir=None):
+    def find_content(soup, candidates):
+        for candidate in candidates:
+            if candidate is None: return soup
+            name, cls = candidate
+            found = soup.find(name, class_=cls) if cls else soup.find(name)
+            if found: return found
+        return None
+
+    @staticmethod
+    def convert_to_string(html_src_path, graphics_dir=None, asset_store=None, parser=DEFAULT_PARSER, html_text=None,
+                          timer=NULL_TIMER, rules=None, large_page_chars=0):
         """
         核心逻辑：读取HTML，搬运图片，返回Markdown字符串。
         :param html_src_path: HTML 源文件路径
         :param graphics_dir: 图片输出目录 (如果为None，则不搬运图片)
+        :param asset_store: 构建级图片仓库 (如果为None，则仅在本次调用内去重)
+        :param parser: HTML 解析后端 (html.parser / lxml / html5lib)
+        :param html_text: 已预读的页面文本 (为None时从 html_src_path 读取；为按锚点切出的 SectionText 时整段即正文)
+        :param timer: 页面阶段计时器 (见 utils.profiler，默认不计时)
+        :param rules: 清洗规则 (CleanupRules，默认 ContentConverter.CLEANUP)
+        :param large_page_chars: 超过该字符数的页面分段解析 (见 converters.large_page，0 为关闭)
         :return: 转换后的 Markdown 字符串
         """
-        if not os.path.exists(html_src_path):
+        if html_text is None and not os.path.exists(html_src_path):
             return ""
 
         try:
-            with open(html_src_path, 'r', encoding='utf-8', errors='ignore') as f:
-                soup = BeautifulSoup(f.read(), 'html.parser')
-
+            if html_text is None:
+                with timer.stage("read"):
+                    with open(html_src_path, 'r', encoding='utf-8', errors='ignore') as f:
+                        html_text = f.read()
+            src_dir = os.path.dirname(html_src_path)
+            asset_store = asset_store or AssetStore()
+            place = None
+            if graphics_dir:
+                # 按内容去重放入 assets (同一图片全局只复制一次)
+                place = lambda src: asset_store.place(os.path.normpath(os.path.join(src_dir, src)), graphics_dir)
+            rules = rules or ContentConverter.CLEANUP
             # 1. 定位正文 (Ansys 常用结构)
-            content = soup.find('div', class_='section') or \
-                      soup.find('div', class_='chapter') or \
-                      soup.find('div', class_='sect1') or \
-                      soup.body
-            if not content: return ""
+            candidates = ContentConverter.SECTION_CANDIDATES if isinstance(html_text, SectionText) \
+                         else ContentConverter.CONTENT_CANDIDATES
 
-            # 2. 图片处理 & 公式修复
-            src_dir = os.path.dirname(html_src_path)
-            
-            for img in content.find_all(['img', 'svg']):
-                # A. 简单的公式修复 (alt 转 LaTeX)
-                alt = img.get('alt', '') or (img.title.string if img.title else '')
-                if alt and any(c in alt for c in ['=', '\\', '+']):
-                    img.replace_with(f" ${alt}$ ")
-                    continue
-                
-                # B. 图片搬运
-                src = img.get('src')
-                if src and not src.startswith(('http', 'data:')) and graphics_dir:
-                    abs_src = os.path.normpath(os.path.join(src_dir, src))
-                    if os.path.exists(abs_src):
-                        if not os.path.exists(graphics_dir):
-                            os.makedirs(graphics_dir)
-                        
-                        fname = os.path.basename(abs_src)
-                        dst_path = os.path.join(graphics_dir, fname)
-                        
-                        # 复制文件 (避免重复复制可加判断)
-                        if not os.path.exists(dst_path):
-                            try: shutil.copy2(abs_src, dst_path)
-                            except: pass
-                        
-                        # 修改 Markdown 里的链接
-                        img['src'] = f"assets/{fname}"
+            if is_large(html_text, parser, large_page_chars):
+                # 大页面：分段解析、清洗与生成，每段用完即释放
+                with timer.stage("parse"):
+                    page = LargePage(html_text, candidates, rules)
+                return page.to_markdown(rules, place, timer, **MD_OPTIONS) or ""
+
+            with timer.stage("parse"):
+                soup = make_soup(html_text, parser)
+                content = ContentConverter.find_content(soup, candidates)
+            if not content: return ""
 
-            # 3. 噪音清洗
-            for junk in content.select('script, style, .navheader, .navfooter'):
-                junk.decompose()
+            # 2. 噪音清洗 & 图片搬运 & 公式修复 (单次遍历)
+            rules.apply(content, place, timer)
 
-            # 4. 生成 Markdown
-            return md(str(content), heading_style="ATX", strip=['a'], newline_style="BACKSLASH")
+            # 3. 生成 Markdown (直接遍历清洗后的子树，不再序列化后重新解析)
+            with timer.stage("markdown"):
+                return tree_to_markdown(content, **MD_OPTIONS)
 
         except Exception as e:
             return f"Conversion Error: {e}"
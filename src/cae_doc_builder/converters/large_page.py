@@ -0,0 +1,199 @@
+"""
+大页面分段转换 (每个页面的内存上限可预期)
+
+Abaqus 关键字手册、Ansys 命令手册中有数 MB 的单个页面，整页解析出的 BeautifulSoup 树
+通常是源文本的十几倍。超过阈值 (adapter.large_page_chars) 的页面改为：
+    1. 用 HTMLParser (与 html.parser 后端相同的分词器) 扫描一遍：不建树，只记录正文容器的位置
+       及其直接子元素之间可以切分的位置；
+    2. 正文按约 CHUNK_CHARS 字符分段，每段包在同名容器标签中单独解析、清洗、生成 Markdown，
+       随即 decompose() 释放，任意时刻只保留一段的解析树；
+    3. 各段的 Markdown 片段由 MarkdownAccumulator 按 markdownify 的规则拼接。
+
+只在两个相邻的块级子元素之间切分 (两者都不会被清洗规则删除或展开，中间只有空白)，
+markdownify 对这些元素的转换不依赖相邻兄弟节点，输出与整页转换逐字节一致。
+只支持 html.parser 后端：lxml / html5lib 会按各自的规则补全、调整标签结构，片段解析结果与整页不同。
+"""
+import re
+from collections import Counter
+from html.parser import HTMLParser
+from .parser_backend import make_soup
+from .tree_md import MarkdownAccumulator
+from ..utils.profiler import NULL_TIMER
+
+LARGE_PAGE_CHARS = 2 * 1024 * 1024  # 默认阈值 (字符数)，0 为关闭
+CHUNK_CHARS = 256 * 1024            # 每段的目标大小
+LARGE_PAGE_PARSER = "html.parser"
+
+# 可在其前后切分的子元素：markdownify 的转换与空白处理只看其自身内容
+SPLIT_TAGS = frozenset({'p', 'div', 'section', 'article', 'blockquote', 'table', 'dl', 'pre',
+                        'h1', 'h2', 'h3', 'h4', 'h5', 'h6'})
+# BeautifulSoup (html.parser) 视为空元素、不入栈的标签
+VOID_TAGS = frozenset({'area', 'base', 'basefont', 'bgsound', 'br', 'col', 'command', 'embed', 'frame',
+                       'hr', 'image', 'img', 'input', 'isindex', 'keygen', 'link', 'menuitem', 'meta',
+                       'nextid', 'param', 'source', 'spacer', 'track', 'wbr'})
+CLASS_SPLIT_RE = re.compile(r'\S+')
+
+
+def is_large(text, parser, threshold):
+    return bool(threshold) and parser == LARGE_PAGE_PARSER and text is not None and len(text) > threshold
+
+
+class _Container:
+    __slots__ = ('name', 'opener', 'inner_start', 'inner_end', 'depth', 'cuts', 'last_cut', 'after_block')
+
+    def __init__(self, name, opener, inner_start, depth):
+        self.name = name
+        self.opener = opener
+        self.inner_start = inner_start
+        self.inner_end = None
+        self.depth = depth              # 子元素开始时的栈深度
+        self.cuts = []
+        self.last_cut = inner_start
+        self.after_block = False        # 上一个子节点是可切分的块级元素，且其后只有空白
+
+
+class _Scanner(HTMLParser):
+    """按 BeautifulSoup 的 html.parser 建树规则维护标签栈 (只记录标签名)"""
+
+    def __init__(self, html, candidates, rules, chunk_chars, first):
+        super().__init__(convert_charrefs=True)
+        self.html = html
+        self.candidates = candidates
+        self.rules = rules
+        self.chunk_chars = chunk_chars
+        self.found = {}                 # 候选序号 -> _Container
+        self.first = dict.fromkeys(first)   # 标签名 -> [起始, 结束] (第一次出现)
+        self.stack = []                 # [(标签名, 所属容器, 是否可切分, 在此打开的容器, 记录的首个元素)]
+        self.open = Counter()
+        self.by_depth = {}              # 子元素深度 -> 正在扫描的容器
+        self._lines = [0] + [m.end() for m in re.finditer('\n', html)]
+        if None in candidates:          # 文档根作为候选 (片段没有外层元素)
+            self._open_container([candidates.index(None)], None, '', 0)
+
+    def _offset(self):
+        line, col = self.getpos()
+        return self._lines[line - 1] + col
+
+    def _open_container(self, indexes, name, opener, inner_start):
+        c = _Container(name, opener, inner_start, len(self.stack) + (name is not None))
+        for i in indexes:
+            self.found[i] = c
+        self.by_depth[c.depth] = c
+        return c
+
+    def handle_starttag(self, tag, attrs):
+        pos = self._offset()
+        attrs = dict(attrs)
+        if 'class' in attrs:
+            attrs['class'] = CLASS_SPLIT_RE.findall(attrs['class'] or '')
+        parent = self.by_depth.get(len(self.stack))
+        splittable = tag in SPLIT_TAGS and (self.rules is None or self.rules.action_for(tag, attrs) is None)
+        if parent is not None:
+            if parent.after_block and splittable and pos - parent.last_cut >= self.chunk_chars:
+                parent.cuts.append(pos)
+                parent.last_cut = pos
+            parent.after_block = False
+        if tag in VOID_TAGS: return
+
+        opened = []
+        matched = [i for i, cand in enumerate(self.candidates)
+                   if cand and i not in self.found and cand[0] == tag and (cand[1] is None or cand[1] in attrs.get('class', ()))]
+        if matched:
+            opener = self.get_starttag_text()
+            opened.append(self._open_container(matched, tag, opener, pos + len(opener)))
+        first = tag if tag in self.first and self.first[tag] is None else None
+        if first:
+            self.first[tag] = [pos, None]
+        self.stack.append((tag, parent, splittable, opened, first))
+        self.open[tag] += 1
+
+    def handle_endtag(self, tag):
+        if not self.open[tag]: return
+        pos = self._offset()
+        while self.stack:
+            name, parent, splittable, opened, first = self.stack.pop()
+            self.open[name] -= 1
+            for c in opened:
+                c.inner_end = max(pos, c.inner_start)
+                self.by_depth.pop(c.depth, None)
+            if parent is not None and self.by_depth.get(parent.depth) is parent:
+                parent.after_block = splittable
+            if first:
+                self.first[first][1] = pos
+            if name == tag: break
+
+    def _child_content(self, significant=True):
+        parent = self.by_depth.get(len(self.stack))
+        if parent is not None and significant:
+            parent.after_block = False
+
+    def handle_data(self, data):
+        self._child_content(bool(data.strip()))
+
+    def handle_comment(self, data):
+        self._child_content()
+
+    def handle_decl(self, decl):
+        self._child_content()
+
+    def handle_pi(self, data):
+        self._child_content()
+
+    def unknown_decl(self, data):
+        self._child_content()
+
+
+class LargePage:
+    """
+    一次扫描的结果：正文容器 (按候选优先级选出) 及其分段
+        page = LargePage(html, [('div', 'section'), ('body', None)], rules)
+        md = page.to_markdown(rules, place, timer, heading_style="ATX")
+    """
+
+    def __init__(self, html, candidates, rules=None, chunk_chars=CHUNK_CHARS, first=()):
+        """
+        :param candidates: 正文容器候选 [(标签名, class 或 None)]，与 soup.find 的优先级相同；None 表示文档根
+        :param rules: 清洗规则 (被删除/展开的元素两侧不切分)
+        :param first: 需要单独取出的元素 (如 Abaqus 的页面标题 h1)，记录第一次出现的位置
+        """
+        self.html = html
+        scanner = _Scanner(html, list(candidates), rules, chunk_chars, first)
+        scanner.feed(html)
+        scanner.close()
+        self._first = scanner.first
+        self.container = next((scanner.found[i] for i in range(len(candidates)) if i in scanner.found), None)
+
+    def element_html(self, name):
+        """第一个 name 元素的源文本 (不含结束标签)，不存在时返回 None"""
+        span = self._first.get(name)
+        if not span: return None
+        return self.html[span[0]:span[1] if span[1] is not None else len(self.html)]
+
+    def chunks(self):
+        c = self.container
+        if c is None: return
+        end = c.inner_end if c.inner_end is not None else len(self.html)
+        closer = f"</{c.name}>" if c.name else ""
+        bounds = [c.inner_start] + c.cuts + [end]
+        for a, b in zip(bounds, bounds[1:]):
+            yield c.opener + self.html[a:b] + closer
+
+    def to_markdown(self, rules, place=None, timer=NULL_TIMER, **options):
+        """逐段解析、清洗、生成 Markdown；未找到正文容器时返回 None"""
+        c = self.container
+        if c is None: return None
+        acc = MarkdownAccumulator(c.name, **options)
+        for chunk in self.chunks():
+            with timer.stage("parse"):
+                soup = make_soup(chunk, LARGE_PAGE_PARSER)
+                container = soup.find(c.name) if c.name else soup
+            rules.apply(container, place, timer)
+            with timer.stage("markdown"):
+                acc.feed(container)
+            soup.decompose()        # 解析树含父子循环引用，显式拆除后立即释放
+        with timer.stage("markdown"):
+            return acc.finish()
+
+    @property
+    def chunk_count(self):
+        return len(self.container.cuts) + 1 if self.container else 0
@@ -0,0 +1,28 @@
+"""
+HTML 解析后端 (BeautifulSoup tree builder) 的统一入口
+
+所有转换器通过 make_soup(markup, parser) 建树，parser 取值：
+    html.parser  纯 Python，无额外依赖 (默认，输出基准)
+    lxml         C 实现，通常快 3~5 倍 (setup.py 已声明依赖)
+    html5lib     浏览器级容错，最慢
+
+切换后端前可用 compare_parsers 在真实文档上核对输出是否与基准一致。
+"""
+from bs4 import BeautifulSoup, FeatureNotFound
+from bs4.builder import builder_registry
+
+PARSER_BACKENDS = ("html.parser", "lxml", "html5lib")
+DEFAULT_PARSER = "html.parser"
+
+def resolve_parser(name):
+    """校验后端名称并确认对应库已安装，返回规范名称"""
+    name = name or DEFAULT_PARSER
+    if name not in PARSER_BACKENDS:
+        raise ValueError(f"未知的 HTML 解析后端: {name} (可选: {', '.join(PARSER_BACKENDS)})")
+    if builder_registry.lookup(name) is None:
+        raise FeatureNotFound(f"HTML 解析后端 {name} 未安装，请先 pip install {name}")
+    return name
+
+def make_soup(markup, parser=DEFAULT_PARSER):
+    return BeautifulSoup(markup, parser or DEFAULT_PARSER)
+
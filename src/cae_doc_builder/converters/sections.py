@@ -0,0 +1,66 @@
+"""
+按 #锚点 切分 HTML 页面
+
+Ansys / Abaqus 的大型参考手册中，多个目录项通过 #id 指向同一文件内的不同小节。
+这里直接在原始 HTML 文本上定位各锚点所在块的起始标签，按文档顺序把页面切成
+互不重叠的片段：每个片段从一个锚点开始，到下一个被引用的锚点为止；
+第一个锚点之前的部分 (页头与引言) 归不带锚点的节点 (键为 None)。
+
+切分只扫描一次文本，每个片段之后单独解析，整页的解析工作量与不切分时相同。
+锚点片段以 SectionText 返回，转换器据此把整段作为正文，而不是在片段中再定位正文容器。
+"""
+import re
+
+# 锚点元素是这些块的第一个子元素时，切分点向外扩展到块的起始标签
+# (如 div.section > div.titlepage > h2 > a[name])，使小节标题与其容器完整地落在同一片段中
+CLIMB_TAGS = {'div', 'section', 'article', 'header', 'p', 'dt', 'span', 'a', 'b', 'strong', 'em',
+              'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+MAX_CLIMB = 6
+CLIMB_WINDOW = 1024
+
+OPENER_BEFORE_RE = re.compile(r'<([a-zA-Z][\w:-]*)\b([^<>]*)>\s*\Z')
+ANCHOR_ATTR_RE = re.compile(r'\b(?:id|name)\s*=\s*["\']([^"\']*)["\']', re.IGNORECASE)
+
+
+class SectionText(str):
+    """按锚点切出的页面片段"""
+    __slots__ = ()
+
+
+def find_cut(html, anchor, claimed=()):
+    """
+    返回锚点所在块的起始位置；文件中不存在该锚点时返回 None
+    :param claimed: 其他被引用的锚点 (向外扩展时不越过它们的起始标签)
+    """
+    m = re.search(r'\b(?:id|name)\s*=\s*(["\'])' + re.escape(anchor) + r'\1', html)
+    if not m: return None
+    start = html.rfind('<', 0, m.start())
+    if start < 0: return None
+
+    for _ in range(MAX_CLIMB):
+        opener = OPENER_BEFORE_RE.search(html, max(0, start - CLIMB_WINDOW), start)
+        if not opener or opener.group(1).lower() not in CLIMB_TAGS: break
+        own = ANCHOR_ATTR_RE.search(opener.group(2))
+        if own and own.group(1) in claimed: break
+        start = opener.start()
+    return start
+
+def split_sections(html, anchors):
+    """
+    :return: {None: 第一个锚点之前的部分, 锚点: SectionText 片段}；文件中找不到的锚点不出现在结果中
+    """
+    claimed = set(anchors)
+    cuts = []
+    for anchor in claimed:
+        pos = find_cut(html, anchor, claimed)
+        if pos is not None:
+            cuts.append((pos, anchor))
+    cuts.sort()
+
+    sections = {}
+    prev_pos, prev_anchor = 0, None
+    for pos, anchor in cuts + [(len(html), None)]:
+        segment = html[prev_pos:pos]
+        sections[prev_anchor] = segment if prev_anchor is None else SectionText(segment)
+        prev_pos, prev_anchor = pos, anchor
+    return sections
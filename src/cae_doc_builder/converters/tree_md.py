@@ -0,0 +1,147 @@
+"""
+直接遍历已解析 (并已清洗) 的 BeautifulSoup 子树生成 Markdown
+
+原流程 md(str(content)) / HTML2Text().handle(str(content)) 先把子树序列化回 HTML，
+再由 markdownify / html2text 重新解析一遍。这里省去序列化与第二次解析：
+    markdownify  直接对子树调用 MarkdownConverter.process_tag
+    html2text    按文档顺序把子树回放为 HTMLParser 事件 (starttag / data / entityref / endtag)
+
+文本按 "序列化 + 重新解析" 时的方式切分：相邻字符串合并为一段，& < > 作为实体事件，
+因此 ATX 标题、反斜杠换行、去除链接与 $...$ 公式的输出与原流程逐字节一致。
+"""
+import re
+from bs4 import BeautifulSoup, Tag
+from bs4.element import PreformattedString, Comment, Doctype
+from markdownify import (MarkdownConverter, re_extract_newlines,
+                         should_remove_whitespace_inside, should_remove_whitespace_outside)
+
+# markdownify 转换器按参数缓存 (实例本身无跨页面状态)
+_MD_CONVERTERS = {}
+
+# str() 以 minimal 规则转义文本中的这三个字符，HTMLParser 再以 entityref 事件送回
+ENTITY_NAMES = {'&': 'amp', '<': 'lt', '>': 'gt'}
+ENTITY_CHAR_RE = re.compile(r'[&<>]')
+CDATA_TAGS = ('script', 'style')
+
+
+def _md_converter(options):
+    key = repr(sorted(options.items()))
+    converter = _MD_CONVERTERS.get(key)
+    if converter is None:
+        converter = _MD_CONVERTERS[key] = MarkdownConverter(**options)
+    return converter
+
+def tree_to_markdown(element, **options):
+    """与 markdownify(str(element), **options) 输出相同，但不再序列化与重新解析"""
+    converter = _md_converter(options)
+
+    # 清洗与公式替换会留下相邻的字符串节点，重新解析时它们本是一段文本
+    element.smooth()
+    if isinstance(element, BeautifulSoup):
+        return converter.convert_soup(element)
+    text = converter.process_tag(element, parent_tags={'[document]'})
+    return converter.convert__document_(element, text, parent_tags=set())
+
+
+class MarkdownAccumulator:
+    """
+    分批生成同一正文容器的 Markdown (大页面分段解析时使用)
+
+    每批子节点各自解析为一个同名容器后交给 feed()，之后即可释放该批的解析树；
+    finish() 按 markdownify 的规则拼接各子节点的结果并执行容器自身的转换。
+    只要批次边界两侧都是不依赖相邻兄弟节点的块级元素 (见 converters.large_page)，
+    结果与对完整容器调用 tree_to_markdown 相同。
+    """
+
+    def __init__(self, name, **options):
+        """:param name: 容器标签名，None 表示文档根 (片段没有外层元素)"""
+        self.name = name
+        self.converter = _md_converter(options)
+        self.parts = []
+
+    def feed(self, container):
+        container.smooth()
+        remove_inside = should_remove_whitespace_inside(container)
+        parent_tags = {'[document]', container.name}
+        for el in container.children:
+            if isinstance(el, (Comment, Doctype)): continue
+            if not isinstance(el, Tag) and not str(el).strip():
+                if remove_inside and (not el.previous_sibling or not el.next_sibling): continue
+                if should_remove_whitespace_outside(el.previous_sibling) or \
+                        should_remove_whitespace_outside(el.next_sibling): continue
+            text = self.converter.process_element(el, parent_tags=parent_tags)
+            if text: self.parts.append(text)
+
+    def finish(self):
+        # 子节点边界处的换行合并 (最多保留两个)，与 MarkdownConverter.process_tag 一致
+        joined = ['']
+        for part in self.parts:
+            leading_nl, content, trailing_nl = re_extract_newlines.match(part).groups()
+            if joined[-1] and leading_nl:
+                prev_trailing_nl = joined.pop()
+                leading_nl = '\n' * min(2, max(len(prev_trailing_nl), len(leading_nl)))
+            joined.extend([leading_nl, content, trailing_nl])
+        text = ''.join(joined)
+        self.parts = []
+
+        if self.name is not None:
+            convert_fn = self.converter.get_conv_fn_cached(self.name)
+            if convert_fn is not None:
+                text = convert_fn(Tag(name=self.name), text, parent_tags={'[document]'})
+        return self.converter.convert__document_(None, text, parent_tags=set())
+
+
+def tree_to_html2text(element, converter):
+    """与 converter.handle(str(element)) 输出相同：把子树作为解析事件直接送入 HTML2Text"""
+    from html2text.utils import pad_tables_in_text
+
+    converter.start = True
+    _replay(element, converter)
+    markdown = converter.optwrap(converter.finish())
+    return pad_tables_in_text(markdown) if converter.pad_tables else markdown
+
+
+def _attrs(tag):
+    return [(name, ' '.join(value) if isinstance(value, list) else value) for name, value in tag.attrs.items()]
+
+def _replay(root, parser):
+    """先序遍历 (显式栈，不受递归深度限制)，按 HTMLParser 的切分方式产生事件"""
+    pending = []
+
+    def flush():
+        if not pending: return
+        text = ''.join(pending)
+        pending.clear()
+        pos = 0
+        for m in ENTITY_CHAR_RE.finditer(text):
+            if m.start() > pos: parser.handle_data(text[pos:m.start()])
+            parser.handle_entityref(ENTITY_NAMES[m.group()])
+            pos = m.end()
+        if pos < len(text): parser.handle_data(text[pos:])
+
+    if isinstance(root, BeautifulSoup):
+        stack = [(None, iter(root.contents))]
+    else:
+        parser.handle_starttag(root.name, _attrs(root))
+        stack = [(root, iter(root.contents))]
+
+    while stack:
+        tag, children = stack[-1]
+        node = next(children, None)
+        if node is None:
+            stack.pop()
+            if tag is not None:
+                flush()
+                parser.handle_endtag(tag.name)
+        elif isinstance(node, Tag):
+            flush()
+            parser.handle_starttag(node.name, _attrs(node))
+            stack.append((node, iter(node.contents)))
+        elif isinstance(node, PreformattedString):
+            flush()     # 注释 / doctype 等：不产生输出，但会切断前后文本
+        elif tag is not None and tag.name in CDATA_TAGS:
+            flush()
+            parser.handle_data(str(node))
+        else:
+            pending.append(str(node))
+    flush()
@@ -1,2 +1,2 @@
-from .structures import DocNode
+from .structures import DocNode, FlatTree
 from .engine import DocBuilderEngine
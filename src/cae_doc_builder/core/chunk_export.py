@@ -0,0 +1,219 @@
+"""
+RAG 分块导出：构建时把每个页面按标题切分为大小受限的文本块，写入分片 JSONL
+
+build_nodes(..., export_chunks=True) 时，页面在写出 Markdown 的同时交给后台线程切分，无需事后重读输出目录：
+    - 先按 ATX 标题 (代码块外的 # ~ ######) 分节，每节记录页面内的标题路径；
+    - 超过 max_chars 的小节依次按 空行 (段落) → 换行 → 字符数 切开；
+    - 每块一行 JSON：id、text、breadcrumb (构建根到页面的 DocNode 标题)、headings (页面内标题路径)、
+      path (输出页面，相对输出根目录)、source、anchor、chunk (页内序号)。
+
+输出位于 <输出根目录>/rag_chunks/<顶层节点>/chunks-00000.jsonl，每个分片最多 shard_chunks 块。
+每次构建重写其范围内各顶层节点的分片目录 (先写临时目录，完成后替换)；
+增量构建跳过的页面没有新的转换结果，改为读取其已有的 .md 文件切分。
+"""
+import os
+import re
+import json
+import shutil
+from .pipeline import BackgroundStage
+
+DEFAULT_CHUNK_CHARS = 2000
+SHARD_CHUNKS = 10000
+CHUNK_DIR = "rag_chunks"
+
+HEADING_RE = re.compile(r'^(#{1,6})[ \t]+(.*?)[ \t#]*$')
+FENCE_RE = re.compile(r'^[ \t]*(```|~~~)')
+PARAGRAPH_RE = re.compile(r'\n[ \t]*\n')
+
+
+def split_markdown(text, max_chars=DEFAULT_CHUNK_CHARS):
+    """
+    按标题与大小切分 Markdown
+    :return: 生成 (页面内标题路径 tuple, 块文本)
+    """
+    headings = []
+    lines = []
+    in_fence = False
+    for line in text.split('\n'):
+        if FENCE_RE.match(line):
+            in_fence = not in_fence
+        m = None if in_fence else HEADING_RE.match(line)
+        if m:
+            yield from _section(headings, lines, max_chars)
+            level = len(m.group(1))
+            headings = headings[:level - 1] + [''] * max(0, level - 1 - len(headings)) + [m.group(2)]
+            lines = [line]
+        else:
+            lines.append(line)
+    yield from _section(headings, lines, max_chars)
+
+def _section(headings, lines, max_chars):
+    body = '\n'.join(lines).strip()
+    if not body: return
+    path = tuple(h for h in headings if h)
+    for piece in _bounded(body, max_chars):
+        yield path, piece
+
+def _bounded(text, max_chars):
+    """把 text 切为不超过 max_chars 的若干块：优先在段落边界，其次在行边界，最后按字符数"""
+    if len(text) <= max_chars:
+        yield text
+        return
+    buf = ''
+    for unit in _units(text, max_chars):
+        if buf and len(buf) + 2 + len(unit) > max_chars:
+            yield buf
+            buf = ''
+        buf = f"{buf}\n\n{unit}" if buf else unit
+    if buf:
+        yield buf
+
+def _units(text, max_chars):
+    for para in PARAGRAPH_RE.split(text):
+        para = para.strip('\n')
+        if not para.strip(): continue
+        if len(para) <= max_chars:
+            yield para
+            continue
+        line_buf = ''
+        for line in para.split('\n'):
+            while True:
+                room = max_chars - len(line_buf) - 1 if line_buf else max_chars
+                if len(line) <= room:
+                    line_buf = f"{line_buf}\n{line}" if line_buf else line
+                    break
+                if line_buf and room < max(1, max_chars // 4):     # 剩余空间太小，先输出已有的行
+                    yield line_buf
+                    line_buf = ''
+                    continue
+                # 超长行填满当前块 (标题行与其后的正文留在同一块)
+                head, line = _cut(line, room)
+                yield f"{line_buf}\n{head}" if line_buf else head
+                line_buf = ''
+        if line_buf:
+            yield line_buf
+
+def _cut(line, limit):
+    """在 limit 以内最后一个空格处切开；没有合适的空格时按字符数切"""
+    cut = line.rfind(' ', 0, limit + 1)
+    if cut < limit // 2:
+        return line[:limit], line[limit:]
+    return line[:cut], line[cut + 1:]
+
+
+class _ShardWriter:
+    """一个顶层节点的分片输出 (写入临时目录，commit 时替换正式目录)"""
+
+    def __init__(self, final_dir, shard_chunks):
+        self.final_dir = final_dir
+        self.tmp_dir = final_dir + ".tmp"
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+        os.makedirs(self.tmp_dir)
+        self.shard_chunks = shard_chunks
+        self.shard = -1
+        self.count = 0
+        self._file = None
+
+    def write(self, record):
+        if self._file is None or self.count % self.shard_chunks == 0:
+            self._next_shard()
+        self._file.write(json.dumps(record, ensure_ascii=False))
+        self._file.write('\n')
+        self.count += 1
+
+    def _next_shard(self):
+        if self._file: self._file.close()
+        self.shard += 1
+        self._file = open(os.path.join(self.tmp_dir, f"chunks-{self.shard:05d}.jsonl"), 'w', encoding='utf-8')
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def commit(self):
+        self.close()
+        shutil.rmtree(self.final_dir, ignore_errors=True)
+        os.replace(self.tmp_dir, self.final_dir)
+
+    def discard(self):
+        self.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+
+class ChunkExporter:
+    """
+    与 BatchedWriter 一样作为上下文管理器包住构建循环：
+        with ChunkExporter(out) as chunks:
+            chunks.add(task, content)   # 新转换的页面
+            chunks.keep(task)           # 增量构建跳过的页面 (读取已有输出)
+    正常退出时各分片目录替换为本次结果，出错时丢弃临时目录、保留上一次的分片
+    """
+
+    def __init__(self, output_root, max_chars=DEFAULT_CHUNK_CHARS, shard_chunks=SHARD_CHUNKS, capacity=64, root=None):
+        """:param root: 分片目录 (默认 <输出根目录>/rag_chunks；单文件输出时位于暂存目录)"""
+        self.output_root = output_root
+        self.root = root or os.path.join(output_root, CHUNK_DIR)
+        self.max_chars = max(1, max_chars)
+        self.shard_chunks = max(1, shard_chunks)
+        self.pages = 0
+        self.chunks = 0
+        self._writers = {}          # 顶层节点 (输出路径第一段) -> _ShardWriter
+        self._stage = BackgroundStage(self._export, 1, capacity)
+
+    def add(self, task, content):
+        if content:
+            self._stage.submit(task, content)
+
+    def keep(self, task):
+        self._stage.submit(task, None)
+
+    def _export(self, task, content):
+        if content is None:
+            try:
+                with open(task.md_path, 'r', encoding='utf-8') as f:
+                    content = f.read()
+            except OSError:
+                return
+        rel = os.path.relpath(task.md_path, self.output_root).replace(os.sep, '/')
+        scope = rel.split('/', 1)[0]
+        if scope.endswith('.md'): scope = scope[:-3]
+        writer = self._writers.get(scope)
+        if writer is None:
+            writer = self._writers[scope] = _ShardWriter(os.path.join(self.root, scope), self.shard_chunks)
+
+        node = task.node
+        breadcrumb = list(task.breadcrumb)
+        n = 0
+        for headings, text in split_markdown(content, self.max_chars):
+            writer.write({
+                "id": f"{rel}#{n}", "text": text,
+                "breadcrumb": breadcrumb, "headings": list(headings),
+                "path": rel, "source": node.source_path, "anchor": node.anchor, "chunk": n,
+            })
+            n += 1
+        self.pages += 1
+        self.chunks += n
+
+    def close(self, commit=True):
+        try:
+            self._stage.close()
+        except Exception:
+            commit = False
+            raise
+        finally:
+            for writer in self._writers.values():
+                writer.commit() if commit else writer.discard()
+            self._writers = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+            return
+        try:
+            self.close(commit=False)
+        except Exception:
+            pass
@@ -1,78 +1,449 @@
 import os
 import re
+import time
+import sqlite3
+import tracemalloc
+from collections import deque
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from .structures import BuildTask
+from .manifest import BuildManifest
+from .pipeline import ordered_map
+from .writer import BatchedWriter
+from .sinks import DirectorySink, open_sink
+from .structure_cache import StructureCache
+from .memo import ConversionMemo
+from .search_index import SearchIndex
+from .chunk_export import ChunkExporter, DEFAULT_CHUNK_CHARS, CHUNK_DIR
+from .workers import init_worker, convert_node
+from .. import __version__
 from ..utils.path_utils import PathUtils
+from ..utils.profiler import BuildProfiler, PageTimer, NULL_PROFILER, NULL_TIMER, peak_memory
+
+PROFILE_FILE = ".build_profile.json"
 
 class DocBuilderEngine:
-    def __init__(self, adapter, converter=None):
+    def __init__(self, adapter, converter=None, jobs=1, read_jobs=4, write_jobs=2, queue_size=64,
+                 memo_size=64 * 1024 * 1024):
+        """
+        :param jobs: 转换阶段进程数 (<=1 为主进程串行转换)
+        :param read_jobs: 读取阶段线程数
+        :param write_jobs: 写入阶段线程数
+        :param queue_size: 各阶段之间的在途任务上限 (决定内存上限)
+        :param memo_size: 转换结果缓存容量 (Markdown 字符数，0 为关闭)，同一源页面每次构建只转换一次
+        """
         self.adapter = adapter
+        self.jobs = jobs
+        self.read_jobs = read_jobs
+        self.write_jobs = write_jobs
+        self.queue_size = queue_size
+        self.memo_size = memo_size
+        self.memo = None                # 本次构建的转换结果缓存
+        self.reused_nodes = 0           # 本次构建中复用已转换页面的节点数
         self.total_nodes = 0
         self.processed_nodes = 0
         self.progress_callback = None
+        self.write_stats = None         # 最近一次构建的写入统计 (文件数/字节数/吞吐)
+        self.sink = DirectorySink(None) # 本次构建的输出接收器 (目录 / zip / tar / SQLite，见 core.sinks)
+        self.profiler = NULL_PROFILER   # 本次构建的性能分析器 (未开启时为空操作)
+        self.profile_report = None      # 最近一次开启性能分析的构建报告
+        self._trace_memory = False      # 本次构建是否记录单页内存峰值
+        self._indexed = None            # 最近一次向适配器登记锚点的目录树
+        self._indexed_ids = None        # 该树全部节点的 id() (判断构建的节点是否取自该树)
 
-    def analyze_structure(self, source_path):
-        """扫描结构入口"""
+    def analyze_structure(self, source_path, use_cache=True):
+        """
+        扫描结构入口
+        :param use_cache: 优先加载持久化的结构缓存 (TOC 文件/目录 mtime 均未变化时有效)
+        """
         if hasattr(self.adapter, 'src_root'):
             self.adapter.src_root = source_path
-        return self.adapter.parse_structure()
+        if not use_cache:
+            return self._index_sections(self.adapter.parse_structure())
+
+        cache = StructureCache(type(self.adapter).__name__, source_path)
+        nodes = cache.load()
+        if nodes is not None:
+            self.adapter.log(f"⚡ 已从缓存加载目录结构 ({self._count_nodes(nodes)} 个节点)。")
+            return self._index_sections(nodes)
+
+        self.adapter.scan_dependencies = []
+        nodes = self.adapter.parse_structure()
+        # 未登记依赖的适配器无法校验缓存，不写入
+        if nodes and self.adapter.scan_dependencies:
+            cache.save(nodes, self.adapter.scan_dependencies)
+        self.adapter.scan_dependencies = []
+        return self._index_sections(nodes)
 
-    def build_nodes(self, nodes_to_build, output_root, progress_callback=None):
-        """构建入口，支持进度回调"""
+    def _index_sections(self, nodes):
+        """向适配器登记 nodes 中的锚点 (替换之前登记的)"""
+        if hasattr(self.adapter, 'index_sections'):
+            self.adapter.index_sections(nodes or [])
+        if nodes is not self._indexed:
+            self._indexed, self._indexed_ids = nodes, None
+        return nodes
+
+    def _section_tree(self, nodes):
+        """
+        构建时登记锚点所用的目录树：构建的节点取自最近扫描的目录树 (如选中的子树) 时仍用整棵树，
+        小节边界与完整文档一致；否则 (外部传入的另一棵树) 只用构建的节点
+        """
+        if self._indexed:
+            if self._indexed_ids is None:
+                ids = set()
+                stack = list(self._indexed)
+                while stack:
+                    node = stack.pop()
+                    ids.add(id(node))
+                    stack.extend(node.children)
+                self._indexed_ids = ids
+            if all(id(n) in self._indexed_ids for n in nodes):
+                return self._indexed
+        return nodes
+
+    def build_nodes(self, nodes_to_build, output_root, progress_callback=None, jobs=None,
+                    incremental=False, use_hash=False, profile=False, profile_top=20, profile_memory=False,
+                    search_index=False, export_chunks=False, chunk_chars=DEFAULT_CHUNK_CHARS):
+        """
+        构建入口，支持进度回调
+        :param output_root: 输出目录；以 .zip / .tar / .tar.gz / .tgz / .sqlite / .db 结尾时输出为单个文件
+        :param jobs: 转换进程数 (None 使用引擎默认值，<=1 为单进程串行)
+        :param incremental: 增量模式，跳过源文件未变化的页面并清理孤立输出 (仅目录输出)
+        :param use_hash: 增量模式下 mtime 变化时再比对内容哈希
+        :param profile: 记录每个页面各阶段的耗时，构建结束后写出 .build_profile.json
+        :param profile_top: 报告中列出的最慢页面数
+        :param profile_memory: 同时用 tracemalloc 记录每个页面转换期间的内存峰值 (隐含 profile，计时会变慢)
+        :param search_index: 同时维护输出根目录下的 SQLite FTS5 全文索引 (.kb_index.sqlite)，见 core.search_index
+        :param export_chunks: 同时按标题切分页面，写出 RAG 分块 JSONL (rag_chunks/)，见 core.chunk_export
+        :param chunk_chars: 每个分块的最大字符数
+        """
         self.total_nodes = self._count_nodes(nodes_to_build)
         self.processed_nodes = 0
         self.progress_callback = progress_callback
-        self._process_nodes_recursive(nodes_to_build, output_root)
+        jobs = jobs or self.jobs
+
+        store = getattr(self.adapter, 'asset_store', None)
+        if store:
+            store.reset()
+        self._index_sections(self._section_tree(nodes_to_build))
+
+        self.sink = sink = open_sink(output_root)
+        if not sink.is_directory:
+            if store: store.sink = sink
+            if incremental:
+                self.adapter.log("⚠️ 单文件输出不支持增量构建，将完整构建。")
+                incremental = False
+        if store: store.keep_existing = incremental     # 跳过的页面仍引用输出目录中已有的图片
+        profile = profile or profile_memory
+        self.profiler = BuildProfiler(top=profile_top) if profile else NULL_PROFILER
+        self._trace_memory = profile_memory
+        own_trace = profile_memory and jobs <= 1 and not tracemalloc.is_tracing()
+        if own_trace: tracemalloc.start()
+        self.memo = ConversionMemo(self.memo_size) if self.memo_size > 0 else None
+        self.reused_nodes = 0
+        self._version = self._converter_version()
+        manifest = BuildManifest(output_root, self._version, use_hash=use_hash) if sink.is_directory else None
+        tasks = self._plan_tasks(nodes_to_build, output_root)
+        if incremental:
+            tasks = self._mark_fresh(tasks, manifest)
+        # 附属文件写入 staging_dir (目录输出即输出根目录)，单文件输出在关闭时收入其中
+        index = self._open_index(output_root) if search_index else None
+        chunks = ChunkExporter(output_root, max_chars=chunk_chars,
+                               root=os.path.join(sink.staging_dir, CHUNK_DIR)) if export_chunks else None
+
+        # 流水线：读取 (线程池) → 转换 (主进程或进程池) → 写入 (后台线程批量写入)
+        # 各阶段之间均有界，结果按计划顺序交给写入阶段并更新进度
+        skipped = 0
+        writer = BatchedWriter(workers=self.write_jobs, capacity=self.queue_size, sink=sink,
+                               on_error=lambda path, e: self._write_failed(manifest, path, e),
+                               profiler=self.profiler)
+        completed = False
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, self.read_jobs)) as readers, writer, \
+                    (index or nullcontext()), (chunks or nullcontext()):
+                loaded = ordered_map(readers, self._load_task, tasks, self.queue_size)
+                if jobs > 1:
+                    results = self._convert_parallel(loaded, jobs)
+                else:
+                    results = self._convert_serial(loaded)
+
+                for task, content in results:
+                    if task.skip:
+                        skipped += 1
+                        if index: index.keep(task)
+                        if chunks: chunks.keep(task)
+                    elif task.md_path:
+                        # 先登记再提交写入：写入失败时 on_error 撤销登记，下次增量构建重新生成
+                        if manifest: manifest.record(task, content)
+                        writer.write(task.md_path, content)
+                        if index: index.add(task, content)
+                        if chunks: chunks.add(task, content)
+                    self.processed_nodes += 1
+                    if self.progress_callback:
+                        self.progress_callback(self.processed_nodes, self.total_nodes)
+
+            self.write_stats = writer.stats()
+            self.adapter.log("💾 写入 {files} 个文件 ({mb:.1f} MB)，{files_per_sec} 文件/秒，{mb_per_sec} MB/秒。".format(
+                mb=self.write_stats["bytes"] / 1e6, **self.write_stats))
+            if self.reused_nodes:
+                self.adapter.log(f"🧠 转换缓存：{self.reused_nodes} 个节点复用了同一源页面的转换结果。")
+            if profile:
+                self._save_profile(output_root)
+
+            scopes = [self._safe_name(n) + ('/' if n.is_container else '.md') for n in nodes_to_build]
+            if incremental:
+                pruned = manifest.prune(scopes)
+                self.adapter.log(f"♻️ 增量构建：跳过 {skipped} 个未变化页面，清理 {pruned} 个孤立输出。")
+            if chunks:
+                self.adapter.log(f"🧩 RAG 分块：{chunks.pages} 个页面切分为 {chunks.chunks} 块，"
+                                 f"已写入 {self._shown(chunks.root)}")
+            if index:
+                removed = index.prune(scopes)
+                self.adapter.log(f"🔎 全文索引：更新 {index.indexed} 个页面，{index.unchanged} 个未变化，"
+                                 f"删除 {removed} 个，索引文件 {self._shown(index.path)}")
+            if manifest: manifest.save()
+            completed = True
+        finally:
+            if index: index.close_db()
+            if own_trace: tracemalloc.stop()
+            if store: store.sink = None
+            self._close_sink(completed)
+
+    def _write_failed(self, manifest, path, e):
+        """写入线程回调：写入失败的页面不得被清单记为最新"""
+        if manifest: manifest.discard(path)
+        self.adapter.log(f"⚠️ 写入失败 {path}: {e}")
+
+    def _close_sink(self, completed):
+        """单文件输出：成功时收入附属文件并替换目标文件，失败时丢弃临时归档"""
+        sink = self.sink
+        if sink.is_directory: return
+        if not completed:
+            sink.abort()
+            return
+        sink.close()
+        size = os.path.getsize(sink.target)
+        self.adapter.log(f"📦 已输出到 {sink.target} ({sink.files} 个文件，{size / 1e6:.1f} MB)")
+
+    def _shown(self, path):
+        """日志中显示的附属文件位置 (单文件输出时为归档内的相对路径)"""
+        if self.sink.is_directory: return path
+        rel = os.path.relpath(path, self.sink.staging_dir).replace(os.sep, '/')
+        return f"{self.sink.target}:{rel}"
+
+    def _save_profile(self, output_root):
+        path = os.path.join(self.sink.staging_dir, PROFILE_FILE)
+        self.profile_report = self.profiler.save(path, root=output_root)
+        stages = " / ".join(f"{name} {s['seconds']:.2f}s" for name, s in self.profile_report["stages"].items())
+        memory = self.profile_report.get("memory")
+        if memory:
+            stages += f"，单页内存峰值 p90 {memory['p90_mb']:.1f} MB / 最大 {memory['max_mb']:.1f} MB"
+        self.adapter.log(f"⏱️ 性能分析：{stages}，报告已写入 {self._shown(path)}")
+
+    def _open_index(self, output_root):
+        try:
+            return SearchIndex(output_root, index_dir=self.sink.staging_dir)
+        except sqlite3.Error as e:
+            self.adapter.log(f"⚠️ 无法创建全文索引 (需要支持 FTS5 的 SQLite): {e}")
+            return None
+
+    def _converter_version(self):
+        adapter_cls = type(self.adapter)
+        parser = getattr(self.adapter, 'html_parser', '')
+        return f"{adapter_cls.__name__}/{getattr(adapter_cls, 'CONVERTER_VERSION', '0')}/{__version__}/{parser}"
+
+    def _mark_fresh(self, tasks, manifest):
+        for task in tasks:
+            if task.md_path and manifest.is_fresh(task):
+                task.skip = True
+            yield task
+
+    @staticmethod
+    def _safe_name(node):
+        # 命名规则：如果标题自带编号则不重复加，否则加 Index 前缀
+        title_clean = PathUtils.sanitize_filename(node.title)
+        if re.match(r'^\d+[.\-]\s*', title_clean):
+            return title_clean
+        elif node.index > 0:
+            return f"{node.index}-{title_clean}"
+        return title_clean
 
-    def _process_nodes_recursive(self, nodes, current_out_dir):
-        if not os.path.exists(current_out_dir):
-            os.makedirs(current_out_dir)
+    def _plan_tasks(self, nodes, current_out_dir, breadcrumb=()):
+        """按物理顺序 (先序) 生成构建任务，同时创建目录结构 (单文件输出时不创建)"""
+        self.sink.ensure_dir(current_out_dir)
 
         for node in nodes:
-            # 命名规则：如果标题自带编号则不重复加，否则加 Index 前缀
-            title_clean = PathUtils.sanitize_filename(node.title)
-            if re.match(r'^\d+[.\-]\s*', title_clean):
-                safe_name = title_clean
-            elif node.index > 0:
-                safe_name = f"{node.index}-{title_clean}"
-            else:
-                safe_name = title_clean
-            
+            safe_name = self._safe_name(node)
             assets_dir = os.path.join(current_out_dir, "assets")
+            titles = breadcrumb + (node.title,)
 
             if node.is_container:
                 new_dir = os.path.join(current_out_dir, safe_name)
-                os.makedirs(new_dir, exist_ok=True)
-                
+                self.sink.ensure_dir(new_dir)
+
                 # 介绍页：标题.md
+                intro_path = None
                 if node.source_path:
-                    content = self.adapter.read_file_content(node, image_out_dir=assets_dir)
-                    if content:
-                        intro_name = PathUtils.sanitize_filename(node.title) + ".md"
-                        self._save_file(os.path.join(new_dir, intro_name), content)
-                
+                    intro_name = PathUtils.sanitize_filename(node.title) + ".md"
+                    intro_path = os.path.join(new_dir, intro_name)
+                yield BuildTask(node, intro_path, assets_dir, breadcrumb=titles)
+
                 if node.children:
-                    self._process_nodes_recursive(node.children, new_dir)
+                    yield from self._plan_tasks(node.children, new_dir, titles)
             else:
                 # 叶子节点直接生成文件
                 md_path = os.path.join(current_out_dir, f"{safe_name}.md")
-                content = self.adapter.read_file_content(node, image_out_dir=assets_dir)
-                self._save_file(md_path, content)
-            
-            # 更新进度
-            self.processed_nodes += 1
-            if self.progress_callback:
-                self.progress_callback(self.processed_nodes, self.total_nodes)
+                yield BuildTask(node, md_path, assets_dir, breadcrumb=titles)
+
+    def _load_task(self, task):
+        """读取阶段：预读源文件文本 (适配器未实现 load_source 时返回 None，由其自行读取)"""
+        if not task.md_path or task.skip: return None
+        load_source = getattr(self.adapter, 'load_source', None)
+        if not load_source: return None
+        key = self._memo_key(task)
+        if key and key in self.memo: return None    # 已转换过的页面无需再读
+        if self._is_large_file(task.node): return None
+        if not self.profiler.enabled:
+            return load_source(task.node)
+        t0 = time.perf_counter()
+        text = load_source(task.node)
+        self.profiler.record(task.md_path, "read", time.perf_counter() - t0, len(text) if text else 0)
+        return text
+
+    def _is_large_file(self, node):
+        """
+        大页面不预读：全文不在读取队列中排队，也不随任务传给 worker 进程，由转换阶段自行读取
+        (按锚点切分的文件仍预读，切分结果由同一文件的各节点共享)
+        """
+        limit = getattr(self.adapter, 'large_page_chars', 0)
+        path = node.source_path
+        if not limit or not path or os.path.normcase(path) in getattr(self.adapter, 'section_anchors', {}):
+            return False
+        try:
+            return os.path.getsize(path) > limit
+        except OSError:
+            return False
+
+    def _memo_key(self, task):
+        """转换缓存键：(源文件, 锚点, 转换器设置)；只缓存输出仅取决于源文件的 HTML 页面 (PDF 复制等依赖节点标题)"""
+        path = task.node.source_path
+        if self.memo is None or not path or not path.lower().endswith(('.htm', '.html')): return None
+        return (os.path.normcase(path), task.node.anchor, self._version)
+
+    def _convert_serial(self, loaded):
+        # 图片放置与附件复制走延迟模式 (与多进程一致)：缓存中保存的是含占位符的 Markdown，复用时按节点重新放置；
+        # 附件由引擎落地，输出路径随任务记入增量清单
+        store = getattr(self.adapter, 'asset_store', None)
+        deferred = store is not None
+        if deferred: store.defer()
+        try:
+            for task, text in loaded:
+                content = None
+                if task.md_path and not task.skip:
+                    key = self._memo_key(task)
+                    cached = self.memo.get(key) if key else None
+                    if cached is not None:
+                        self.reused_nodes += 1
+                    else:
+                        content = self._convert_one(task, text)
+                        cached = self._remember(key, content, store.take_pending() if deferred else [])
+                        if deferred: task.attachments = self._attach(store.take_attachments())
+                    content = self._place_assets(task, cached)
+                yield task, content
+        finally:
+            if deferred: store.defer(False)
+
+    def _convert_one(self, task, text):
+        extra = {'source_text': text} if text is not None else {}
+        if self.profiler.enabled:
+            return self._convert_profiled(task, extra)
+        return self.adapter.read_file_content(task.node, image_out_dir=task.assets_dir, **extra)
+
+    def _convert_profiled(self, task, extra):
+        self.adapter.timer = timer = PageTimer()
+        t0 = time.perf_counter()
+        try:
+            with peak_memory(timer):
+                return self.adapter.read_file_content(task.node, image_out_dir=task.assets_dir, **extra)
+        finally:
+            timer.add("convert", time.perf_counter() - t0)
+            self.adapter.timer = NULL_TIMER
+            self.profiler.merge(task.md_path, timer.stages, task.node.source_path)
+
+    def _convert_parallel(self, loaded, jobs):
+        """
+        多进程转换：任务按顺序提交，结果按提交顺序取回。
+        在途任务数限制为 jobs * 4，避免大子树一次性占满内存。
+        """
+        window = deque()
+        inflight = {}       # 缓存键 -> 尚未取回的 future (同一页面的后续节点直接共享)
+        with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker,
+                                 initargs=(self.adapter, self.profiler.enabled, self._trace_memory)) as pool:
+            for task, text in loaded:
+                entry = None
+                if task.md_path and not task.skip:
+                    key = self._memo_key(task)
+                    cached = self.memo.get(key) if key else None
+                    future = inflight.get(key) if key and cached is None else None
+                    first = cached is None and future is None
+                    if first:
+                        future = pool.submit(convert_node, task.node.detached(), task.assets_dir, text)
+                        if key: inflight[key] = future
+                    else:
+                        self.reused_nodes += 1
+                    entry = (key, cached, future, first)
+                window.append((task, entry))
+                if len(window) >= jobs * 4:
+                    yield self._collect(*window.popleft(), inflight)
+            while window:
+                yield self._collect(*window.popleft(), inflight)
+
+    def _collect(self, task, entry, inflight):
+        if entry is None:
+            return task, None
+        key, cached, future, first = entry
+        if cached is None:
+            content, logs, pending, stages, attachments = future.result()
+            if first:
+                inflight.pop(key, None)
+                for msg in logs:
+                    self.adapter.log(msg)
+                task.attachments = self._attach(attachments)
+                if stages:
+                    self.profiler.merge(task.md_path, stages, task.node.source_path)
+                cached = self._remember(key, content, pending)
+            else:
+                cached = (content, [(src, info) for src, _, info in pending])
+        return task, self._place_assets(task, cached)
+
+    def _attach(self, attachments):
+        """
+        在主进程中落地 worker / 延迟模式记录的附件
+        :return: 成功落地的附件输出路径
+        """
+        placed = []
+        for src, dst in attachments:
+            try:
+                self.adapter.asset_store.copy_attachment(src, dst)
+            except OSError as e:
+                self.adapter.log(f"⚠️ 附件复制失败 {src}: {e}")
+                continue
+            placed.append(dst)
+        return tuple(placed)
+
+    def _remember(self, key, content, pending):
+        """pending 为 AssetStore 的放置请求 [(源图片, assets 目录, 哈希信息)]，缓存时去掉目录"""
+        cached = (content, [(src, info) for src, _, info in pending])
+        if key: self.memo.put(key, *cached)
+        return cached
+
+    def _place_assets(self, task, cached):
+        content, images = cached
+        if not images: return content
+        return self.adapter.asset_store.resolve(content, [(src, task.assets_dir, info) for src, info in images])
 
     def _count_nodes(self, nodes):
         count = len(nodes)
         for n in nodes:
             count += self._count_nodes(n.children)
         return count
-
-    def _save_file(self, path, content):
-        if not content: return
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-        try:
-            with open(path, 'w', encoding='utf-8') as f:
-                f.write(content)
-        except Exception as e:
-            print(f"Write Error: {e}")
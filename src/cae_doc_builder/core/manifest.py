@@ -0,0 +1,142 @@
+import os
+import re
+import json
+import hashlib
+
+# Markdown 中引用本地图片的链接：![alt](assets/xxx.png)
+ASSET_LINK_RE = re.compile(r'\(assets/([^)\s]+)')
+
+class BuildManifest:
+    """
+    增量构建清单：记录每个输出页面对应的源文件指纹、转换器版本与产出资源 (图片与原样复制的 PDF 等附件)。
+
+    以输出路径 (相对输出根目录) 为键，同一源文件被多个节点引用时各自独立记录。
+    源文件的 size + mtime 未变 (或 use_hash 模式下内容哈希未变)、版本一致
+    且输出文件仍在时，该节点可直接跳过。
+    """
+    FILE_NAME = ".build_manifest.json"
+
+    def __init__(self, output_root, version, use_hash=False):
+        self.output_root = output_root
+        self.version = version
+        self.use_hash = use_hash
+        self.path = os.path.join(output_root, self.FILE_NAME)
+        self.entries = self._load()
+        self.seen = set()
+        self.replaced = set()   # 重新生成的页面不再引用的旧资源
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f).get("entries", {})
+        except (OSError, ValueError):
+            return {}
+
+    def _rel(self, path):
+        return os.path.relpath(path, self.output_root).replace(os.sep, '/')
+
+    @staticmethod
+    def _sha1(path):
+        h = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                h.update(chunk)
+        return h.hexdigest()
+
+    def is_fresh(self, task):
+        """判断任务是否可跳过；可跳过时沿用旧记录"""
+        source = task.node.source_path
+        key = self._rel(task.md_path)
+        old = self.entries.get(key)
+        if not source or not old: return False
+        if old.get("version") != self.version or old.get("source") != source: return False
+
+        try:
+            st = os.stat(source)
+        except OSError:
+            return False
+        if (st.st_size, st.st_mtime_ns) != (old.get("size"), old.get("mtime")):
+            # 仅 mtime 变化 (如重新解压) 时，哈希模式下再比对内容
+            if not self.use_hash or st.st_size != old.get("size") or old.get("sha1") != self._sha1(source):
+                return False
+            old["mtime"] = st.st_mtime_ns
+
+        if old.get("written") and not os.path.exists(task.md_path): return False
+        for rel in old.get("assets", []):
+            if not os.path.exists(os.path.join(self.output_root, rel)): return False
+
+        self.seen.add(key)
+        return True
+
+    def record(self, task, content):
+        """记录刚完成转换的任务"""
+        source = task.node.source_path
+        if not source: return
+        try:
+            st = os.stat(source)
+        except OSError:
+            return
+        key = self._rel(task.md_path)
+        assets_rel = self._rel(task.assets_dir)
+        assets = {f"{assets_rel}/{name}" for name in ASSET_LINK_RE.findall(content or "")}
+        assets.update(self._rel(path) for path in task.attachments)
+        entry = {
+            "source": source,
+            "size": st.st_size,
+            "mtime": st.st_mtime_ns,
+            "version": self.version,
+            "written": bool(content),
+            "assets": sorted(assets),
+        }
+        if self.use_hash:
+            entry["sha1"] = self._sha1(source)
+        old = self.entries.get(key)
+        if old: self.replaced.update(set(old.get("assets", [])) - assets)
+        self.entries[key] = entry
+        self.seen.add(key)
+
+    def discard(self, path):
+        """撤销 path 的记录 (输出写入失败)，下次增量构建时重新生成"""
+        self.entries.pop(self._rel(path), None)
+
+    def prune(self, scopes):
+        """
+        删除孤立输出：位于本次构建范围 (scopes) 内、但本次未再产生的页面及其独占资源，
+        以及重新生成的页面不再引用、也没有其他页面引用的旧资源 (如改名后的图片)。
+        :param scopes: 相对路径列表，目录以 '/' 结尾，单个文件为完整路径
+        :return: 删除的页面数量
+        """
+        orphans = [k for k in self.entries
+                   if k not in self.seen and any(k == s or (s.endswith('/') and k.startswith(s)) for s in scopes)]
+        dead_assets, self.replaced = self.replaced, set()
+        if not orphans and not dead_assets: return 0
+
+        for key in orphans:
+            dead_assets.update(self.entries.pop(key).get("assets", []))
+            self._remove(key)
+        live_assets = {a for e in self.entries.values() for a in e.get("assets", [])}
+        for rel in dead_assets - live_assets:
+            self._remove(rel)
+        return len(orphans)
+
+    def _remove(self, rel):
+        path = os.path.join(self.output_root, rel)
+        try:
+            os.remove(path)
+        except OSError:
+            return
+        # 顺带清理因此变空的目录
+        parent = os.path.dirname(path)
+        while os.path.normpath(parent) != os.path.normpath(self.output_root):
+            try:
+                os.rmdir(parent)
+            except OSError:
+                break
+            parent = os.path.dirname(parent)
+
+    def save(self):
+        os.makedirs(self.output_root, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": self.version, "entries": self.entries}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
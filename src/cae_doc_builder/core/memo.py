@@ -0,0 +1,43 @@
+from collections import OrderedDict
+
+class ConversionMemo:
+    """
+    构建级转换结果缓存
+
+    Ansys / Abaqus 的目录中常有多个节点指向同一个 HTML 文件 (仅 #锚点不同)，
+    按 (源文件, 转换器设置) 缓存转换结果，同一物理页面在一次构建中只解析、转换一次。
+
+    缓存的是含图片占位符的 Markdown 与图片列表 [(源图片, 哈希信息)]：
+    每次复用时由 AssetStore 按当前节点的 assets/ 目录重新放置图片并替换占位符，
+    输出与逐个转换完全一致。总容量按 Markdown 字符数限制，超出时淘汰最久未用的条目。
+    """
+
+    def __init__(self, max_chars=64 * 1024 * 1024):
+        self.max_chars = max_chars
+        self._entries = OrderedDict()   # key -> (content, images)
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key, content, images):
+        size = len(content or "")
+        if size > self.max_chars or key in self._entries: return
+        self._entries[key] = (content, images)
+        self._size += size
+        while self._size > self.max_chars:
+            _, (old, _) = self._entries.popitem(last=False)
+            self._size -= len(old or "")
+            self.evictions += 1
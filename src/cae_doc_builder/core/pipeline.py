@@ -0,0 +1,74 @@
+"""
+有界流水线工具
+
+构建流程拆为 读取 → 转换 → 写入 三个阶段，阶段之间只保留有限数量的在途任务：
+无论选中的子树有多大，内存占用都有上限；各阶段可以独立设置并发数，
+使磁盘读取、CPU 解析与磁盘写入相互重叠。
+"""
+import queue
+import threading
+from collections import deque
+
+def ordered_map(executor, fn, items, capacity):
+    """
+    在 executor 上并发执行 fn(item)，按输入顺序产出 (item, 结果)
+    :param capacity: 最多同时在途的任务数 (上游生成器按需拉取，不会被提前耗尽)
+    """
+    pending = deque()
+    for item in items:
+        pending.append((item, executor.submit(fn, item)))
+        if len(pending) >= capacity:
+            done, future = pending.popleft()
+            yield done, future.result()
+    while pending:
+        done, future = pending.popleft()
+        yield done, future.result()
+
+
+class BackgroundStage:
+    """
+    后台执行阶段：固定数量的线程从有界队列中取参数调用 fn，队列满时 submit 阻塞，
+    从而对上游形成背压。close() 等待队列排空，并重新抛出首个异常。
+    """
+    _STOP = object()
+
+    def __init__(self, fn, workers=1, capacity=64):
+        self._fn = fn
+        self._queue = queue.Queue(maxsize=max(1, capacity))
+        self._errors = []
+        self._threads = [threading.Thread(target=self._run, daemon=True) for _ in range(max(1, workers))]
+        for t in self._threads:
+            t.start()
+
+    def submit(self, *args):
+        self._queue.put(args)
+
+    def _run(self):
+        while True:
+            args = self._queue.get()
+            if args is self._STOP: break
+            try:
+                self._fn(*args)
+            except Exception as e:
+                self._errors.append(e)
+
+    def close(self):
+        for _ in self._threads:
+            self._queue.put(self._STOP)
+        for t in self._threads:
+            t.join()
+        if self._errors:
+            raise self._errors[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+            return
+        # 主流程已出错：仍等待后台线程结束，但不覆盖原始异常
+        try:
+            self.close()
+        except Exception:
+            pass
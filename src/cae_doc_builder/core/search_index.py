@@ -0,0 +1,197 @@
+"""
+全文检索索引 (SQLite FTS5)：构建流水线的可选阶段
+
+build_nodes(..., search_index=True) 时，每个页面在写出的同时送入输出根目录下的 .kb_index.sqlite：
+    pages       输出路径 (相对输出根目录) 为键，记录标题、标题路径、层级、物理序号、源文件与内容摘要
+    pages_fts   FTS5 全文表 (title, title_path, body)，rowid 与 pages.id 对应
+
+索引在后台线程中按批次写入 (每批一个事务)，不阻塞转换与写入阶段。
+重新构建时内容摘要与元数据均未变化的页面不再重写，增量构建跳过的页面保留原记录 (尚无记录的读取已输出文件后补入)，
+构建范围内本次未再产生的页面从索引中删除，因此索引始终与输出目录一致。
+
+    python -m cae_doc_builder.search D:/KB "contact pressure" --limit 10
+"""
+import os
+import sqlite3
+import hashlib
+from pathlib import Path
+from .pipeline import BackgroundStage
+
+SCHEMA_VERSION = "1"
+DEFAULT_TOKENIZER = "porter unicode61"
+TITLE_SEPARATOR = " / "
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS pages (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    title TEXT,
+    title_path TEXT,
+    level INTEGER,
+    idx INTEGER,
+    source TEXT,
+    digest TEXT
+);
+"""
+
+
+class SearchIndex:
+    """
+    增量维护的全文索引；与 BatchedWriter 一样作为上下文管理器包住构建循环：
+        with SearchIndex(out) as index:
+            index.add(task, content)    # 新转换的页面
+            index.keep(task)            # 增量构建跳过的页面
+        index.prune(scopes)
+        index.close_db()
+    """
+    FILE_NAME = ".kb_index.sqlite"
+
+    def __init__(self, output_root, tokenize=DEFAULT_TOKENIZER, batch_size=64, capacity=256, index_dir=None):
+        """
+        :param tokenize: FTS5 分词器 (变更后索引自动重建)
+        :param index_dir: 索引文件所在目录 (默认输出根目录；单文件输出时为暂存目录)
+        :raises sqlite3.OperationalError: 当前 SQLite 未编译 FTS5 时
+        """
+        self.output_root = output_root
+        index_dir = index_dir or output_root
+        self.path = os.path.join(index_dir, self.FILE_NAME)
+        self.batch_size = max(1, batch_size)
+        self.seen = set()
+        self.indexed = 0        # 新增或更新的页面数
+        self.unchanged = 0      # 内容与元数据未变、未重写的页面数
+        os.makedirs(index_dir, exist_ok=True)
+        # 连接先后只由一个线程使用 (后台写入阶段，结束后回到主线程清理)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._open_schema(tokenize)
+        self._batch = []
+        self._stage = BackgroundStage(self._index_batch, 1, max(1, capacity // self.batch_size))
+
+    def _open_schema(self, tokenize):
+        conn = self._conn
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        meta = dict(conn.execute("SELECT key, value FROM meta"))
+        if meta.get("schema") != SCHEMA_VERSION or meta.get("tokenize") != tokenize:
+            with conn:
+                conn.execute("DROP TABLE IF EXISTS pages_fts")
+                conn.execute("DELETE FROM pages")
+                conn.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                                 [("schema", SCHEMA_VERSION), ("tokenize", tokenize)])
+        tokenize_sql = tokenize.replace("'", "''")
+        conn.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS pages_fts USING fts5("
+                     f"title, title_path, body, tokenize='{tokenize_sql}')")
+
+    def _rel(self, path):
+        return os.path.relpath(path, self.output_root).replace(os.sep, '/')
+
+    def keep(self, task):
+        """
+        增量构建跳过的页面：保留已有记录；
+        尚无记录的页面 (如之前的构建未启用索引) 在后台读取已输出的文件后入索引
+        """
+        self._queue(task, None)
+
+    def add(self, task, content):
+        """登记刚转换完成的页面 (空内容不生成文件，也不入索引)"""
+        if content: self._queue(task, content)
+
+    def _queue(self, task, content):
+        node = task.node
+        rel = self._rel(task.md_path)
+        self.seen.add(rel)
+        self._batch.append((rel, task.md_path, node.title, TITLE_SEPARATOR.join(task.breadcrumb), node.level,
+                            node.index, node.source_path, content))
+        if len(self._batch) >= self.batch_size:
+            batch, self._batch = self._batch, []
+            self._stage.submit(batch)
+
+    def _index_batch(self, batch):
+        conn = self._conn
+        with conn:
+            for rel, md_path, title, title_path, level, index, source, body in batch:
+                row = conn.execute("SELECT id, title, title_path, level, idx, source, digest FROM pages WHERE path = ?",
+                                   (rel,)).fetchone()
+                if body is None:
+                    if row is not None: continue
+                    try:
+                        with open(md_path, 'r', encoding='utf-8') as f:
+                            body = f.read()
+                    except OSError:
+                        continue
+                digest = hashlib.sha1(body.encode('utf-8')).hexdigest()
+                meta = (title, title_path, level, index, source, digest)
+                if row is not None and row[1:] == meta:
+                    self.unchanged += 1
+                    continue
+                if row is None:
+                    rowid = conn.execute("INSERT INTO pages (path, title, title_path, level, idx, source, digest) "
+                                         "VALUES (?, ?, ?, ?, ?, ?, ?)", (rel, *meta)).lastrowid
+                else:
+                    rowid = row[0]
+                    conn.execute("UPDATE pages SET title = ?, title_path = ?, level = ?, idx = ?, source = ?, digest = ? "
+                                 "WHERE id = ?", (*meta, rowid))
+                    conn.execute("DELETE FROM pages_fts WHERE rowid = ?", (rowid,))
+                conn.execute("INSERT INTO pages_fts (rowid, title, title_path, body) VALUES (?, ?, ?, ?)",
+                             (rowid, title, title_path, body))
+                self.indexed += 1
+
+    def close(self):
+        """提交剩余批次并等待后台线程写完"""
+        try:
+            if self._batch:
+                self._stage.submit(self._batch)
+            self._batch = []
+        finally:
+            self._stage.close()
+
+    def prune(self, scopes):
+        """
+        删除构建范围 (scopes，与 BuildManifest.prune 相同) 内、本次未再产生的页面
+        :return: 删除的页面数量
+        """
+        rows = self._conn.execute("SELECT id, path FROM pages").fetchall()
+        orphans = [(rowid,) for rowid, rel in rows
+                   if rel not in self.seen and any(rel == s or (s.endswith('/') and rel.startswith(s)) for s in scopes)]
+        if orphans:
+            with self._conn:
+                self._conn.executemany("DELETE FROM pages_fts WHERE rowid = ?", orphans)
+                self._conn.executemany("DELETE FROM pages WHERE id = ?", orphans)
+        return len(orphans)
+
+    def close_db(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+            return
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+def search(output_root, query, limit=20):
+    """
+    在输出目录的索引中检索 (FTS5 查询语法)，按相关度排序
+    :return: [{path, title_path, level, index, snippet, score}]
+    """
+    path = os.path.join(output_root, SearchIndex.FILE_NAME)
+    conn = sqlite3.connect(Path(path).resolve().as_uri() + "?mode=ro", uri=True)
+    try:
+        rows = conn.execute(
+            "SELECT p.path, p.title_path, p.level, p.idx, snippet(pages_fts, 2, '[', ']', '…', 16), "
+            "bm25(pages_fts, 5.0, 2.0, 1.0) AS score "
+            "FROM pages_fts JOIN pages p ON p.id = pages_fts.rowid "
+            "WHERE pages_fts MATCH ? ORDER BY score LIMIT ?", (query, limit)).fetchall()
+    finally:
+        conn.close()
+    return [dict(zip(("path", "title_path", "level", "index", "snippet", "score"), row)) for row in rows]
+
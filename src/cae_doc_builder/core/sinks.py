@@ -0,0 +1,249 @@
+"""
+构建输出的落地方式 (输出接收器)
+
+引擎、写入器与图片仓库都按 "规划路径" (输出根目录 + 相对路径) 提交页面与资源，由接收器决定如何保存：
+    DirectorySink   写入目录树 (默认，与以往相同)
+    ZipSink         流式写入单个 .zip (Markdown 压缩，已压缩的图片/PDF 直接存储)
+    TarSink         流式写入单个 .tar / .tar.gz / .tgz
+    SQLiteSink      写入单个 SQLite 文件：files(path, digest, size, mtime) + blobs(digest, data)，相同内容只存一份
+
+三种单文件接收器中的路径与目录输出的相对路径完全相同 (以 / 分隔)，页面中的 assets/ 链接无需改写。
+它们先写入同目录下的临时文件，构建成功后替换目标文件，失败时丢弃，不会留下半截的归档。
+全文索引、RAG 分块、性能报告等附属文件先写入 staging_dir，close() 时一并收入归档。
+增量构建依赖逐文件比对已有输出，只支持目录输出。
+
+    sink = open_sink("D:/KB.zip")       # 按扩展名选择，其余一律视为目录
+"""
+import os
+import io
+import time
+import shutil
+import sqlite3
+import hashlib
+import tarfile
+import zipfile
+import tempfile
+import threading
+import warnings
+
+# 已压缩的格式在 zip 中直接存储，不再二次压缩
+STORED_EXTS = ('.png', '.jpg', '.jpeg', '.gif', '.webp', '.pdf', '.zip', '.gz', '.svgz')
+SKIP_STAGED = ('-wal', '-shm', '-journal')      # SQLite 关闭后残留的辅助文件
+
+
+class DirectorySink:
+    """目录输出：页面先写临时文件再 os.replace，中断时不会留下半截文件"""
+    is_directory = True
+
+    def __init__(self, root):
+        self.root = root
+        self.staging_dir = root         # 附属文件直接写在输出根目录下
+        self.known_dirs = set()         # 已创建的目录 (规划与写入阶段共享)
+
+    def relpath(self, path):
+        return os.path.relpath(path, self.root).replace(os.sep, '/')
+
+    def ensure_dir(self, path):
+        if path in self.known_dirs: return
+        os.makedirs(path, exist_ok=True)
+        self.known_dirs.add(path)
+
+    def write_bytes(self, path, data):
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            self.ensure_dir(os.path.dirname(path))
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try: os.remove(tmp_path)
+            except OSError: pass
+            raise
+
+    def add_file(self, path, src_path, digest=None):
+        """复制源文件到 path (已存在时保留)"""
+        if os.path.exists(path): return
+        self.ensure_dir(os.path.dirname(path))
+        shutil.copy2(src_path, path)
+
+    def close(self):
+        pass
+
+    def abort(self):
+        pass
+
+
+class _FileSink:
+    """单文件接收器的公共部分：临时文件、线程锁、附属文件暂存目录"""
+    is_directory = False
+
+    def __init__(self, target):
+        self.root = target              # 规划路径的根 (不会在磁盘上创建)
+        self.target = target
+        parent = os.path.dirname(os.path.abspath(target))
+        os.makedirs(parent, exist_ok=True)
+        self.tmp_path = f"{target}.{os.getpid()}.tmp"
+        self.staging_dir = tempfile.mkdtemp(prefix=".cdb-staging-", dir=parent)
+        self._lock = threading.Lock()
+        self._names = set()
+        self.files = 0
+
+    def relpath(self, path):
+        rel = os.path.relpath(path, self.root).replace(os.sep, '/')
+        if rel.startswith('../'):
+            raise ValueError(f"输出路径不在输出根之内: {path}")
+        return rel
+
+    def ensure_dir(self, path):
+        pass
+
+    def write_bytes(self, path, data):
+        rel = self.relpath(path)
+        with self._lock:
+            self._write(rel, data)
+            self._names.add(rel)
+            self.files += 1
+
+    def add_file(self, path, src_path, digest=None):
+        rel = self.relpath(path)
+        with self._lock:
+            if rel in self._names: return
+            self._add(rel, src_path, digest)
+            self._names.add(rel)
+            self.files += 1
+
+    def _publish_staged(self):
+        for folder, _, names in os.walk(self.staging_dir):
+            for name in sorted(names):
+                if name.endswith(SKIP_STAGED): continue
+                local = os.path.join(folder, name)
+                rel = os.path.relpath(local, self.staging_dir).replace(os.sep, '/')
+                with self._lock:
+                    self._add(rel, local, None)
+                    self._names.add(rel)
+                    self.files += 1
+
+    def close(self):
+        """收入附属文件，完成归档并替换目标文件"""
+        try:
+            self._publish_staged()
+            self._finish()
+            os.replace(self.tmp_path, self.target)
+        except BaseException:
+            self.abort()
+            raise
+        shutil.rmtree(self.staging_dir, ignore_errors=True)
+
+    def abort(self):
+        try:
+            self._finish()
+        except Exception:
+            pass
+        try: os.remove(self.tmp_path)
+        except OSError: pass
+        shutil.rmtree(self.staging_dir, ignore_errors=True)
+
+
+class ZipSink(_FileSink):
+    def __init__(self, target, compresslevel=6):
+        super().__init__(target)
+        self._zip = zipfile.ZipFile(self.tmp_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=compresslevel)
+
+    def _info(self, rel):
+        info = zipfile.ZipInfo(rel, time.localtime()[:6])
+        info.compress_type = zipfile.ZIP_STORED if rel.lower().endswith(STORED_EXTS) else zipfile.ZIP_DEFLATED
+        return info
+
+    def _write(self, rel, data):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")     # 同一路径重写时追加新条目，解压时以后者为准
+            self._zip.writestr(self._info(rel), data)
+
+    def _add(self, rel, src_path, digest):
+        info = self._info(rel)
+        info.date_time = time.localtime(os.path.getmtime(src_path))[:6]
+        with open(src_path, 'rb') as src, self._zip.open(info, 'w') as dst:
+            shutil.copyfileobj(src, dst, 1 << 20)
+
+    def _finish(self):
+        if self._zip is not None:
+            self._zip.close()
+            self._zip = None
+
+
+class TarSink(_FileSink):
+    def __init__(self, target):
+        super().__init__(target)
+        gz = target.lower().endswith(('.gz', '.tgz'))
+        self._tar = tarfile.open(self.tmp_path, 'w:gz' if gz else 'w', format=tarfile.PAX_FORMAT)
+
+    def _write(self, rel, data):
+        info = tarfile.TarInfo(rel)
+        info.size = len(data)
+        info.mtime = int(time.time())
+        self._tar.addfile(info, io.BytesIO(data))
+
+    def _add(self, rel, src_path, digest):
+        self._tar.add(src_path, arcname=rel, recursive=False)
+
+    def _finish(self):
+        if self._tar is not None:
+            self._tar.close()
+            self._tar = None
+
+
+class SQLiteSink(_FileSink):
+    """
+    单文件 SQLite 仓库：
+        files(path TEXT PRIMARY KEY, digest TEXT, size INTEGER, mtime REAL)
+        blobs(digest TEXT PRIMARY KEY, data BLOB)
+    读取：SELECT data FROM files JOIN blobs USING (digest) WHERE path = ?
+    """
+    COMMIT_EVERY = 500
+
+    def __init__(self, target):
+        super().__init__(target)
+        self._conn = sqlite3.connect(self.tmp_path, check_same_thread=False)
+        self._conn.executescript("""
+            PRAGMA journal_mode=OFF;
+            PRAGMA synchronous=OFF;
+            CREATE TABLE files (path TEXT PRIMARY KEY, digest TEXT NOT NULL, size INTEGER, mtime REAL);
+            CREATE TABLE blobs (digest TEXT PRIMARY KEY, data BLOB NOT NULL);
+        """)
+        self._uncommitted = 0
+
+    def _store(self, rel, data, digest, mtime):
+        digest = digest or hashlib.sha1(data).hexdigest()
+        self._conn.execute("INSERT OR IGNORE INTO blobs VALUES (?, ?)", (digest, data))
+        self._conn.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)", (rel, digest, len(data), mtime))
+        self._uncommitted += 1
+        if self._uncommitted >= self.COMMIT_EVERY:
+            self._conn.commit()
+            self._uncommitted = 0
+
+    def _write(self, rel, data):
+        self._store(rel, data, None, time.time())
+
+    def _add(self, rel, src_path, digest):
+        with open(src_path, 'rb') as f:
+            data = f.read()
+        # 图片仓库给出的是源文件内容哈希 (sha1)，与这里的摘要一致，可直接去重
+        self._store(rel, data, digest, os.path.getmtime(src_path))
+
+    def _finish(self):
+        if self._conn is not None:
+            self._conn.commit()
+            self._conn.close()
+            self._conn = None
+
+
+SINKS = (('.tar.gz', TarSink), ('.tgz', TarSink), ('.tar', TarSink), ('.zip', ZipSink),
+         ('.sqlite', SQLiteSink), ('.db', SQLiteSink))
+
+def open_sink(target):
+    """按扩展名选择接收器；不是已知的归档/数据库扩展名时输出到目录"""
+    lower = target.lower()
+    for suffix, cls in SINKS:
+        if lower.endswith(suffix) and not os.path.isdir(target):
+            return cls(target)
+    return DirectorySink(target)
@@ -0,0 +1,45 @@
+import os
+import pickle
+from .structures import flatten_tree, unflatten_tree
+from .. import __version__
+from ..utils.disk_cache import cache_file_path, FileStampCache
+
+class StructureCache:
+    """
+    parse_structure 结果的持久化缓存
+
+    DocNode 树展开为数组存储的 FlatTree 后 pickle 保存，同时记录扫描时读取过的
+    TOC 文件 / 目录及其 mtime。加载时逐一比对 mtime，任一变化 (含新增或删除)
+    即视为失效，需要重新扫描。
+    """
+    FORMAT = 3     # 2: 节点增加 anchor; 3: FlatTree
+
+    def __init__(self, adapter_name, src_root):
+        self.adapter_name = adapter_name
+        self.path = cache_file_path(f"structure-{adapter_name.lower()}", src_root, "pickle")
+
+    def _header(self):
+        return (self.FORMAT, __version__, self.adapter_name)
+
+    def load(self):
+        """返回缓存的节点列表；缓存不存在或已失效时返回 None"""
+        try:
+            with open(self.path, 'rb') as f:
+                header, deps, packed = pickle.load(f)
+        except Exception:
+            return None
+        if header != self._header(): return None
+        for path, stamp in deps:
+            if FileStampCache.stamp(path) != stamp: return None
+        return unflatten_tree(packed)
+
+    def save(self, nodes, dependencies):
+        deps = [(path, FileStampCache.stamp(path)) for path in dict.fromkeys(dependencies)]
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump((self._header(), deps, flatten_tree(nodes)), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass
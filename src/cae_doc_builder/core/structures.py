@@ -1,17 +1,224 @@
-from dataclasses import dataclass, field
-from typing import List, Optional
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Optional, Sequence
 
-@dataclass
+@dataclass(slots=True)
 class DocNode:
     """
     通用文档节点：锁定 index 确保编号稳定
+    使用 __slots__ (无实例 __dict__)；叶子节点共享空元组作为 children，第一次 add_child 时才创建列表
     """
     title: str                      # 节点标题
     level: int                      # 层级深度
     index: int = 0                  # [新增] 扫描时的原始物理序号
     source_path: Optional[str] = None  # 源文件路径
-    children: List['DocNode'] = field(default_factory=list) 
+    children: Sequence['DocNode'] = ()
     is_container: bool = False      # 是否为文件夹
+    anchor: Optional[str] = None    # href 中的 #锚点 (指向文件内某一小节时)
     
     def add_child(self, node: 'DocNode'):
-        self.children.append(node)
+        if isinstance(self.children, list):
+            self.children.append(node)
+        else:
+            self.children = [*self.children, node]
+
+    def __reduce__(self):
+        # 按位置参数 pickle：比 slots 默认的 (None, 属性字典) 状态更小、更快
+        return DocNode, (self.title, self.level, self.index, self.source_path,
+                         self.children, self.is_container, self.anchor)
+
+    def detached(self) -> 'DocNode':
+        """返回不带子节点的浅拷贝，用于跨进程传递 (避免整棵子树被 pickle)"""
+        return DocNode(title=self.title, level=self.level, index=self.index,
+                       source_path=self.source_path, is_container=self.is_container, anchor=self.anchor)
+
+
+@dataclass
+class BuildTask:
+    """
+    构建计划中的单个任务：一个节点及其输出位置
+    """
+    node: DocNode
+    md_path: Optional[str]          # Markdown 输出路径 (None 表示无需生成页面)
+    assets_dir: str                 # 图片/附件输出目录
+    skip: bool = False              # 增量构建：源文件未变化，无需重新转换
+    breadcrumb: tuple = ()          # 从构建根到本节点 (含) 的标题路径
+    attachments: tuple = ()         # 转换时原样复制的附件输出路径 (如 PDF 手册)
+
+
+class FlatTree:
+    """
+    数组存储的只读节点树：节点按先序编号 0..n-1，没有逐节点的 Python 对象
+        parents[i]          父节点序号，根节点为 -1
+        ends[i]             子树结束位置 (不含)：i 的子树为 range(i, ends[i])，有子节点时第一个为 i + 1
+        levels / indexes    层级与扫描时的物理序号
+        flags[i]            IS_CONTAINER 等标志位
+        titles / dirs / names / anchors
+                            字符串表 strings 中的序号 (0 表示 None)；标题、目录、文件名与锚点各自去重，
+                            源文件路径拆成 目录 + 文件名 存储，同一目录下的页面共享目录字符串
+    pickle 时数组按原始字节序列化，用于结构缓存落盘与扫描进程回传
+    """
+    IS_CONTAINER = 1
+    __slots__ = ('parents', 'ends', 'levels', 'indexes', 'flags', 'titles', 'dirs', 'names', 'anchors', 'strings')
+
+    def __init__(self):
+        self.parents = array('i')
+        self.ends = array('i')
+        self.levels = array('h')
+        self.indexes = array('i')
+        self.flags = array('b')
+        self.titles = array('i')
+        self.dirs = array('i')
+        self.names = array('i')
+        self.anchors = array('i')
+        self.strings = [None]
+
+    @classmethod
+    def from_nodes(cls, roots):
+        tree = cls()
+        lookup = {None: 0}
+        strings = tree.strings
+
+        def intern(s):
+            i = lookup.get(s)
+            if i is None:
+                i = lookup[s] = len(strings)
+                strings.append(s)
+            return i
+
+        stack = [(node, -1) for node in reversed(roots)]
+        while stack:
+            node, parent = stack.pop()
+            i = len(tree.parents)
+            tree.parents.append(parent)
+            tree.levels.append(node.level)
+            tree.indexes.append(node.index)
+            tree.flags.append(cls.IS_CONTAINER if node.is_container else 0)
+            tree.titles.append(intern(node.title))
+            path = node.source_path
+            cut = max(path.rfind('/'), path.rfind('\\')) + 1 if path else 0
+            tree.dirs.append(intern(path[:cut]) if path else 0)
+            tree.names.append(intern(path[cut:]) if path else 0)
+            tree.anchors.append(intern(node.anchor))
+            stack.extend((child, i) for child in reversed(node.children))
+
+        # 先序排列中子树连续，逆序一遍把每个节点的结束位置传给父节点
+        n = len(tree.parents)
+        ends = tree.ends = array('i', range(1, n + 1))
+        parents = tree.parents
+        for i in range(n - 1, -1, -1):
+            p = parents[i]
+            if p >= 0 and ends[i] > ends[p]:
+                ends[p] = ends[i]
+        return tree
+
+    def __len__(self):
+        return len(self.parents)
+
+    def roots(self):
+        i, n = 0, len(self.parents)
+        while i < n:
+            yield i
+            i = self.ends[i]
+
+    def children(self, i):
+        c, end = i + 1, self.ends[i]
+        while c < end:
+            yield c
+            c = self.ends[c]
+
+    def subtree(self, i):
+        """i 及其全部后代的序号 (先序)"""
+        return range(i, self.ends[i])
+
+    def title(self, i):
+        return self.strings[self.titles[i]]
+
+    def source_path(self, i):
+        if not self.names[i] and not self.dirs[i]: return None
+        return (self.strings[self.dirs[i]] or '') + (self.strings[self.names[i]] or '')
+
+    def anchor(self, i):
+        return self.strings[self.anchors[i]]
+
+    def is_container(self, i):
+        return bool(self.flags[i] & self.IS_CONTAINER)
+
+    def node(self, i):
+        """节点 i 的 DocNode (不带子节点)"""
+        return DocNode(title=self.title(i), level=self.levels[i], index=self.indexes[i],
+                       source_path=self.source_path(i), is_container=self.is_container(i), anchor=self.anchor(i))
+
+    def to_nodes(self):
+        """还原为 DocNode 树，返回根节点列表"""
+        roots = []
+        nodes = []
+        for i in range(len(self.parents)):
+            node = self.node(i)
+            nodes.append(node)
+            p = self.parents[i]
+            if p < 0:
+                roots.append(node)
+            else:
+                nodes[p].add_child(node)
+        return roots
+
+
+def flatten_tree(nodes):
+    """展开为 FlatTree，比逐个 pickle DocNode 更紧凑，用于缓存落盘与跨进程传递"""
+    return FlatTree.from_nodes(nodes)
+
+def unflatten_tree(packed):
+    """flatten_tree 的逆过程"""
+    return packed.to_nodes()
+
+
+class TitleIndex:
+    """
+    标题检索索引：先序展开的节点、父节点序号，以及所有小写标题以换行拼接成的单个字符串
+    子串查找由 str.find 在拼接串上完成 (C 实现)，不逐个节点比较，也不依赖界面上已展开的条目
+    """
+
+    def __init__(self, roots):
+        self.nodes = []                 # 先序排列的节点
+        self.parents = array('i')       # 父节点序号，根节点为 -1
+        self._starts = array('i')       # 各标题在拼接串中的起始位置
+        titles = []
+        offset = 0
+        stack = [(node, -1) for node in reversed(roots)]
+        while stack:
+            node, parent = stack.pop()
+            i = len(self.nodes)
+            self.nodes.append(node)
+            self.parents.append(parent)
+            title = (node.title or '').lower().replace('\n', ' ')
+            self._starts.append(offset)
+            titles.append(title)
+            offset += len(title) + 1
+            stack.extend((child, i) for child in reversed(node.children))
+        self._text = '\n'.join(titles)
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def search(self, query, start=0):
+        """按先序依次产生标题包含 query (不区分大小写) 的节点序号，从序号 start 开始"""
+        query = query.strip().lower()
+        if not query or '\n' in query or start >= len(self.nodes): return
+        pos = self._starts[start]
+        while True:
+            pos = self._text.find(query, pos)
+            if pos < 0: return
+            i = bisect_right(self._starts, pos) - 1
+            yield i
+            if i + 1 >= len(self.nodes): return
+            pos = self._starts[i + 1]     # 同一标题只报告一次
+
+    def path(self, i):
+        """从根到节点 i 的序号列表"""
+        chain = []
+        while i >= 0:
+            chain.append(i)
+            i = self.parents[i]
+        return chain[::-1]
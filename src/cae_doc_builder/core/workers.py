@@ -0,0 +1,41 @@
+"""
+多进程转换的 Worker 端逻辑
+
+每个进程在初始化时收到一份适配器副本，之后只接收单个节点并返回
+(Markdown 内容, 日志列表, 待放置图片, 阶段计时, 待复制附件)，日志、图片、计时与附件由主进程按顺序处理。
+"""
+import time
+import tracemalloc
+from ..utils.profiler import PageTimer, peak_memory
+
+_adapter = None
+_profile = False
+
+def init_worker(adapter, profile=False, memory=False):
+    global _adapter, _profile
+    _adapter = adapter
+    _profile = profile
+    if memory:
+        tracemalloc.start()
+    store = getattr(_adapter, 'asset_store', None)
+    if store:
+        store.defer()
+
+def convert_node(node, image_out_dir, source_text=None):
+    logs = []
+    _adapter.log = logs.append
+    extra = {'source_text': source_text} if source_text is not None else {}
+    stages = None
+    if _profile:
+        _adapter.timer = timer = PageTimer()
+        t0 = time.perf_counter()
+        with peak_memory(timer):
+            content = _adapter.read_file_content(node, image_out_dir=image_out_dir, **extra)
+        timer.add("convert", time.perf_counter() - t0)
+        stages = timer.stages
+    else:
+        content = _adapter.read_file_content(node, image_out_dir=image_out_dir, **extra)
+    store = getattr(_adapter, 'asset_store', None)
+    if not store:
+        return content, logs, [], stages, []
+    return content, logs, store.take_pending(), stages, store.take_attachments()
@@ -0,0 +1,104 @@
+import time
+import threading
+from .pipeline import BackgroundStage
+from .sinks import DirectorySink
+from ..utils.profiler import NULL_PROFILER
+
+class BatchedWriter:
+    """
+    批量输出写入器
+
+    - 目录创建结果缓存在内存中 (可与构建计划阶段共享同一集合)，每个目录每次构建只 mkdir 一次；
+    - 页面按批次交给后台线程写入，由输出接收器 (core.sinks) 落地：
+      目录输出先写临时文件再 os.replace，中断时不会留下半截文件，归档/SQLite 输出写入单个文件；
+    - 按路径哈希固定分配写入线程，同一路径的多次写入保持提交顺序 (后写覆盖先写)；
+    - 统计写入的文件数与字节数，stats() 给出 文件/秒 与 MB/秒；
+    - 传入 BuildProfiler 时按文件记录 write 阶段耗时。
+    """
+
+    def __init__(self, workers=2, batch_size=32, capacity=64, known_dirs=None, on_error=None,
+                 profiler=NULL_PROFILER, sink=None):
+        """:param sink: 输出接收器，None 为直接写入目录"""
+        self.batch_size = max(1, batch_size)
+        if sink is None:
+            sink = DirectorySink(None)
+            if known_dirs is not None: sink.known_dirs = known_dirs
+        self.sink = sink
+        self.on_error = on_error
+        self.profiler = profiler
+        # 队列容量以批次计，保证在途页面数与 capacity 同一量级
+        stage_capacity = max(1, capacity // self.batch_size)
+        self._stages = [BackgroundStage(self._write_batch, 1, stage_capacity) for _ in range(max(1, workers))]
+        self._batches = [[] for _ in self._stages]
+        self._lock = threading.Lock()
+        self.files = 0
+        self.bytes = 0
+        self._started = time.perf_counter()
+        self._finished = None
+
+    def ensure_dir(self, path):
+        self.sink.ensure_dir(path)
+
+    def write(self, path, content):
+        """提交一个文本文件 (空内容不生成文件)"""
+        if not content: return
+        slot = hash(path) % len(self._stages)
+        batch = self._batches[slot]
+        batch.append((path, content))
+        if len(batch) >= self.batch_size:
+            self._batches[slot] = []
+            self._stages[slot].submit(batch)
+
+    def _write_batch(self, batch):
+        files = size = 0
+        profiling = self.profiler.enabled
+        for path, content in batch:
+            if profiling: t0 = time.perf_counter()
+            data = content.encode('utf-8')
+            try:
+                self.sink.write_bytes(path, data)
+            except Exception as e:
+                if self.on_error: self.on_error(path, e)
+                else: print(f"Write Error: {e}")
+                continue
+            files += 1
+            size += len(data)
+            if profiling:
+                self.profiler.record(path, "write", time.perf_counter() - t0, len(data))
+        with self._lock:
+            self.files += files
+            self.bytes += size
+
+    def close(self):
+        """写出剩余批次并等待后台线程结束"""
+        try:
+            for slot, batch in enumerate(self._batches):
+                if batch:
+                    self._stages[slot].submit(batch)
+            self._batches = [[] for _ in self._stages]
+        finally:
+            for stage in self._stages:
+                stage.close()
+            self._finished = time.perf_counter()
+
+    def stats(self):
+        elapsed = (self._finished or time.perf_counter()) - self._started
+        return {
+            "files": self.files,
+            "bytes": self.bytes,
+            "seconds": round(elapsed, 3),
+            "files_per_sec": round(self.files / elapsed, 1) if elapsed > 0 else 0.0,
+            "mb_per_sec": round(self.bytes / elapsed / 1e6, 2) if elapsed > 0 else 0.0,
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+            return
+        try:
+            self.close()
+        except Exception:
+            pass
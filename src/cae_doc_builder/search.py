@@ -0,0 +1,23 @@
+"""
+检索构建输出目录中的全文索引 (构建时需指定 --search-index)
+
+    python -m cae_doc_builder.search D:/KB "contact AND pressure"
+    python -m cae_doc_builder.search D:/KB "title_path : Mechanical" --limit 5
+"""
+import sys
+import argparse
+from .core.search_index import search
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m cae_doc_builder.search", description="检索知识库输出目录中的全文索引")
+    ap.add_argument("output", help="构建输出目录 (含 .kb_index.sqlite)")
+    ap.add_argument("query", help="FTS5 查询语法")
+    ap.add_argument("--limit", type=int, default=20, help="最多返回的页面数")
+    args = ap.parse_args(argv)
+    for hit in search(args.output, args.query, args.limit):
+        print(f"{hit['path']}\n    {hit['title_path']}\n    {hit['snippet']}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
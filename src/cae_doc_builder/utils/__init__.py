@@ -1 +1,5 @@
 from .path_utils import PathUtils
+from .asset_store import AssetStore
+from .profiler import BuildProfiler, NULL_PROFILER
+from .progress import ProgressChannel
+from .logger import LogService
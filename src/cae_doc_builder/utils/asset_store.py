@@ -0,0 +1,203 @@
+import os
+import re
+import shutil
+import hashlib
+
+try:
+    import fcntl
+    FICLONE = 0x40049409        # Linux ioctl：btrfs / XFS 等支持写时复制的文件系统
+except ImportError:
+    fcntl = None
+
+class AssetStore:
+    """
+    按内容哈希去重的图片仓库 (单次构建内有效)
+
+    - 每张源图片只读取、哈希一次，结果缓存在内存索引中，不再逐图 os.path.exists；
+    - 相同内容只从源目录复制一次，之后以 reflink / 硬链接 (失败时回退为本地复制)
+      的方式放入各个 assets/ 目录；
+    - 同一 assets/ 目录下出现同名但内容不同的图片时，后者改名为 "名称-哈希前缀.ext"；
+      增量构建 (keep_existing) 时目录中已有的文件也参与比较，跳过的页面仍引用的旧图片不会被覆盖。
+
+    多进程构建时 worker 以 defer() 模式运行：只负责读取、哈希源图片并在 Markdown 中
+    留下占位符，命名与落盘由主进程按构建顺序调用 resolve() 完成，结果与串行一致。
+
+    sink 为单文件输出接收器 (core.sinks 的 zip / tar / SQLite) 时，图片与附件按相同的相对路径
+    写入其中，不再落盘、也不做链接；为 None 时写入目录。
+    """
+    LINK_MODES = ("auto", "hardlink", "copy")
+    TOKEN_RE = re.compile(r'assets/cdb-asset-(\d+)')
+
+    def __init__(self, link_mode="auto"):
+        if link_mode not in self.LINK_MODES:
+            raise ValueError(f"未知的链接模式: {link_mode}")
+        self.link_mode = link_mode
+        self.sink = None        # 单文件输出接收器，由 Engine 在构建期间设置
+        self.reset()
+
+    def reset(self):
+        """开始新一轮构建时清空索引"""
+        self._sources = {}      # 源图片路径 -> (内容哈希, 大小)，不存在时为 None
+        self._first_copy = {}   # 内容哈希 -> 本次构建首次落盘的输出路径
+        self._placed = {}       # (assets 目录, 文件名) -> 内容哈希
+        self._known_dirs = set()
+        self.keep_existing = False  # 增量构建：输出目录中已有的同名文件视为已占用
+        self._pending = None    # defer 模式下待主进程处理的放置请求
+        self._attachments = []  # defer 模式下待主进程复制的附件 [(源文件, 输出路径)]
+
+    def place(self, src_path, assets_dir):
+        """
+        把源图片放入 assets_dir
+        :return: assets_dir 内的文件名；源文件不存在或复制失败时返回 None
+        """
+        info = self._source_info(src_path)
+        if info is None: return None
+        if self._pending is not None:
+            self._pending.append((src_path, assets_dir, info))
+            return f"cdb-asset-{len(self._pending) - 1}"
+        return self._assign(src_path, info, assets_dir)
+
+    def defer(self, enabled=True):
+        """进入延迟模式 (worker 端或缓存转换结果时)，之后的 place() 只返回占位符"""
+        self._pending = [] if enabled else None
+
+    def take_pending(self):
+        pending, self._pending = self._pending or [], []
+        return pending
+
+    def attach(self, src_path, dst_path):
+        """原样复制附件 (如 PDF 手册) 到 dst_path，已存在时保留；defer 模式下交给主进程"""
+        if self._pending is not None:
+            self._attachments.append((src_path, dst_path))
+        else:
+            self.copy_attachment(src_path, dst_path)
+
+    def copy_attachment(self, src_path, dst_path):
+        if self.sink is not None:
+            self.sink.add_file(dst_path, src_path)
+            return
+        dst_dir = os.path.dirname(dst_path)
+        if dst_dir not in self._known_dirs:
+            os.makedirs(dst_dir, exist_ok=True)
+            self._known_dirs.add(dst_dir)
+        if not os.path.exists(dst_path):
+            shutil.copy2(src_path, dst_path)
+
+    def take_attachments(self):
+        attachments, self._attachments = self._attachments, []
+        return attachments
+
+    def __getstate__(self):
+        # 接收器持有打开的归档与线程锁，不随适配器传给 worker 进程
+        state = self.__dict__.copy()
+        state['sink'] = None
+        return state
+
+    def resolve(self, content, pending):
+        """主进程端：为 worker 记录的放置请求分配文件名、落盘，并替换 Markdown 中的占位符"""
+        names = []
+        for src_path, assets_dir, info in pending:
+            self._sources.setdefault(src_path, info)
+            names.append(self._assign(src_path, info, assets_dir) or os.path.basename(src_path))
+        if not content or not names: return content
+        return self.TOKEN_RE.sub(lambda m: f"assets/{names[int(m.group(1))]}", content)
+
+    def _assign(self, src_path, info, assets_dir):
+        digest = info[0]
+        name = os.path.basename(src_path)
+        placed = self._occupant(assets_dir, name)
+        if placed == digest: return name
+        if placed is not None:
+            stem, ext = os.path.splitext(name)
+            name = f"{stem}-{digest[:8]}{ext}"
+            if self._occupant(assets_dir, name) == digest: return name
+
+        if not self._materialize(src_path, info, os.path.join(assets_dir, name)):
+            return None
+        self._placed[(assets_dir, name)] = digest
+        return name
+
+    def _occupant(self, assets_dir, name):
+        """(assets_dir, name) 处已有内容的哈希：本次构建放置的，或 keep_existing 时上次构建留下的文件"""
+        key = (assets_dir, name)
+        if key not in self._placed and self.keep_existing:
+            try:
+                with open(os.path.join(assets_dir, name), 'rb') as f:
+                    self._placed[key] = hashlib.sha1(f.read()).hexdigest()
+            except OSError:
+                return None
+        return self._placed.get(key)
+
+    def _source_info(self, path):
+        if path not in self._sources:
+            try:
+                with open(path, 'rb') as f:
+                    data = f.read()
+                self._sources[path] = (hashlib.sha1(data).hexdigest(), len(data))
+            except OSError:
+                self._sources[path] = None
+        return self._sources[path]
+
+    def _materialize(self, src_path, info, dst):
+        digest, size = info
+        if self.sink is not None:
+            try:
+                self.sink.add_file(dst, src_path, digest)
+            except OSError:
+                return False
+            return True
+        dst_dir = os.path.dirname(dst)
+        if dst_dir not in self._known_dirs:
+            os.makedirs(dst_dir, exist_ok=True)
+            self._known_dirs.add(dst_dir)
+
+        # 上一次构建留下的同内容文件直接复用
+        if os.path.exists(dst) and self._same_content(dst, digest, size):
+            self._first_copy.setdefault(digest, dst)
+            return True
+
+        # 先写临时文件再原子替换，避免中断时留下半截文件
+        tmp = f"{dst}.{os.getpid()}.tmp"
+        first = self._first_copy.get(digest)
+        try:
+            if not (first and self._link(first, tmp)):
+                shutil.copy2(src_path, tmp)
+            os.replace(tmp, dst)
+        except OSError:
+            try: os.remove(tmp)
+            except OSError: pass
+            return False
+        self._first_copy.setdefault(digest, dst)
+        return True
+
+    def _same_content(self, path, digest, size):
+        first = self._first_copy.get(digest)
+        try:
+            if first and os.path.samefile(first, path): return True
+            if os.path.getsize(path) != size: return False
+            with open(path, 'rb') as f:
+                return hashlib.sha1(f.read()).hexdigest() == digest
+        except OSError:
+            return False
+
+    def _link(self, src, dst):
+        if self.link_mode == "copy": return False
+        if self.link_mode == "auto" and self._reflink(src, dst): return True
+        try:
+            os.link(src, dst)
+            return True
+        except (OSError, AttributeError):
+            return False
+
+    @staticmethod
+    def _reflink(src, dst):
+        if fcntl is None: return False
+        try:
+            with open(src, 'rb') as fs, open(dst, 'wb') as fd:
+                fcntl.ioctl(fd.fileno(), FICLONE, fs.fileno())
+            shutil.copystat(src, dst)
+            return True
+        except OSError:
+            try: os.remove(dst)
+            except OSError: pass
+            return False
@@ -0,0 +1,64 @@
+import os
+import json
+import hashlib
+
+def default_cache_dir():
+    """
+    持久化缓存目录：优先环境变量 CAE_DOC_BUILDER_CACHE，
+    其次 Windows 的 %LOCALAPPDATA%，否则 ~/.cache
+    """
+    env_dir = os.environ.get("CAE_DOC_BUILDER_CACHE")
+    if env_dir: return env_dir
+    base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "cae_doc_builder")
+
+def cache_file_path(name, scope, ext):
+    """按作用域 (通常是文档源目录) 生成缓存文件路径，不同文档集互不干扰"""
+    digest = hashlib.sha1(os.path.normcase(os.path.abspath(scope)).encode('utf-8')).hexdigest()[:16]
+    return os.path.join(default_cache_dir(), f"{name}-{digest}.{ext}")
+
+
+class FileStampCache:
+    """
+    以 (文件路径, mtime) 为键的持久化 JSON 缓存
+
+    文件被修改后 mtime 变化，旧值自动失效；读写失败时静默退化为无缓存。
+    """
+
+    def __init__(self, name, scope):
+        self.path = cache_file_path(name, scope, "json")
+        self.dirty = False
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.data = json.load(f)
+        except (OSError, ValueError):
+            self.data = {}
+
+    @staticmethod
+    def stamp(path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def get(self, path, stamp):
+        hit = self.data.get(path)
+        if hit and hit[0] == stamp:
+            return True, hit[1]
+        return False, None
+
+    def put(self, path, stamp, value):
+        self.data[path] = [stamp, value]
+        self.dirty = True
+
+    def save(self):
+        if not self.dirty: return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+        except OSError:
+            pass
@@ -0,0 +1,68 @@
+import os
+
+class FileIndex:
+    """
+    文档根目录的一次性文件索引
+
+    用一次 os.scandir 遍历收集根目录下所有文件和目录的路径 (经 normpath + normcase
+    归一化，Windows 下大小写不敏感)，之后的存在性判断全部在内存中完成，
+    避免对每个 href / 图片调用 os.path.exists (网络盘与杀毒扫描下代价很高)。
+    根目录之外的路径回退到 os.path.exists。
+    与 os.path.exists 一致地跟随符号链接：同一真实目录 (按 (st_dev, st_ino) 判断) 只展开一次，
+    避免链接循环，经其他路径 (别名) 到达的查询回退到 os.path.exists；悬空的链接视为不存在。
+    """
+
+    def __init__(self, root):
+        self.root = os.path.normcase(os.path.normpath(os.path.abspath(root)))
+        self._paths = set()
+        self._aliases = []      # 未展开的重复目录 (指向已索引目录的链接)
+        self._build()
+
+    def _build(self):
+        stack = [self.root]
+        visited = set()
+        try:
+            self._visit(self.root, visited)
+        except OSError:
+            return
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        path = os.path.normcase(entry.path)
+                        try:
+                            if entry.is_dir():
+                                self._paths.add(path)
+                                if self._visit(path, visited):
+                                    stack.append(path)
+                                else:
+                                    self._aliases.append(path)
+                            elif not entry.is_symlink() or os.path.exists(entry.path):
+                                self._paths.add(path)
+                        except OSError:
+                            pass
+            except OSError:
+                continue
+
+    @staticmethod
+    def _visit(path, visited):
+        """首次到达该目录 (按真实目录计) 时返回 True"""
+        st = os.stat(path)
+        key = (st.st_dev, st.st_ino)
+        if key in visited: return False
+        visited.add(key)
+        return True
+
+    def __len__(self):
+        return len(self._paths)
+
+    def exists(self, path):
+        key = os.path.normcase(os.path.normpath(os.path.abspath(path)))
+        if key == self.root: return True
+        if not key.startswith(self.root + os.sep):
+            return os.path.exists(path)
+        if key in self._paths: return True
+        if any(key.startswith(alias + os.sep) for alias in self._aliases):
+            return os.path.exists(path)
+        return False
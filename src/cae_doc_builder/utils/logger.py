@@ -0,0 +1,174 @@
+"""
+日志子系统 (基于标准库 logging)
+
+适配器与引擎仍以 adapter.log(msg) 记录日志，构建时传入 LogService 实例即可 (它本身可作为 logger_func 调用)：
+    - 级别按消息开头的图标推断：❌ 为 ERROR，⚠️ 为 WARNING，其余为 INFO，低于设定级别的消息直接丢弃；
+    - 调用方只把记录放入内存队列 (QueueHandler)，格式化、界面回调与写文件都在后台 QueueListener 线程完成，
+      转换与写入线程不会因界面刷新或磁盘 I/O 而阻塞；
+    - 重复的警告按消息模板 (去掉路径、数字等可变部分) 限流，每个时间窗口最多放行 rate_limit 条，
+      其余只计数，同类的下一条消息或关闭时的汇总中给出省略的条数；
+    - 可选按大小轮转的日志文件。
+
+        with LogService(callback=print, level="INFO", log_file="build.log") as log:
+            adapter = AnsysAdapter(src, ".", log)
+"""
+import re
+import time
+import queue
+import logging
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+LOGGER_NAME = "cae_doc_builder"
+LEVEL_PREFIXES = (("❌", logging.ERROR), ("⚠", logging.WARNING))
+LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR")
+FILE_FORMAT = "%(asctime)s [%(levelname)s] %(message)s"
+
+# 消息模板：截断到第一个可变部分 (路径、括号中的标题、冒号后的异常信息、数字) 之前
+TEMPLATE_RE = re.compile(r'[\[(（:：/\\\d"\']')
+
+
+def level_of(msg):
+    text = msg.lstrip()
+    for prefix, level in LEVEL_PREFIXES:
+        if text.startswith(prefix): return level
+    return logging.INFO
+
+def message_template(msg):
+    m = TEMPLATE_RE.search(msg)
+    return (msg[:m.start()] if m else msg).strip()[:80]
+
+def log_message(msg):
+    """
+    未配置 LogService 时适配器的默认日志函数：按推断的级别写入包日志器；
+    包日志器及其祖先都没有处理器时 (如工作进程、未配置 logging 的脚本) 直接 print，
+    否则 INFO 消息会被 logging 的 lastResort 处理器 (只输出 WARNING 及以上) 丢弃
+    """
+    logger = logging.getLogger(LOGGER_NAME)
+    if logger.hasHandlers():
+        logger.log(level_of(msg), msg)
+    else:
+        print(msg)
+
+
+class RateLimitFilter(logging.Filter):
+    """同一模板的消息 (WARNING 及以上) 每 window 秒最多放行 limit 条"""
+
+    def __init__(self, limit=20, window=10.0, level=logging.WARNING):
+        super().__init__()
+        self.limit = limit
+        self.window = window
+        self.level = level
+        self._lock = threading.Lock()
+        self._counters = {}         # (级别, 模板) -> [窗口开始时刻, 已放行条数, 已省略条数]
+
+    def filter(self, record):
+        if record.levelno < self.level or not self.limit or getattr(record, 'summary', False):
+            return True
+        key = (record.levelno, message_template(record.getMessage()))
+        now = time.monotonic()
+        with self._lock:
+            counter = self._counters.get(key)
+            if counter is None or now - counter[0] >= self.window:
+                suppressed = counter[2] if counter else 0
+                self._counters[key] = [now, 1, 0]
+                if suppressed:
+                    record.msg = f"{record.getMessage()} (此前另有 {suppressed} 条同类消息已省略)"
+                    record.args = None
+                return True
+            if counter[1] < self.limit:
+                counter[1] += 1
+                return True
+            counter[2] += 1
+            return False
+
+    def take_suppressed(self):
+        """取出尚未报告的省略计数 [(级别, 模板, 条数)]"""
+        with self._lock:
+            pending = [(level, template, c[2]) for (level, template), c in self._counters.items() if c[2]]
+            self._counters.clear()
+        return pending
+
+
+class CallbackHandler(logging.Handler):
+    """把格式化后的消息交给回调 (界面事件通道、print 等)"""
+
+    def __init__(self, callback, level=logging.NOTSET):
+        super().__init__(level)
+        self.callback = callback
+
+    def emit(self, record):
+        try:
+            self.callback(self.format(record))
+        except Exception:
+            self.handleError(record)
+
+
+class _ServiceHandler(QueueHandler):
+    """LogService 挂在包日志器上的队列处理器 (同一日志器上只保留最新的一个)"""
+
+
+class LogService:
+    """
+    一次运行 (GUI 会话或命令行构建) 的日志服务，close() 时排空队列并停止后台线程
+    同一日志器上只挂一个服务：新建服务时取代尚未关闭的旧服务，记录不会重复输出；
+    日志器的 propagate 保持调用方的设置，根日志器上的处理器照常收到记录
+    """
+
+    def __init__(self, callback=None, level=logging.INFO, log_file=None, max_bytes=5 * 1024 * 1024,
+                 backup_count=3, rate_limit=20, rate_window=10.0, name=LOGGER_NAME):
+        """
+        :param callback: 接收格式化消息的回调 (如 ProgressChannel.log、print)，None 为不输出
+        :param level: 最低记录级别 (logging 常量或 "INFO" 等名称)
+        :param log_file: 日志文件路径，按 max_bytes 轮转并保留 backup_count 个旧文件
+        :param rate_limit: 同类警告每 rate_window 秒最多输出的条数 (0 为不限流)
+        """
+        self.logger = logging.getLogger(name)
+        self.logger.setLevel(level.upper() if isinstance(level, str) else level)
+        self.limiter = RateLimitFilter(rate_limit, rate_window)
+
+        handlers = []
+        if callback is not None:
+            handlers.append(CallbackHandler(callback))
+        if log_file:
+            file_handler = RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count,
+                                               encoding='utf-8', delay=True)
+            file_handler.setFormatter(logging.Formatter(FILE_FORMAT))
+            handlers.append(file_handler)
+        self._handlers = handlers
+
+        self._queue_handler = _ServiceHandler(queue.SimpleQueue())
+        self._queue_handler.addFilter(self.limiter)
+        self._listener = QueueListener(self._queue_handler.queue, *handlers, respect_handler_level=True)
+        for handler in self.logger.handlers[:]:
+            if isinstance(handler, _ServiceHandler):
+                self.logger.removeHandler(handler)
+        self.logger.addHandler(self._queue_handler)
+        self._listener.start()
+
+    def __call__(self, msg, level=None):
+        """与原 logger_func 相同的调用方式：log(msg)"""
+        self.logger.log(level or level_of(msg), msg)
+
+    log = __call__
+
+    def debug(self, msg): self.logger.debug(msg)
+    def info(self, msg): self.logger.info(msg)
+    def warning(self, msg): self.logger.warning(msg)
+    def error(self, msg): self.logger.error(msg)
+
+    def close(self):
+        if self._listener is None: return
+        for level, template, count in self.limiter.take_suppressed():
+            self.logger.log(level, f"{template} …：另有 {count} 条同类消息已省略", extra={'summary': True})
+        self.logger.removeHandler(self._queue_handler)
+        self._listener.stop()       # 处理完队列中剩余的记录后返回
+        self._listener = None
+        for handler in self._handlers:
+            handler.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
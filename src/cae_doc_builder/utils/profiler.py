@@ -0,0 +1,212 @@
+"""
+构建性能分析 (按页面、按阶段计时)
+
+    read        读取源文件 (Engine 读取阶段)
+    parse       BeautifulSoup 解析
+    strip       噪音清洗与公式替换 (CleanupRules 单次遍历，不含图片放置)
+    images      图片搬运
+    markdown    Markdown 生成
+    other       转换中未单独计时的部分 (convert 减去上述子阶段)
+    write       写出 Markdown 文件
+    peak        转换期间的内存峰值 (字节，相对转换开始时；需 tracemalloc，见 peak_memory)
+
+默认使用 NULL_PROFILER / NULL_TIMER：stage() 返回共享的空上下文，record/merge 为空操作，
+关闭时只剩一次方法调用的开销。
+"""
+import os
+import json
+import time
+import threading
+import tracemalloc
+from contextlib import nullcontext, contextmanager
+
+CONVERT_STAGES = ("parse", "strip", "images", "markdown")
+REPORT_STAGES = ("read",) + CONVERT_STAGES + ("other", "write")
+
+
+class PageTimer:
+    """单个页面的阶段计时器：stages 为 {阶段: [秒, 字节]}，可直接跨进程传回"""
+    __slots__ = ('stages',)
+    enabled = True
+
+    def __init__(self):
+        self.stages = {}
+
+    def add(self, name, seconds, nbytes=0):
+        entry = self.stages.get(name)
+        if entry is None:
+            self.stages[name] = [seconds, nbytes]
+        else:
+            entry[0] += seconds
+            entry[1] += nbytes
+
+    def stage(self, name, nbytes=0):
+        return _Stage(self, name, nbytes)
+
+
+class _Stage:
+    __slots__ = ('timer', 'name', 'nbytes', 't0')
+
+    def __init__(self, timer, name, nbytes):
+        self.timer, self.name, self.nbytes = timer, name, nbytes
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.timer.add(self.name, time.perf_counter() - self.t0, self.nbytes)
+
+
+class _NullTimer:
+    __slots__ = ()
+    enabled = False
+    stages = None
+    _ctx = nullcontext()
+
+    def add(self, name, seconds, nbytes=0):
+        pass
+
+    def stage(self, name, nbytes=0):
+        return self._ctx
+
+NULL_TIMER = _NullTimer()
+
+
+@contextmanager
+def peak_memory(timer):
+    """
+    tracemalloc 开启时，把代码块执行期间的内存峰值 (相对开始时) 记为 timer 的 peak 项
+    tracemalloc 按进程统计：串行构建中包含同时运行的读取/写入线程的分配，为近似值
+    """
+    if not tracemalloc.is_tracing():
+        yield
+        return
+    base = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    try:
+        yield
+    finally:
+        timer.add("peak", 0.0, max(0, tracemalloc.get_traced_memory()[1] - base))
+
+
+class BuildProfiler:
+    """汇总一次构建中所有页面的阶段耗时，可在读取/写入线程中并发调用"""
+    enabled = True
+
+    def __init__(self, top=20):
+        self.top = top
+        self._pages = {}        # 输出路径 -> [源文件, {阶段: [秒, 字节]}]
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+
+    def timer(self):
+        return PageTimer()
+
+    def record(self, key, name, seconds, nbytes=0):
+        with self._lock:
+            stages = self._entry(key)[1]
+            entry = stages.setdefault(name, [0.0, 0])
+            entry[0] += seconds
+            entry[1] += nbytes
+
+    def merge(self, key, stages, source=None):
+        """并入转换阶段的计时 (来自 PageTimer.stages)"""
+        with self._lock:
+            entry = self._entry(key)
+            if source: entry[0] = source
+            for name, (seconds, nbytes) in (stages or {}).items():
+                target = entry[1].setdefault(name, [0.0, 0])
+                target[0] += seconds
+                target[1] += nbytes
+
+    def _entry(self, key):
+        entry = self._pages.get(key)
+        if entry is None:
+            entry = self._pages[key] = [None, {}]
+        return entry
+
+    def report(self, root=None):
+        """生成报告：各阶段合计与分位数，以及最慢的 top 个页面"""
+        with self._lock:
+            pages = list(self._pages.items())
+
+        per_stage = {name: [] for name in REPORT_STAGES}
+        stage_bytes = dict.fromkeys(REPORT_STAGES, 0)
+        rows = []
+        for key, (source, stages) in pages:
+            seconds = {name: s for name, (s, _) in stages.items()}
+            peak = stages["peak"][1] if seconds.pop("peak", None) is not None else None
+            convert = seconds.pop("convert", None)
+            if convert is not None:
+                seconds["other"] = max(0.0, convert - sum(seconds.get(n, 0.0) for n in CONVERT_STAGES))
+            for name, value in seconds.items():
+                if name in per_stage:
+                    per_stage[name].append(value)
+                    stage_bytes[name] += stages.get(name, (0, 0))[1]
+            total = sum(seconds.values())
+            rows.append((total, key, source, seconds, peak))
+
+        page_name = lambda key: os.path.relpath(key, root) if root else key
+        rows.sort(key=lambda r: r[0], reverse=True)
+        report = {
+            "pages": len(rows),
+            "wall_seconds": round(time.perf_counter() - self._started, 3),
+            "stages": {name: _summary(values, stage_bytes[name]) for name, values in per_stage.items() if values},
+            "slowest": [dict({
+                "page": page_name(key),
+                "source": source,
+                "total_ms": round(total * 1000, 3),
+                "stages_ms": {n: round(s * 1000, 3) for n, s in seconds.items()},
+            }, **({"peak_mb": _mb(peak)} if peak is not None else {}))
+                for total, key, source, seconds, peak in rows[:self.top]],
+        }
+
+        peaks = sorted((r for r in rows if r[4] is not None), key=lambda r: r[4], reverse=True)
+        if peaks:
+            values = sorted(r[4] for r in peaks)
+            pick = lambda q: values[min(len(values) - 1, int(q * len(values)))]
+            report["memory"] = {"count": len(values), "p50_mb": _mb(pick(0.50)), "p90_mb": _mb(pick(0.90)),
+                                "p99_mb": _mb(pick(0.99)), "max_mb": _mb(values[-1])}
+            report["largest_peak"] = [{"page": page_name(key), "source": source, "peak_mb": _mb(peak)}
+                                      for _, key, source, _, peak in peaks[:self.top]]
+        return report
+
+    def save(self, path, root=None):
+        report = self.report(root)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        return report
+
+
+class _NullProfiler:
+    enabled = False
+
+    def timer(self):
+        return NULL_TIMER
+
+    def record(self, key, name, seconds, nbytes=0):
+        pass
+
+    def merge(self, key, stages, source=None):
+        pass
+
+NULL_PROFILER = _NullProfiler()
+
+
+def _mb(nbytes):
+    return round(nbytes / (1024 * 1024), 3)
+
+def _summary(values, nbytes):
+    ordered = sorted(values)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+    total = sum(ordered)
+    return {
+        "count": len(ordered),
+        "seconds": round(total, 3),
+        "bytes": nbytes,
+        "p50_ms": round(pick(0.50), 3),
+        "p90_ms": round(pick(0.90), 3),
+        "p99_ms": round(pick(0.99), 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
@@ -0,0 +1,150 @@
+"""
+构建进度与日志的事件通道 (工作线程 → 界面线程)
+
+引擎与适配器在工作线程中调用 log() / progress() / status()，只更新内存中的状态，不触碰界面；
+界面线程以固定帧率调用 poll()，一次取回最新的进度 (中间状态被合并) 与一批日志，
+不再每条消息各自排队一个 root.after，大量页面或日志涌入时界面事件队列不会被淹没。
+
+吞吐与剩余时间按源文件大小加权：start() 在后台线程统计各节点的源文件大小 (同一文件只计一次)，
+按先序 (即引擎的构建顺序与进度回调顺序) 累加为前缀和，第 n 个页面完成时即可得到已处理的字节数。
+"""
+import os
+import threading
+import time
+from collections import deque
+from itertools import accumulate
+
+PAGE_OVERHEAD = 4096        # 每个页面的固定开销 (折算为字节)，无源文件或复用转换结果的节点也有权重
+RATE_WINDOW = 5.0           # 页/秒、MB/秒 按最近几秒计算
+MAX_LOGS_PER_POLL = 500     # 每帧最多取回的日志条数，其余留到下一帧
+
+_PROGRESS = object()        # 最近一次更新来自 progress() (快照在 poll 时计算)
+
+
+class ProgressChannel:
+    """
+        channel = ProgressChannel()
+        channel.start(nodes)
+        engine.build_nodes(nodes, out, progress_callback=channel.progress)   # 工作线程
+        logs, state = channel.poll()                                        # 界面线程，每帧一次
+    """
+
+    def __init__(self, max_logs=MAX_LOGS_PER_POLL):
+        self.max_logs = max_logs
+        self._lock = threading.Lock()
+        self._logs = deque()
+        self._generation = 0
+        self._latest = None         # 待界面处理的最新更新：_PROGRESS 或 (进度值, 状态文本)
+        self._reset()
+
+    def _reset(self):
+        self._done = 0
+        self._total = 0
+        self._started = time.perf_counter()
+        self._bytes = None          # 前缀和：前 n 个节点的源文件字节数 (统计完成前为 None)
+        self._samples = deque()     # (时刻, 已完成数)，用于计算最近的速率
+
+    # --- 工作线程端 ---
+    def log(self, msg):
+        self._logs.append(msg)
+
+    def status(self, value, text=None):
+        """直接设置进度条与状态文本 (扫描、完成、出错等)"""
+        with self._lock:
+            self._latest = (value, text)
+
+    def start(self, nodes):
+        """开始一次构建：重置计数，并在后台线程统计各节点的源文件大小"""
+        nodes = list(nodes)
+        with self._lock:
+            self._reset()
+            self._generation += 1
+            generation = self._generation
+        threading.Thread(target=self._measure, args=(nodes, generation), daemon=True).start()
+
+    def progress(self, done, total):
+        """引擎的 progress_callback"""
+        with self._lock:
+            self._done = done
+            self._total = total
+            self._latest = _PROGRESS
+
+    def _measure(self, nodes, generation):
+        seen = set()
+        sizes = []
+        stack = list(reversed(nodes))
+        while stack:
+            node = stack.pop()
+            size = 0
+            path = node.source_path
+            if path and os.path.normcase(path) not in seen:
+                seen.add(os.path.normcase(path))
+                try:
+                    size = os.path.getsize(path)
+                except OSError:
+                    pass
+            sizes.append(size)
+            stack.extend(reversed(node.children))
+        prefix = [0]
+        prefix.extend(accumulate(sizes))
+        with self._lock:
+            if generation == self._generation:
+                self._bytes = prefix
+
+    # --- 界面线程端 ---
+    def poll(self):
+        """
+        :return: (日志列表, 状态)；状态为 None 表示自上次以来没有更新，否则为 dict：
+                 value 进度百分比，text 状态文本 (仅 status() 设置)，
+                 以及构建进度 done / total / pages_per_sec / mb_per_sec / eta (未知时为 None)
+        """
+        logs = []
+        while self._logs and len(logs) < self.max_logs:
+            logs.append(self._logs.popleft())
+
+        with self._lock:
+            latest, self._latest = self._latest, None
+            if latest is None:
+                return logs, None
+            if latest is not _PROGRESS:
+                value, text = latest
+                return logs, {'value': value, 'text': text}
+            return logs, self._snapshot()
+
+    def _snapshot(self):
+        now = time.perf_counter()
+        done, total, prefix = self._done, self._total, self._bytes
+        samples = self._samples
+        samples.append((now, done))
+        while len(samples) > 2 and now - samples[0][0] > RATE_WINDOW:
+            samples.popleft()
+        t0, d0 = samples[0]
+        span = now - t0
+
+        pages_per_sec = (done - d0) / span if span > 0 else None
+        mb_per_sec = eta = None
+        if prefix is not None:
+            done_bytes = prefix[min(done, len(prefix) - 1)]
+            total_bytes = prefix[min(total, len(prefix) - 1)]
+            if span > 0:
+                mb_per_sec = (done_bytes - prefix[min(d0, len(prefix) - 1)]) / span / 1e6
+            done_w = done_bytes + done * PAGE_OVERHEAD
+            remaining_w = total_bytes + total * PAGE_OVERHEAD - done_w
+        else:
+            done_w, remaining_w = done, total - done
+        if done_w > 0:
+            eta = (now - self._started) * max(0, remaining_w) / done_w
+
+        return {
+            'value': done * 100 / total if total else 100, 'text': None,
+            'done': done, 'total': total,
+            'pages_per_sec': pages_per_sec, 'mb_per_sec': mb_per_sec, 'eta': eta,
+        }
+
+
+def format_eta(seconds):
+    if seconds is None: return "--:--"
+    seconds = int(seconds)
+    h, rest = divmod(seconds, 3600)
+    m, s = divmod(rest, 60)
+    return f"{h}:{m:02d}:{s:02d}" if h else f"{m:02d}:{s:02d}"
@@ -0,0 +1,81 @@
+"""
+测试公共夹具：在临时目录中生成小规模合成语料 (见 benchmarks/synth_corpus.py)，
+持久化缓存 (结构缓存、标题缓存) 指向临时目录，不读写用户缓存
+"""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from synth_corpus import generate
+from cae_doc_builder.core.engine import DocBuilderEngine
+from cae_doc_builder.adapters.ansys_adapter import AnsysAdapter
+from cae_doc_builder.adapters.ansa_adapter import AnsaAdapter
+from cae_doc_builder.adapters.abaqus_adapter import AbaqusAdapter
+
+ADAPTERS = {"ansa": AnsaAdapter, "ansys": AnsysAdapter, "abaqus": AbaqusAdapter}
+CORPUS_PAGES = 40
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("CAE_DOC_BUILDER_CACHE", str(tmp_path / "cache"))
+
+
+@pytest.fixture(scope="session")
+def corpus(tmp_path_factory):
+    """corpus(fmt) -> 合成语料目录 (同一会话内每种格式只生成一次)"""
+    roots = {}
+
+    def get(fmt):
+        if fmt not in roots:
+            root = str(tmp_path_factory.mktemp(f"{fmt}-corpus"))
+            generate(fmt, root, CORPUS_PAGES, seed=1)
+            roots[fmt] = root
+        return roots[fmt]
+    return get
+
+
+class Build:
+    """一个适配器 + 引擎，记录日志；scan() 扫描结构，run() 构建"""
+
+    def __init__(self, fmt, src):
+        self.logs = []
+        self.src = src
+        self.adapter = ADAPTERS[fmt](src, ".", self.logs.append)
+        self.engine = DocBuilderEngine(self.adapter)
+
+    def scan(self):
+        return self.engine.analyze_structure(self.src, use_cache=False)
+
+    def run(self, out, nodes=None, **kwargs):
+        self.engine.build_nodes(nodes if nodes is not None else self.scan(), str(out), **kwargs)
+        return self
+
+
+@pytest.fixture
+def build(corpus):
+    """build(fmt) -> Build"""
+    return lambda fmt: Build(fmt, corpus(fmt))
+
+
+def iter_nodes(nodes):
+    for node in nodes:
+        yield node
+        yield from iter_nodes(node.children)
+
+
+def read_tree(root):
+    """{相对路径: 字节内容}，不含清单、索引等附属文件"""
+    files = {}
+    for folder, _, names in os.walk(root):
+        for name in names:
+            if name.startswith('.'): continue
+            path = os.path.join(folder, name)
+            with open(path, 'rb') as f:
+                files[os.path.relpath(path, root).replace(os.sep, '/')] = f.read()
+    return files
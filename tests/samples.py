@@ -0,0 +1,31 @@
+"""转换等价性测试共用的页面样本"""
+import os
+import glob
+
+# 覆盖实体、注释、预格式文本、脚本、表格、公式图片与噪音块的手写页面
+EDGE_PAGE = """<html><head><title>Edge</title><style>p { color: red; }</style></head><body>
+<div class="navheader"><a href="#">Prev</a> <img src="nav.gif"/></div>
+<div class="section" role="main"><h1>Title &amp; <em>more</em></h1>
+<p>a &lt; b &gt; c &amp; d <!-- comment --> <b>bold</b><i>it</i> x<sup>2</sup>
+next line</p>
+<pre>code  <b>x</b>
+  indented &lt;tag&gt;</pre>
+<script>var s = "<p>not text</p>";</script>
+<ul><li>one<br/>two</li><li><a href="x.html">link</a> tail</li></ul>
+<table><tr><th>h1</th><th>h2</th></tr><tr><td>c &nbsp; d</td><td><code>x_y*z</code></td></tr></table>
+<p><img alt="E = mc^2" src="f.gif"/> text after <img alt="plain" src="pic.png"/></p>
+<div class="sphinxsidebar"><p>sidebar</p></div><aside>aside</aside>
+<p>Header link<a class="headerlink" href="#x">¶</a></p>
+</div><div class="navfooter">Home</div></body></html>"""
+
+
+def read(path):
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        return f.read()
+
+
+def sample_pages(corpus, fmt, count=8):
+    """语料中均匀抽取的若干 HTML 页面"""
+    paths = sorted(glob.glob(os.path.join(corpus(fmt), "**", "*.htm*"), recursive=True))
+    step = max(1, len(paths) // count)
+    return paths[::step][:count]
@@ -0,0 +1,53 @@
+"""Ansys toc.toc：lxml 流式解析与 BeautifulSoup 解析结果相同，并行扫描与串行相同"""
+import glob
+import os
+
+from conftest import Build
+from synth_corpus import generate
+from cae_doc_builder.adapters.ansys_toc import _parse_streaming, _parse_with_soup, parse_book_toc
+
+# 重复的 href、同一文件的不同锚点、没有子列表的 dd、多层嵌套、没有 title2 的标题
+TOC = """<?xml version="1.0" encoding="UTF-8"?>
+<toc><title href="intro.html">Edge Guide</title><dl>
+<dt><span class="chapter"><a href="a.html#s1">Chapter <b>A</b></a></span></dt>
+<dd><dl>
+  <dt><a href="a1.html">A1</a></dt>
+  <dt><a href="a1.html">A1 again</a></dt>
+  <dt><a href="a1.html#x">A1 section</a></dt>
+  <dd><p>note</p></dd>
+  <dt><a href="a2.html">A2</a></dt>
+  <dd><div><dl><dt><a href="a2x.html">A2x</a></dt><dt><a href="#">Empty href</a></dt><dt><a href="#">Empty href</a></dt></dl></div></dd>
+</dl></dd>
+<dt><a href="a.html#s2">Chapter A, part 2</a></dt>
+<dt>No link</dt>
+<dt><a href="b.html">Chapter B</a></dt>
+</dl></toc>"""
+
+
+def test_streaming_matches_soup(corpus, tmp_path):
+    edge = tmp_path / "toc.toc"
+    edge.write_text(TOC, encoding='utf-8')
+    tocs = [str(edge)] + glob.glob(os.path.join(corpus("ansys"), "help", "*", "toc.toc"))
+    for toc in tocs:
+        book_dir = os.path.dirname(toc)
+        streamed = _parse_streaming(toc, book_dir, 2, 3)
+        assert streamed == _parse_with_soup(toc, book_dir, 2, 3), toc
+        assert parse_book_toc(toc, book_dir, 2, 3) == streamed
+
+    edge_book = _parse_streaming(str(edge), str(tmp_path), 1, 1)
+    assert edge_book.title == "Edge Guide"
+    assert [n.title for n in edge_book.children] == ["Chapter A", "Chapter A, part 2", "Chapter B"]
+    assert [n.title for n in edge_book.children[0].children] == ["A1", "A1 section", "A2"]
+
+
+def test_parallel_scan_matches_serial(tmp_path):
+    src = str(tmp_path / "src")
+    generate("ansys", src, 1200, seed=2)        # 每 400 页一本书
+    serial = Build("ansys", src)
+    serial.adapter.scan_jobs = 1
+    parallel = Build("ansys", src)
+    parallel.adapter.scan_jobs = 2
+    parallel.adapter.SCAN_POOL_MIN_BOOKS = 2
+    assert len(glob.glob(os.path.join(src, "help", "*", "toc.toc"))) >= 3
+    nodes = serial.scan()
+    assert nodes and parallel.scan() == nodes
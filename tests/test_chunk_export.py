@@ -0,0 +1,98 @@
+"""RAG 分块：块大小上限、标题路径、文本完整性与分片"""
+import os
+import glob
+import json
+
+import pytest
+
+from conftest import read_tree
+from cae_doc_builder.core.structures import DocNode, BuildTask
+from cae_doc_builder.core.chunk_export import ChunkExporter, split_markdown, CHUNK_DIR
+
+SAMPLE = """# Contact
+
+Intro paragraph with several words.
+
+## Pressure
+
+""" + " ".join(f"word{i}" for i in range(300)) + """
+
+```python
+# not a heading
+x = 1
+```
+
+""" + "x" * 500 + """
+
+#### Deep heading
+Line one
+Line two
+
+# Second
+Tail text."""
+
+
+def squeeze(text):
+    return "".join(text.split())
+
+
+@pytest.mark.parametrize("max_chars", [1, 7, 50, 200, 2000])
+def test_chunks_bounded_and_complete(max_chars):
+    chunks = list(split_markdown(SAMPLE, max_chars))
+    assert all(0 < len(text) <= max_chars for _, text in chunks)
+    # 切分只丢弃块边界处的空白
+    assert squeeze("".join(text for _, text in chunks)) == squeeze(SAMPLE)
+
+
+def test_heading_paths():
+    paths = [path for path, _ in split_markdown(SAMPLE, 200)]
+    assert paths[0] == ("Contact",)
+    # 超长小节的每一块都沿用其标题路径；代码块内的 # 不是标题；跳过的层级不占位
+    assert set(paths[1:-2]) == {("Contact", "Pressure")}
+    assert paths[-2:] == [("Contact", "Pressure", "Deep heading"), ("Second",)]
+    assert [text for _, text in split_markdown("# A\n\n## B\n", 100)] == ["# A", "## B"]
+
+
+def test_build_chunks_match_pages(build, tmp_path):
+    build("ansys").run(tmp_path, export_chunks=True, chunk_chars=300)
+    pages = {rel: data.decode('utf-8') for rel, data in read_tree(tmp_path).items()
+             if rel.endswith(".md") and not rel.startswith(CHUNK_DIR)}
+    texts = {}
+    for shard in sorted(glob.glob(os.path.join(tmp_path, CHUNK_DIR, "*", "chunks-*.jsonl"))):
+        with open(shard, encoding='utf-8') as f:
+            for line in f:
+                record = json.loads(line)
+                assert len(record["text"]) <= 300
+                assert record["id"] == f"{record['path']}#{record['chunk']}"
+                texts.setdefault(record["path"], []).append(record["text"])
+    assert texts.keys() == {rel for rel, text in pages.items() if text.strip()}
+    for rel, parts in texts.items():
+        assert squeeze("".join(parts)) == squeeze(pages[rel]), rel
+
+
+def test_shard_rollover_and_discard(tmp_path):
+    out = str(tmp_path)
+
+    def task(name):
+        node = DocNode(name, 1, source_path=f"/src/{name}.html")
+        return BuildTask(node, os.path.join(out, "Book", f"{name}.md"), os.path.join(out, "Book", "assets"),
+                         breadcrumb=("Book", name))
+
+    with ChunkExporter(out, max_chars=20, shard_chunks=3) as chunks:
+        for i in range(4):
+            chunks.add(task(f"p{i}"), f"# Page {i}\n\nfirst paragraph\n\nsecond paragraph")
+    shards = sorted(glob.glob(os.path.join(out, CHUNK_DIR, "Book", "*.jsonl")))
+    counts = []
+    for shard in shards:
+        with open(shard, encoding='utf-8') as f:
+            counts.append(len(f.readlines()))
+    assert chunks.chunks == sum(counts) == 12
+    assert counts == [3, 3, 3, 3]
+
+    # 构建出错时丢弃本次结果，保留上一次的分片
+    with pytest.raises(RuntimeError):
+        with ChunkExporter(out, max_chars=20, shard_chunks=3) as chunks:
+            chunks.add(task("p9"), "# Other\n\ntext")
+            raise RuntimeError
+    assert sorted(glob.glob(os.path.join(out, CHUNK_DIR, "Book", "*.jsonl"))) == shards
+    assert not os.path.exists(os.path.join(out, CHUNK_DIR, "Book.tmp"))
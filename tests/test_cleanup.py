@@ -0,0 +1,109 @@
+"""
+CleanupRules 单次遍历与原先逐选择器清洗的一致性：
+    原流程  soup.select(selector) 逐个 decompose + 单独的图片/公式遍历
+    新流程  CleanupRules.apply(content, place)
+被删除块内的图片不再复制，因此只要求新流程放置的图片是原流程的子集
+"""
+import os
+
+import pytest
+
+from conftest import ADAPTERS
+from samples import EDGE_PAGE, sample_pages, read
+from cae_doc_builder.converters.parser_backend import make_soup, DEFAULT_PARSER
+from cae_doc_builder.converters.html_md import ContentConverter
+from cae_doc_builder.converters.cleanup import CleanupRules, compile_selector
+
+ANSA_SELECTORS = ["div.sphinxsidebar", "div.related", "div.footer", "footer", "div.related-pages",
+                  "a.headerlink", "script", "style", "div.toc-drawer", "aside", "a.sd-stretched-link"]
+DROP_SELECTOR = 'script, style, .navheader, .navfooter'
+
+# 正文容器本身落在噪音元素内 (ANSA 需整页清洗后重新定位)
+NESTED_PAGE = """<html><body><aside><div role="main"><p>inside <img src="a.png"/></p>
+<div class="footer">foot</div></div></aside><article><p>fallback <img src="b.png"/></p></article></body></html>"""
+
+
+class Placer:
+    """假的图片放置回调：记录调用，返回固定的文件名"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, src):
+        self.calls.append(src)
+        return "p_" + os.path.basename(src)
+
+
+def legacy_images(content, place, formula):
+    for img in content.find_all(['img', 'svg']):
+        if formula:
+            alt = img.get('alt', '') or (img.title.string if img.title else '')
+            if alt and any(c in alt for c in ['=', '\\', '+']):
+                img.replace_with(f" ${alt}$ ")
+                continue
+        src = img.get('src')
+        if src and not src.startswith(('http', 'data:')):
+            fname = place(src)
+            if fname:
+                img['src'] = f"assets/{fname}"
+
+
+def legacy(fmt, text, place):
+    soup = make_soup(text, DEFAULT_PARSER)
+    if fmt == "ansa":
+        for selector in ANSA_SELECTORS:
+            for tag in soup.select(selector):
+                tag.decompose()
+        content = ADAPTERS["ansa"]._find_content(soup)
+        legacy_images(content, place, formula=False)
+        return content
+
+    content = ContentConverter.find_content(soup, ContentConverter.CONTENT_CANDIDATES)
+    if fmt == "ansys":      # Ansys：先处理图片，再清洗噪音
+        legacy_images(content, place, formula=True)
+        for junk in content.select(DROP_SELECTOR): junk.decompose()
+    else:                   # Abaqus：先清洗噪音，再处理图片
+        for junk in content.select(DROP_SELECTOR): junk.decompose()
+        legacy_images(content, place, formula=True)
+    return content
+
+
+def compiled(fmt, text, place):
+    soup = make_soup(text, DEFAULT_PARSER)
+    rules = ADAPTERS[fmt].CLEANUP_RULES
+    if fmt == "ansa":
+        content = ADAPTERS["ansa"]._find_content(soup)
+        if content is not soup and rules.dropped(content):
+            rules.apply(soup)
+            content = ADAPTERS["ansa"]._find_content(soup)
+    else:
+        content = ContentConverter.find_content(soup, ContentConverter.CONTENT_CANDIDATES)
+    rules.apply(content, place)
+    return content
+
+
+@pytest.mark.parametrize("fmt", ["ansa", "ansys", "abaqus"])
+def test_cleanup_equivalent(corpus, fmt):
+    for text in [EDGE_PAGE, NESTED_PAGE] + [read(p) for p in sample_pages(corpus, fmt)]:
+        old_place, new_place = Placer(), Placer()
+        expected = str(legacy(fmt, text, old_place))
+        assert str(compiled(fmt, text, new_place)) == expected
+        assert set(new_place.calls) <= set(old_place.calls)
+
+
+def test_ansa_rules_match_legacy_selectors():
+    assert ADAPTERS["ansa"].CLEANUP_RULES.drop == ANSA_SELECTORS
+
+
+def test_compile_selector():
+    assert compile_selector("div.related-pages") == ("div", frozenset({"related-pages"}), ())
+    assert compile_selector(".navheader") == ("*", frozenset({"navheader"}), ())
+    assert compile_selector('a[role="x"]#i') == ("a", frozenset(), (("role", "x"), ("id", "i")))
+    with pytest.raises(ValueError):
+        compile_selector("div > p")
+
+
+def test_unwrap_keeps_children():
+    soup = make_soup('<div><span class="x">a <b>b</b></span><p>c</p></div>', DEFAULT_PARSER)
+    CleanupRules(unwrap="span.x").apply(soup.div)
+    assert str(soup.div) == '<div>a <b>b</b><p>c</p></div>'
@@ -0,0 +1,83 @@
+"""命令行：标题路径通配选择、--list 与 --select 构建"""
+import pytest
+
+from conftest import read_tree
+from cae_doc_builder.cli import main, select_nodes
+from cae_doc_builder.core.structures import DocNode
+
+
+def tree():
+    mech = DocNode("Mechanical User Guide", 1, 1, is_container=True)
+    contact = DocNode("Contact", 2, 1, is_container=True)
+    contact.add_child(DocNode("Contact Pressure", 3, 1))
+    contact.add_child(DocNode("Release Notes", 3, 2))
+    mech.add_child(contact)
+    mech.add_child(DocNode("Meshing", 2, 2))
+    fluent = DocNode("Fluent", 1, 2, is_container=True)
+    fluent.add_child(DocNode("release notes", 2, 1))
+    return [mech, fluent, DocNode(None, 1, 3)]
+
+def titles(nodes):
+    return [n.title for n in nodes]
+
+
+@pytest.mark.parametrize("patterns, expected", [
+    (["mech*"], ["Mechanical User Guide"]),
+    (["Mechanical*/Contact*"], ["Contact"]),
+    (["*/contact/*pressure"], ["Contact Pressure"]),
+    (["**/Release Notes"], ["Release Notes", "release notes"]),
+    # 命中的节点不再向下匹配：父节点已选中时子节点由其递归构建
+    (["**/Contact*"], ["Contact"]),
+    (["**"], ["Mechanical User Guide", "Fluent", None]),
+    (["/Fluent/", "Mechanical*/Meshing"], ["Meshing", "Fluent"]),
+    (["m?chanical user guide/[cm]*"], ["Contact", "Meshing"]),
+])
+def test_select_nodes(patterns, expected):
+    selected, missed = select_nodes(tree(), patterns)
+    assert titles(selected) == expected
+    assert missed == []
+
+
+def test_select_nodes_reports_missed_patterns():
+    selected, missed = select_nodes(tree(), ["Fluent", "Nothing*", "Fluent/Contact"])
+    assert titles(selected) == ["Fluent"]
+    assert missed == ["Nothing*", "Fluent/Contact"]
+
+
+def test_list_and_select(corpus, capsys):
+    src = corpus("abaqus")
+    assert main(["abaqus", src, "--list", "--depth", "1", "-q"]) == 0
+    top = capsys.readouterr().out.splitlines()
+    assert top and all(line[:2] in ("+ ", "- ") for line in top)
+
+    first = top[0][2:]
+    assert main(["ABAQUS", src, "--list", "-q", "-s", first, "-s", "no such book"]) == 0
+    captured = capsys.readouterr()
+    listed = captured.out.splitlines()
+    assert listed[0] == top[0] and len(listed) > 1
+    assert all(line.startswith("  ") for line in listed[1:])
+    assert "no such book" in captured.err
+
+    with pytest.raises(SystemExit, match="未选中任何节点"):
+        main(["ABAQUS", src, "--list", "-q", "-s", "no such book"])
+
+
+def test_build_selected_subtree(build, corpus, tmp_path):
+    """--select 构建与直接构建选中节点的结果相同，且只包含选中的子树"""
+    b = build("ansys")
+    nodes = b.scan()
+    target = next(child for node in nodes for child in node.children if child.is_container)
+    pattern = f"*/{target.title}"
+    expected, _ = select_nodes(nodes, [pattern])
+    b.run(tmp_path / "expected", expected)
+
+    out = tmp_path / "out"
+    assert main(["ANSYS", corpus("ansys"), str(out), "-q", "-s", pattern]) == 0
+    files = read_tree(out)
+    assert files == read_tree(tmp_path / "expected")
+    assert len({rel.split('/', 1)[0] for rel in files}) == 1
+
+
+def test_missing_output(corpus):
+    with pytest.raises(SystemExit, match="输出目录"):
+        main(["ANSA", corpus("ansa")])
@@ -0,0 +1,36 @@
+"""FileIndex 与 os.path.exists 的一致性 (含符号链接)"""
+import os
+
+import pytest
+
+from cae_doc_builder.utils.file_index import FileIndex
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "symlink"), reason="需要符号链接支持")
+
+
+def make_tree(root):
+    (root / "docs" / "sub").mkdir(parents=True)
+    (root / "docs" / "sub" / "page.htm").write_text("x")
+    (root / "shared").mkdir()
+    (root / "shared" / "image.png").write_text("x")
+    try:
+        os.symlink(root / "shared", root / "docs" / "linked", target_is_directory=True)
+        os.symlink(root / "docs", root / "docs" / "sub" / "loop", target_is_directory=True)
+        os.symlink(root / "missing.htm", root / "docs" / "dangling.htm")
+    except OSError:
+        pytest.skip("无法创建符号链接")
+
+
+def test_matches_os_path_exists(tmp_path):
+    make_tree(tmp_path)
+    index = FileIndex(str(tmp_path))
+    candidates = [
+        "docs/sub/page.htm", "shared/image.png",
+        "docs/linked", "docs/linked/image.png",             # 指向目录的链接
+        "docs/sub/loop/sub/page.htm",                       # 链接循环中的别名路径
+        "docs/sub/loop/linked/image.png",
+        "docs/dangling.htm", "docs/linked/nope.png", "docs/sub/loop/nope.htm",
+    ]
+    for rel in candidates:
+        path = str(tmp_path / rel)
+        assert index.exists(path) == os.path.exists(path), rel
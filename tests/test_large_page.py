@@ -0,0 +1,62 @@
+"""
+大页面分段转换与整页转换的一致性 (只支持 html.parser 后端；ANSA 没有大页面模式)
+分段大小取得很小，使合成语料的普通页面也被切成多段
+"""
+import pytest
+
+from conftest import iter_nodes
+from samples import EDGE_PAGE, sample_pages, read
+from cae_doc_builder.converters import html_md
+from cae_doc_builder.adapters import abaqus_adapter
+from cae_doc_builder.converters.parser_backend import make_soup
+from cae_doc_builder.converters.html_md import ContentConverter, MD_OPTIONS
+from cae_doc_builder.converters.large_page import LargePage, LARGE_PAGE_PARSER
+from cae_doc_builder.converters.tree_md import tree_to_markdown
+
+CHUNK_CHARS = 200
+
+
+def whole(text, candidates, rules):
+    soup = make_soup(text, LARGE_PAGE_PARSER)
+    content = ContentConverter.find_content(soup, candidates)
+    rules.apply(content)
+    return tree_to_markdown(content, **MD_OPTIONS)
+
+
+@pytest.mark.parametrize("fmt", ["ansys", "abaqus"])
+def test_chunked_equivalent(corpus, fmt):
+    candidates, rules = ContentConverter.CONTENT_CANDIDATES, ContentConverter.CLEANUP
+    chunked = 0
+    for text in [EDGE_PAGE] + [read(p) for p in sample_pages(corpus, fmt)]:
+        page = LargePage(text, candidates, rules, chunk_chars=CHUNK_CHARS)
+        chunked += page.chunk_count > 1
+        assert page.to_markdown(rules, **MD_OPTIONS) == whole(text, candidates, rules)
+    assert chunked
+
+
+@pytest.mark.parametrize("fmt", ["ansys", "abaqus"])
+def test_adapter_large_page_mode(build, tmp_path, monkeypatch, fmt):
+    pages_seen = []
+
+    def small(*args, **kwargs):
+        page = LargePage(*args, chunk_chars=CHUNK_CHARS, **kwargs)
+        pages_seen.append(page.chunk_count)
+        return page
+    monkeypatch.setattr(html_md, "LargePage", small)
+    monkeypatch.setattr(abaqus_adapter, "LargePage", small)
+
+    b = build(fmt)
+    adapter = b.adapter
+    adapter.html_parser = LARGE_PAGE_PARSER
+    pages = [n for n in iter_nodes(b.scan()) if (n.source_path or "").lower().endswith((".htm", ".html"))]
+    assert pages
+
+    def convert(node, threshold):
+        adapter.large_page_chars = threshold
+        return adapter.read_file_content(node, image_out_dir=str(tmp_path / "assets"),
+                                         source_text=adapter.load_source(node))
+
+    for node in pages[:12]:
+        expected = convert(node, 0)
+        assert convert(node, 1) == expected, node.source_path
+    assert any(count > 1 for count in pages_seen)
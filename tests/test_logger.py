@@ -0,0 +1,39 @@
+"""日志服务：默认日志函数的输出、多个服务实例与根日志器"""
+import logging
+import logging.handlers
+
+from cae_doc_builder.utils.logger import LOGGER_NAME, LogService, log_message
+
+
+def test_log_message_prints_without_handlers(monkeypatch, capsys):
+    # pytest 的日志插件在根日志器上挂有处理器，这里切断传播以模拟未配置 logging 的进程
+    monkeypatch.setattr(logging.getLogger(LOGGER_NAME), "propagate", False)
+    log_message("📄 页面已生成")
+    log_message("⚠️ 图片缺失")
+    assert capsys.readouterr().out.splitlines() == ["📄 页面已生成", "⚠️ 图片缺失"]
+
+
+def test_log_message_uses_configured_service(capsys):
+    received = []
+    with LogService(callback=received.append, level="INFO"):
+        log_message("📄 页面已生成")
+    assert received == ["📄 页面已生成"]
+    assert capsys.readouterr().out == ""
+
+
+def test_second_service_replaces_first(caplog):
+    logger = logging.getLogger(LOGGER_NAME)
+    first, second = [], []
+    old = LogService(callback=first.append)
+    try:
+        with LogService(callback=second.append) as log:
+            log("📄 页面已生成")
+            assert sum(isinstance(h, logging.handlers.QueueHandler) for h in logger.handlers) == 1
+    finally:
+        old.close()
+    assert (first, second) == ([], ["📄 页面已生成"])
+
+    # 不改动 propagate：根日志器上的处理器 (此处为 pytest 的 caplog) 同样收到记录
+    assert logger.propagate
+    assert [r.getMessage() for r in caplog.records if r.name == LOGGER_NAME] == ["📄 页面已生成"]
+    assert not logger.handlers
@@ -0,0 +1,112 @@
+"""增量构建清单：写入失败、构建中断与 PDF 附件"""
+import os
+import re
+import json
+import shutil
+
+import pytest
+
+from conftest import Build, iter_nodes
+
+MANIFEST = ".build_manifest.json"
+FIG_RE = re.compile(r'/fig(-[0-9a-f]{8})?\.png$')     # fig.png 及同名冲突时的改名
+
+
+def load_entries(out):
+    with open(os.path.join(out, MANIFEST), encoding='utf-8') as f:
+        return json.load(f)["entries"]
+
+
+def test_failed_write_is_not_recorded(build, tmp_path):
+    first = tmp_path / "first"
+    build("ansys").run(first)
+    page = sorted(rel for rel in load_entries(first) if rel.endswith(".md"))[0]
+
+    # 输出位置被目录占据：os.replace 失败
+    out = tmp_path / "out"
+    (out / page).mkdir(parents=True)
+    b = build("ansys").run(out)
+    assert any("写入失败" in msg for msg in b.logs)
+    assert page not in load_entries(out)
+
+    # 障碍移除后，增量构建重新生成该页面
+    (out / page).rmdir()
+    build("ansys").run(out, incremental=True)
+    assert (out / page).is_file()
+    assert page in load_entries(out)
+
+
+def test_manifest_not_saved_when_build_fails(build, tmp_path):
+    def interrupt(done, total):
+        if done == 5: raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        build("ansa").run(tmp_path, progress_callback=interrupt)
+    assert not (tmp_path / MANIFEST).exists()
+
+
+def test_pdf_copies_are_tracked(build, tmp_path):
+    b = build("abaqus")
+    nodes = b.scan()
+    b.run(tmp_path, nodes)
+    pdfs = {rel for entry in load_entries(tmp_path).values() for rel in entry["assets"] if rel.endswith(".pdf")}
+    assert pdfs and all((tmp_path / rel).is_file() for rel in pdfs)
+
+    # 删除的 PDF 副本在增量构建时恢复
+    victim = sorted(pdfs)[0]
+    os.remove(tmp_path / victim)
+    build("abaqus").run(tmp_path, incremental=True)
+    assert (tmp_path / victim).is_file()
+
+    # 目录中不再出现的 PDF 节点，其副本作为孤立输出清理
+    for node in iter_nodes(nodes):
+        node.children = [c for c in node.children if not (c.source_path or "").lower().endswith(".pdf")]
+    build("abaqus").run(tmp_path, nodes, incremental=True)
+    assert not any((tmp_path / rel).exists() for rel in pdfs)
+
+
+def test_skipped_page_keeps_same_named_asset(corpus, tmp_path):
+    """两个相邻页面引用同名、内容不同的图片，只重新生成其中一个时另一个的图片不被覆盖"""
+    src = tmp_path / "src"
+    shutil.copytree(corpus("ansa"), src)
+    chapter = src / "chapter_000"
+    pages = {}
+    for name, folder, data in (("page_0000.html", "a", b"AAAA"), ("page_0001.html", "b", b"BBBBBBBB")):
+        (chapter / folder).mkdir()
+        (chapter / folder / "fig.png").write_bytes(data)
+        page = chapter / name
+        page.write_text(page.read_text(encoding='utf-8').replace(
+            '<article role="main" itemprop="articleBody">',
+            f'<article role="main" itemprop="articleBody"><p><img src="{folder}/fig.png" alt="fig"/></p>'), encoding='utf-8')
+        pages[name] = page
+
+    out = tmp_path / "out"
+    Build("ansa", str(src)).run(out, incremental=True)
+
+    def linked(page):
+        """引用 page 的输出页面及其 fig 图片的内容"""
+        entries = load_entries(out)
+        rel = next(k for k, e in entries.items() if e["source"] == str(page))
+        name = next(a for a in entries[rel]["assets"] if FIG_RE.search(a))
+        with open(out / rel, encoding='utf-8') as f:
+            assert f"(assets/{name.rsplit('/', 1)[1]})" in f.read()
+        return (out / name).read_bytes()
+
+    assert linked(pages["page_0000.html"]) == b"AAAA"
+    assert linked(pages["page_0001.html"]) == b"BBBBBBBB"
+
+    # 只有第二个页面及其图片变化：第一个页面被跳过，仍引用原来的 fig.png
+    (chapter / "b" / "fig.png").write_bytes(b"CCCCCCCCCCCC")
+    page = pages["page_0001.html"]
+    page.write_text(page.read_text(encoding='utf-8') + "\n", encoding='utf-8')
+    b = Build("ansa", str(src)).run(out, incremental=True)
+    assert any("跳过" in msg for msg in b.logs)
+    assert linked(pages["page_0000.html"]) == b"AAAA"
+    assert linked(pages["page_0001.html"]) == b"CCCCCCCCCCCC"
+
+    # 旧图片不再被任何页面引用，随增量构建清理
+    live = {a for e in load_entries(out).values() for a in e["assets"]}
+    assets = {os.path.dirname(a) for a in live if FIG_RE.search(a)}
+    assert len(assets) == 1
+    on_disk = {f"{d}/{n}" for d in assets for n in os.listdir(out / d) if FIG_RE.search("/" + n)}
+    assert len(on_disk) == 2 and on_disk <= live
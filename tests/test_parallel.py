@@ -0,0 +1,21 @@
+"""多进程转换与串行转换的输出一致 (页面、图片、清单与进度顺序)"""
+import pytest
+
+from conftest import read_tree
+from test_manifest import load_entries
+
+
+@pytest.mark.parametrize("fmt", ["ansa", "ansys", "abaqus"])
+def test_parallel_matches_serial(build, tmp_path, fmt):
+    results = {}
+    for jobs in (1, 2):
+        out = tmp_path / f"jobs{jobs}"
+        progress = []
+        build(fmt).run(out, jobs=jobs, progress_callback=lambda done, total: progress.append((done, total)))
+        results[jobs] = (read_tree(out), load_entries(out), progress)
+
+    serial, parallel = results[1], results[2]
+    assert serial[0] and serial[0] == parallel[0]
+    assert serial[1] == parallel[1]
+    assert serial[2] == parallel[2]
+    assert serial[2][-1][0] == serial[2][-1][1]
@@ -0,0 +1,28 @@
+"""全文索引：增量构建中跳过的页面"""
+import os
+import sqlite3
+
+from conftest import read_tree
+from cae_doc_builder.core.search_index import SearchIndex, search
+
+
+def page_count(out):
+    return sum(rel.endswith(".md") for rel in read_tree(out))
+
+
+def test_index_enabled_on_incremental_rebuild(build, tmp_path):
+    # 第一次增量构建未启用索引；再次构建时所有页面都被跳过，仍应全部入索引
+    build("ansys").run(tmp_path, incremental=True)
+    b = build("ansys").run(tmp_path, incremental=True, search_index=True)
+    pages = page_count(tmp_path)
+    assert any(f"更新 {pages} 个页面" in msg for msg in b.logs), b.logs
+    assert search(str(tmp_path), "Ansys OR analysis OR element", limit=5)
+
+    # 之后的增量构建保留已有记录，不再重写
+    b = build("ansys").run(tmp_path, incremental=True, search_index=True)
+    assert any("更新 0 个页面" in msg for msg in b.logs)
+    conn = sqlite3.connect(os.path.join(tmp_path, SearchIndex.FILE_NAME))
+    try:
+        assert conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0] == pages
+    finally:
+        conn.close()
@@ -0,0 +1,74 @@
+"""按 #锚点 切分页面：切分结果、介绍页内容与锚点登记"""
+import os
+import re
+
+from conftest import iter_nodes
+from cae_doc_builder.converters.sections import split_sections
+
+PARAGRAPH_RE = re.compile(r'<p>([^<]{20,})')
+
+PAGE = """<html><body>
+<div class="intro"><p>Preamble text of the chapter.</p></div>
+<div class="section"><h2 id="a">First</h2><p>Text of the first section.</p></div>
+<div class="section"><h2 id="b">Second</h2><p>Text of the second section.</p></div>
+</body></html>"""
+
+
+def test_split_sections():
+    sections = split_sections(PAGE, {"a", "b", "missing"})
+    assert set(sections) == {None, "a", "b"}
+    assert "Preamble" in sections[None] and "First" not in sections[None]
+    assert "first section" in sections["a"] and "second" not in sections["a"]
+    assert sections["b"].rstrip().endswith("</html>")
+
+
+def test_sections_cover_each_page_once(build, tmp_path):
+    """
+    同一文件的各节点合起来恰好覆盖整页一次：锚点节点只得到自己的小节，
+    不带锚点的介绍页只得到第一个锚点之前的部分 (Ansys 书籍首页从第一个锚点开始，因此为空)
+    """
+    b = build("ansys")
+    adapter = b.adapter
+    nodes = b.scan()
+    groups = {}
+    for node in iter_nodes(nodes):
+        if node.source_path:
+            groups.setdefault(os.path.normcase(node.source_path), {})[node.anchor] = node
+    shared = {path: group for path, group in groups.items() if None in group and len(group) > 1}
+    assert shared
+
+    for path, group in shared.items():
+        outputs = {anchor: adapter.read_file_content(node, image_out_dir=str(tmp_path / "assets"),
+                                                     source_text=adapter.load_source(node)) or ""
+                   for anchor, node in group.items()}
+        assert not outputs[None].strip()
+        with open(path, encoding='utf-8') as f:
+            paragraphs = [p.strip() for p in PARAGRAPH_RE.findall(f.read())]
+        assert paragraphs
+        for text in paragraphs:
+            assert sum(text in content for content in outputs.values()) == 1, text
+
+
+def test_index_sections_replaces_previous_anchors(build):
+    b = build("ansys")
+    nodes = b.scan()
+    anchored = {os.path.normcase(n.source_path) for n in iter_nodes(nodes) if n.anchor}
+    assert set(b.adapter.section_anchors) == anchored
+
+    b.adapter.index_sections([])
+    assert b.adapter.section_anchors == {}
+
+
+def test_build_keeps_full_tree_anchors_for_subtrees(build, tmp_path):
+    b = build("ansys")
+    nodes = b.scan()
+    full = dict(b.adapter.section_anchors)
+
+    # 选中的子树仍按整棵树的锚点切分
+    b.run(tmp_path / "subtree", nodes[:1])
+    assert b.adapter.section_anchors == full
+
+    # 另一棵树 (没有锚点) 构建时不再沿用旧锚点
+    other = build("ansa").scan()
+    b.run(tmp_path / "other", other)
+    assert b.adapter.section_anchors == {}
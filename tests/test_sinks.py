@@ -0,0 +1,58 @@
+"""单文件输出 (zip / tar / SQLite) 与目录输出的内容一致"""
+import sqlite3
+import tarfile
+import zipfile
+
+import pytest
+
+from conftest import read_tree
+
+INDEX = ".kb_index.sqlite"
+
+
+def zip_files(path):
+    with zipfile.ZipFile(path) as z:
+        # 同一路径重写时后出现的条目为准
+        return {info.filename: z.read(info) for info in z.infolist()}
+
+def tar_files(path):
+    with tarfile.open(path) as t:
+        return {m.name: t.extractfile(m).read() for m in t.getmembers() if m.isfile()}
+
+def sqlite_files(path):
+    conn = sqlite3.connect(path)
+    try:
+        return dict(conn.execute("SELECT path, data FROM files JOIN blobs USING (digest)"))
+    finally:
+        conn.close()
+
+READERS = {"kb.zip": zip_files, "kb.tar": tar_files, "kb.tar.gz": tar_files, "kb.sqlite": sqlite_files}
+
+
+@pytest.mark.parametrize("fmt", ["ansa", "ansys", "abaqus"])
+def test_sinks_match_directory(build, tmp_path, fmt):
+    out = tmp_path / "out"
+    b = build(fmt)
+    nodes = b.scan()
+    b.run(out / "dir", nodes)
+    expected = read_tree(out / "dir")
+    assert expected
+
+    for name, reader in READERS.items():
+        target = out / name
+        b.run(target, nodes, search_index=True)
+        files = reader(target)
+        assert INDEX in files, name
+        assert {rel: data for rel, data in files.items() if not rel.rsplit('/', 1)[-1].startswith('.')} == expected, name
+
+    # 临时归档与暂存目录均已清理
+    assert sorted(p.name for p in out.iterdir()) == sorted(["dir", *READERS])
+
+
+def test_failed_build_leaves_no_archive(build, tmp_path):
+    def interrupt(done, total):
+        if done == 5: raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        build("ansys").run(tmp_path / "out" / "kb.zip", progress_callback=interrupt)
+    assert list((tmp_path / "out").iterdir()) == []
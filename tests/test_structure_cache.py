@@ -0,0 +1,35 @@
+"""结构缓存：TOC 引用的页面增删后缓存失效"""
+import os
+import shutil
+
+from conftest import Build, iter_nodes
+
+CACHED = "已从缓存加载"
+
+
+def scan(src):
+    b = Build("abaqus", str(src))
+    nodes = b.engine.analyze_structure(str(src), use_cache=True)
+    sources = {n.source_path for n in iter_nodes(nodes) if n.source_path}
+    return sources, any(CACHED in msg for msg in b.logs)
+
+
+def test_missing_page_added_later_invalidates_cache(corpus, tmp_path):
+    src = tmp_path / "src"
+    shutil.copytree(corpus("abaqus"), src)
+    sources, cached = scan(src)
+    assert not cached
+    page = sorted(p for p in sources if p.endswith(".htm"))[len(sources) // 3]
+
+    # 部分安装：目录引用的页面缺失，扫描结果中没有该页面
+    hidden = tmp_path / "hidden.htm"
+    shutil.move(page, hidden)
+    sources, cached = scan(src)
+    assert not cached and page not in sources
+    assert scan(src) == (sources, True)
+
+    # 页面补齐后重新扫描，而不是沿用缓存中缺失的结果
+    shutil.move(hidden, page)
+    sources, cached = scan(src)
+    assert not cached and page in sources
+    assert scan(src) == (sources, True)
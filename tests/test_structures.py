@@ -0,0 +1,15 @@
+"""标题索引：子串查找与缺失标题"""
+from cae_doc_builder.core.structures import DocNode, TitleIndex
+
+
+def test_title_index_search_and_missing_titles():
+    root = DocNode("Elements", 0)
+    root.add_child(DocNode(None, 1, 1))         # 目录中 title 属性缺失的条目
+    root.add_child(DocNode("Beam\nElements", 1, 2))
+    index = TitleIndex([root, DocNode("Materials", 0)])
+
+    assert len(index) == 4
+    assert list(index.search("ELEMENTS")) == [0, 2]
+    assert list(index.search("beam elements")) == [2]
+    assert index.path(2) == [0, 2]
+    assert list(index.search("")) == []
@@ -0,0 +1,49 @@
+"""
+tree_md 与原流程的逐字节一致性：
+    markdownify(str(content)) / HTML2Text().handle(str(content))  (先序列化再重新解析)
+    tree_to_markdown(content) / tree_to_html2text(content)        (直接遍历已解析的树)
+"""
+import pytest
+from markdownify import markdownify
+
+from conftest import ADAPTERS
+from samples import EDGE_PAGE, sample_pages, read
+from cae_doc_builder.converters.parser_backend import make_soup, DEFAULT_PARSER
+from cae_doc_builder.converters.html_md import ContentConverter, MD_OPTIONS
+from cae_doc_builder.converters.tree_md import tree_to_markdown, tree_to_html2text
+
+html2text = pytest.importorskip("html2text")
+
+
+def cleaned(fmt, text):
+    """按适配器的方式定位正文并清洗 (不放置图片)，每次调用重新解析"""
+    adapter_cls = ADAPTERS[fmt]
+    soup = make_soup(text, DEFAULT_PARSER)
+    if fmt == "ansa":
+        content = adapter_cls._find_content(soup)
+    else:
+        content = ContentConverter.find_content(soup, ContentConverter.CONTENT_CANDIDATES)
+    adapter_cls.CLEANUP_RULES.apply(content)
+    return content
+
+
+def html2text_converter(corpus):
+    return ADAPTERS["ansa"](corpus("ansa"), ".", lambda msg: None)._make_converter
+
+
+@pytest.mark.parametrize("fmt", ["ansys", "abaqus"])
+def test_markdownify_equivalent(corpus, fmt):
+    for text in [EDGE_PAGE] + [read(p) for p in sample_pages(corpus, fmt)]:
+        expected = markdownify(str(cleaned(fmt, text)), **MD_OPTIONS)
+        assert tree_to_markdown(cleaned(fmt, text), **MD_OPTIONS) == expected
+
+        h1 = make_soup(text, DEFAULT_PARSER).find('h1')
+        if h1 is not None:
+            assert tree_to_markdown(h1, heading_style="ATX") == markdownify(str(h1), heading_style="ATX")
+
+
+def test_html2text_equivalent(corpus):
+    make_converter = html2text_converter(corpus)
+    for text in [EDGE_PAGE] + [read(p) for p in sample_pages(corpus, "ansa")]:
+        expected = make_converter().handle(str(cleaned("ansa", text)))
+        assert tree_to_html2text(cleaned("ansa", text), make_converter()) == expected